@@ -34,7 +34,7 @@ setuptools.setup(
     data_files=[('', ['README.md', 'requirements.txt', 'requirements-dev.txt'])],
     python_requires='>=3.6',
     install_requires=install_requires(),
-    packages=['sourcer', 'sourcer.expressions'],
+    packages=['sourcer', 'sourcer.bench', 'sourcer.expressions'],
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
         'Topic :: Software Development :: Interpreters',
@@ -1,3 +1,5 @@
 from .grammar import Grammar
+from .registry import GrammarRegistry
+from .runtime import ResultCache, SourcerError
 
 __version__ = '0.3.10'
@@ -0,0 +1,176 @@
+import argparse
+import importlib.util
+import os
+import sys
+
+from . import build, grep
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m sourcer',
+        description='Command-line tools for sourcer grammars.',
+    )
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    commands.required = True
+
+    grep_parser = commands.add_parser(
+        'grep',
+        help='Search files for the matches of a grammar rule.',
+        description=(
+            'Searches files for the matches of a grammar rule, and prints each'
+            ' match with its path, line, and column. Exits with status 0 if'
+            ' there were any matches, 1 if there were none, and 2 if a file'
+            ' could not be searched.'
+        ),
+    )
+    grep_parser.add_argument(
+        '--grammar', required=True,
+        help='The file with the grammar description.',
+    )
+    grep_parser.add_argument(
+        '--rule', required=True,
+        help='The name of the rule or class to search for.',
+    )
+    grep_parser.add_argument(
+        '--format', choices=['text', 'ndjson'], default='text',
+        help='The output format. (Defaults to "text".)',
+    )
+    grep_parser.add_argument(
+        '--jobs', type=int,
+        help='The number of worker processes. (Defaults to the number of CPUs.)',
+    )
+    grep_parser.add_argument(
+        '--encoding', default='utf-8',
+        help='The encoding of the files. (Defaults to "utf-8".)',
+    )
+    grep_parser.add_argument(
+        '--binary', action='store_true',
+        help=(
+            'Search the bytes of each file, without decoding it. (The grammar'
+            ' must use byte strings.)'
+        ),
+    )
+    grep_parser.add_argument(
+        'paths', nargs='+', metavar='PATH',
+        help='The files to search. Directories are searched recursively.',
+    )
+
+    build_parser = commands.add_parser(
+        'build',
+        help='Write a standalone Python module for a grammar.',
+        description=(
+            'Writes a Python module for a grammar, along with its ".pyc" file.'
+            ' The module does not import sourcer.'
+        ),
+    )
+    build_parser.add_argument(
+        'grammar', metavar='GRAMMAR',
+        help='The file with the grammar description.',
+    )
+    build_parser.add_argument(
+        '-o', '--output',
+        help=(
+            'The path of the Python module. (Defaults to the name of the'
+            ' grammar file, with a ".py" extension.)'
+        ),
+    )
+    build_parser.add_argument(
+        '--name', help='The name of the module. (Defaults to the file name.)',
+    )
+    build_parser.add_argument(
+        '--release', action='store_true',
+        help=(
+            'Leave out the comments, docstrings, and rule definitions. Also'
+            ' write an "-OO" ".pyc" file (without docstrings or asserts),'
+            ' which Python only loads when it runs with "-OO".'
+        ),
+    )
+    build_parser.add_argument(
+        '--backend', choices=['generator', 'stackless'], default='generator',
+        help='The backend to use. (Defaults to "generator".)',
+    )
+    build_parser.add_argument(
+        '--incremental', action='store_true',
+        help='Support incremental parsing.',
+    )
+    build_parser.add_argument(
+        '--lexer', action='store_true',
+        help='Split the text into tokens with a single regular expression.',
+    )
+    build_parser.add_argument(
+        '--tokens', action='store_true',
+        help='Parse sequences of tokens instead of strings.',
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == 'build':
+        return _build(parser, args)
+    else:
+        return _grep(parser, args)
+
+
+def _build(parser, args):
+    with open(args.grammar) as f:
+        description = f.read()
+
+    output = args.output or os.path.splitext(args.grammar)[0] + '.py'
+    if os.path.abspath(output) == os.path.abspath(args.grammar):
+        parser.error('The output file would replace the grammar file.')
+
+    try:
+        path, pyc_path = build.build(
+            description,
+            output,
+            name=args.name,
+            release=args.release,
+            backend=args.backend,
+            incremental=args.incremental,
+            lexer=args.lexer,
+            tokens=args.tokens,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    sys.stdout.write(f'Wrote {path}\nWrote {pyc_path}\n')
+    if args.release:
+        opt_path = importlib.util.cache_from_source(path, optimization=2)
+        sys.stdout.write(f'Wrote {opt_path}\n')
+    return 0
+
+
+def _grep(parser, args):
+    with open(args.grammar) as f:
+        description = f.read()
+
+    try:
+        results = grep.grep(
+            description,
+            args.rule,
+            args.paths,
+            jobs=args.jobs,
+            encoding=args.encoding,
+            binary=args.binary,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    found, failed = False, False
+    for path, matches, error in results:
+        if error is not None:
+            failed = True
+            sys.stderr.write(f'sourcer grep: {path}: {error}\n')
+            continue
+
+        for match in matches:
+            found = True
+            line = match.to_json() if args.format == 'ndjson' else match.to_text()
+            sys.stdout.write(line + '\n')
+
+    if failed:
+        return 2
+    return 0 if found else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,2 @@
+from .corpora import Corpus, corpora, generate_grammar, generate_text
+from .runner import measure, measure_compile
@@ -0,0 +1,111 @@
+import argparse
+import json
+import platform
+import sys
+
+from .. import __version__
+from .corpora import corpora
+from .runner import measure, measure_compile
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m sourcer.bench',
+        description='Measures how quickly sourcer compiles and parses.',
+    )
+    parser.add_argument(
+        '--corpus', action='append', choices=sorted(corpora),
+        help='The corpus to use. (May be repeated. Defaults to all of them.)',
+    )
+    parser.add_argument(
+        '--rules', action='append', type=int,
+        help=(
+            'Measure the compile time of a generated grammar with this many'
+            ' rules. (May be repeated. If you use this option without the'
+            ' --corpus option, then no corpora are parsed.)'
+        ),
+    )
+    parser.add_argument(
+        '--backend', action='append',
+        choices=['generator', 'stackless', 'interpret'],
+        help='The backend to use. (May be repeated. Defaults to "generator".)',
+    )
+    parser.add_argument(
+        '--lexer', action='store_true',
+        help=(
+            'Parse in lexer mode. (Skips the corpora whose terminals depend on'
+            ' their context, and the "interpret" backend, which doesn\'t'
+            ' support lexer mode.)'
+        ),
+    )
+    parser.add_argument(
+        '--size', type=int, default=100000,
+        help='The approximate size of each text, in characters.',
+    )
+    parser.add_argument(
+        '--depth', type=int, default=4,
+        help='The maximum nesting depth of each text.',
+    )
+    parser.add_argument(
+        '--repeat', type=int, default=3,
+        help='The number of times to parse each text.',
+    )
+    parser.add_argument(
+        '--seed', type=int, default=0,
+        help='The seed for the random number generator.',
+    )
+    parser.add_argument(
+        '--output', help='The file for the JSON results. (Defaults to stdout.)',
+    )
+    args = parser.parse_args(argv)
+
+    backends = args.backend or ['generator']
+    if args.corpus:
+        names = args.corpus
+    else:
+        names = [] if args.rules else sorted(corpora)
+
+    if args.lexer:
+        names = [x for x in names if corpora[x].lexer]
+
+    results = []
+    for name in names:
+        for backend in backends:
+            if args.lexer and backend == 'interpret':
+                continue
+            results.append(measure(
+                corpora[name],
+                size=args.size,
+                depth=args.depth,
+                backend=backend,
+                repeat=args.repeat,
+                seed=args.seed,
+                lexer=args.lexer,
+            ))
+
+    compile_results = []
+    for num_rules in args.rules or []:
+        for backend in backends:
+            compile_results.append(measure_compile(
+                num_rules, backend=backend, repeat=args.repeat, seed=args.seed,
+            ))
+
+    report = {
+        'sourcer_version': __version__,
+        'python_version': platform.python_version(),
+        'python_implementation': platform.python_implementation(),
+        'results': results,
+        'compile_results': compile_results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+from collections import namedtuple
+import random
+
+from .. import meta
+
+
+class Corpus(namedtuple('Corpus', 'name, description, generate, lexer')):
+    """A grammar description and a function that generates input for it.
+
+    The function takes the approximate size of the text (in characters), the
+    maximum nesting depth, and a random number generator. The "lexer" flag is
+    False if the grammar's terminals depend on their context, so that the
+    grammar doesn't work in lexer mode.
+    """
+
+
+def generate_text(corpus, size, depth, seed=0):
+    return corpus.generate(size, depth, random.Random(seed))
+
+
+def _repeat(size, separator, make_item):
+    parts = [make_item()]
+    length = len(parts[0])
+    while length < size:
+        item = make_item()
+        parts.append(item)
+        length += len(separator) + len(item)
+    return separator.join(parts)
+
+
+json_description = r'''
+    start = Value
+    Value = Object | Array | String | Number | Keyword
+    Object = "{" >> (Member // ",") << "}" |> `dict`
+    Member = [String << ":", Value]
+    Array = "[" >> (Value // ",") << "]"
+    String = /"(?:[^\\"]|\\.)*"/
+    Number = /-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?/ |> `float`
+    Keyword = "true" >> `True` | "false" >> `False` | "null" >> `None`
+    ignored Space = /\s+/
+'''
+
+
+def _json_value(rand, depth):
+    kind = rand.randrange(6 if depth > 0 else 4)
+    if kind == 0:
+        return f'"item{rand.randrange(1000)}"'
+    if kind == 1:
+        return str(rand.randrange(-1000, 1000))
+    if kind == 2:
+        return f'{rand.random() * 100:.3f}'
+    if kind == 3:
+        return rand.choice(['true', 'false', 'null'])
+    items = [_json_value(rand, depth - 1) for _ in range(rand.randint(1, 4))]
+    if kind == 4:
+        return '[' + ', '.join(items) + ']'
+    keys = [f'"key{i}"' for i in range(len(items))]
+    return '{' + ', '.join(f'{k}: {v}' for k, v in zip(keys, items)) + '}'
+
+
+def _generate_json(size, depth, rand):
+    return '[\n' + _repeat(size, ',\n', lambda: _json_value(rand, depth)) + '\n]'
+
+
+arithmetic_description = r'''
+    start = Expr
+    Expr = OperatorPrecedence(
+        Int | Parens,
+        Prefix('+' | '-'),
+        RightAssoc('^'),
+        Postfix('%'),
+        LeftAssoc('*' | '/'),
+        LeftAssoc('+' | '-'),
+    )
+    Parens = '(' >> Expr << ')'
+    Int = /\d+/ |> `int`
+    ignore /\s+/
+'''
+
+
+def _arithmetic_term(rand, depth):
+    if depth > 0 and rand.random() < 0.3:
+        return f'({_arithmetic_expr(rand, depth - 1)})'
+    prefix = rand.choice(['', '', '', '-'])
+    return f'{prefix}{rand.randrange(1000)}'
+
+
+def _arithmetic_expr(rand, depth):
+    result = [_arithmetic_term(rand, depth)]
+    for _ in range(rand.randint(1, 3)):
+        result.append(rand.choice(['+', '-', '*', '/', '^']))
+        result.append(_arithmetic_term(rand, depth))
+    return ' '.join(result)
+
+
+def _generate_arithmetic(size, depth, rand):
+    return _repeat(size, ' +\n', lambda: _arithmetic_expr(rand, depth))
+
+
+excel_description = r'''
+    start = Formula
+    Formula = "="? >> Expr
+
+    ignored Space = /[ \t\n\r]+/
+
+    class A1Ref {
+        col_modifier = "$"?
+        col = /I[A-V]|[A-H][A-Z]|[A-Z]/
+        row_modifier = "$"?
+        row = /\d+/
+    }
+
+    Word = /[a-zA-Z_\@][a-zA-Z0-9_\.\@]*/
+    Number = /[0-9]+(\.[0-9]*)?|\.[0-9]+/ |> `float`
+    String = /"([^"]|"")*"/ |> `lambda x: x[1:-1].replace('""', '"')`
+    Error = /\#[a-zA-Z0-9_\/]+(\!|\?)?/ |> `lambda x: {'error': x}`
+    Array = "{" >> (ExprList /? ";") << "}"
+
+    class FunctionCall {
+        name = Word
+        arguments = "(" >> ExprList << ")"
+    }
+
+    class CellRef {
+        sheet = Opt((A1Ref | Word) << "!")
+        cell = A1Ref
+    }
+
+    Atom = "(" >> Expr << ")"
+        | Array
+        | FunctionCall
+        | CellRef
+        | Word
+        | Number
+        | String
+        | Error
+
+    Operators(allow_union) => OperatorPrecedence(
+        Atom,
+        LeftAssoc(":"),
+        LeftAssoc(""),
+        LeftAssoc("," where `lambda _: allow_union`),
+        Prefix("-" | "+"),
+        Postfix("%"),
+        RightAssoc("^"),
+        LeftAssoc("*" | "/"),
+        LeftAssoc("+" | "-"),
+        LeftAssoc("&"),
+        LeftAssoc("=" | "<>" | "<=" | ">=" | "<" | ">"),
+    )
+
+    Expr = Operators(allow_union=True)
+    ExprList = Operators(allow_union=False)? /? ","
+'''
+
+
+def _excel_cell(rand):
+    col = rand.choice('ABCDEFGH')
+    dollar = rand.choice(['', '$'])
+    return f'{dollar}{col}{rand.randint(1, 999)}'
+
+
+def _excel_expr(rand, depth):
+    kind = rand.randrange(5 if depth > 0 else 3)
+    if kind == 0:
+        return _excel_cell(rand)
+    if kind == 1:
+        return f'{_excel_cell(rand)}:{_excel_cell(rand)}'
+    if kind == 2:
+        return rand.choice([str(rand.randrange(100)), '"text"', '#N/A'])
+    if kind == 3:
+        op = rand.choice(['+', '-', '*', '/', '&', '=', '<>'])
+        return f'({_excel_expr(rand, depth - 1)} {op} {_excel_expr(rand, depth - 1)})'
+    name = rand.choice(['SUM', 'IF', 'AVG', 'MAX', 'ROUND'])
+    args = [_excel_expr(rand, depth - 1) for _ in range(rand.randint(1, 3))]
+    return f'{name}({", ".join(args)})'
+
+
+def _generate_excel(size, depth, rand):
+    return '=' + _repeat(size, ' + ', lambda: _excel_expr(rand, depth))
+
+
+# The metasyntax module's docstring is the grammar that describes grammars.
+metasyntax_description = meta.__doc__.split('\n', 2)[2]
+
+
+def _metasyntax_expr(rand, depth):
+    kind = rand.randrange(7 if depth > 0 else 3)
+    if kind == 0:
+        return f'Rule{rand.randrange(100)}'
+    if kind == 1:
+        return f'"kw{rand.randrange(100)}"'
+    if kind == 2:
+        return rand.choice([r'/\d+/', r'/[a-z]+/i', r'/\s*/'])
+    inner = [_metasyntax_expr(rand, depth - 1) for _ in range(rand.randint(2, 3))]
+    if kind == 3:
+        return '(' + ' | '.join(inner) + ')'
+    if kind == 4:
+        return '[' + ', '.join(inner) + ']'
+    if kind == 5:
+        return f'({inner[0]} // {inner[1]})'
+    return f'{inner[0]}*'
+
+
+def _metasyntax_rule(rand, depth):
+    index = rand.randrange(10000)
+    if rand.random() < 0.2:
+        fields = [
+            f'    field{i}: {_metasyntax_expr(rand, depth)}'
+            for i in range(rand.randint(1, 3))
+        ]
+        return f'class Class{index} {{\n' + '\n'.join(fields) + '\n}'
+    return f'Rule{index} = {_metasyntax_expr(rand, depth)}'
+
+
+def _generate_metasyntax(size, depth, rand):
+    return _repeat(size, '\n\n', lambda: _metasyntax_rule(rand, depth))
+
+
+indentation_description = r'''
+    ignore /[ \t]+/
+
+    Indent = /\n[ \t]*/
+
+    MatchIndent(i) =>
+        Indent where `lambda x: x == i`
+
+    IncreaseIndent(i) =>
+        Indent where `lambda x: len(x) > len(i)`
+
+    Body(current_indent) =>
+        let i = IncreaseIndent(current_indent) in
+        Statement(i) // MatchIndent(i)
+
+    Statement(current_indent) =>
+        If(current_indent) | Print
+
+    class If(current_indent) {
+        test: "if" >> Name
+        body: Body(current_indent)
+    }
+
+    class Print {
+        name: "print" >> Name
+    }
+
+    Name = /[a-zA-Z]+/
+    Newline = /[\r\n]+/
+
+    Start = Opt(Newline) >> (Statement('') /? Newline)
+'''
+
+
+_names = ['foo', 'bar', 'baz', 'fiz', 'buz', 'zim', 'zam', 'zub']
+
+
+def _indentation_block(rand, depth, indent):
+    lines = []
+    for _ in range(rand.randint(1, 3)):
+        if depth > 0 and rand.random() < 0.4:
+            lines.append(f'{indent}if {rand.choice(_names)}')
+            lines.extend(_indentation_block(rand, depth - 1, indent + '    '))
+        else:
+            lines.append(f'{indent}print {rand.choice(_names)}')
+    return lines
+
+
+def _generate_indentation(size, depth, rand):
+    return _repeat(size, '\n', lambda: '\n'.join(_indentation_block(rand, depth, '')))
+
+
+def generate_grammar(num_rules, seed=0):
+    """Generates a grammar description with the given number of rules. Each rule
+    refers to a few of the rules after it, and the last rules are tokens.
+    """
+    rand = random.Random(seed)
+    rules = ['start = Rule0*', 'ignore /\\s+/']
+    for i in range(num_rules):
+        refs = [f'Rule{j}' for j in range(i + 1, min(i + 4, num_rules))]
+        tokens = [f'"kw{i}"', f'/[a-z]+{i}/']
+        options = refs + tokens
+        rand.shuffle(options)
+        if i % 5 == 0 and len(options) > 2:
+            body = f'[{options[0]}, {options[1]}?] | {" | ".join(options[2:])}'
+        else:
+            body = ' | '.join(options)
+        rules.append(f'Rule{i} = {body}')
+    return '\n'.join(rules)
+
+
+corpora = {
+    'json': Corpus('json', json_description, _generate_json, True),
+    'arithmetic': Corpus('arithmetic', arithmetic_description, _generate_arithmetic, True),
+    # Cell references and names overlap, and the indentation is significant.
+    'excel': Corpus('excel', excel_description, _generate_excel, False),
+    'metasyntax': Corpus('metasyntax', metasyntax_description, _generate_metasyntax, True),
+    'indentation': Corpus('indentation', indentation_description, _generate_indentation, False),
+}
@@ -0,0 +1,119 @@
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from ..grammar import Grammar
+from .corpora import generate_grammar, generate_text
+
+
+def measure(corpus, size=100000, depth=4, backend='generator', repeat=3, seed=0,
+        lexer=False):
+    """Compiles the corpus's grammar, parses some generated text, and returns a
+    dict with the measurements. If "lexer" is True, then the grammar is compiled
+    in lexer mode.
+
+    - compile_seconds: The time it takes to compile the grammar.
+    - import_seconds: The time it takes to import the grammar's generated
+      Python file. (None for the "interpret" backend, which doesn't generate
+      one.)
+    - parse_seconds: The best time out of "repeat" parses.
+    - megabytes_per_second: The throughput of the best parse, in terms of the
+      size of the UTF-8 encoded text.
+    - peak_memory_bytes: The peak memory that Python allocated during a parse.
+    - memo_entries: The number of entries in the memo table after a parse.
+    """
+    text = generate_text(corpus, size, depth, seed)
+    num_bytes = len(text.encode('utf-8'))
+
+    include_source = backend != 'interpret'
+    start = time.perf_counter()
+    grammar = Grammar(
+        corpus.description,
+        include_source=include_source,
+        backend=backend,
+        lexer=lexer,
+    )
+    compile_seconds = time.perf_counter() - start
+
+    import_seconds = None
+    if include_source:
+        import_seconds = _time_import(corpus.name, grammar._source_code)
+
+    parse_seconds = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        grammar.parse(text)
+        parse_seconds = min(parse_seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        grammar.parse(text)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    stats = grammar.ParseStats()
+    grammar.parse(text, stats=stats)
+
+    return {
+        'corpus': corpus.name,
+        'backend': backend,
+        'lexer': lexer,
+        'size': size,
+        'depth': depth,
+        'seed': seed,
+        'text_bytes': num_bytes,
+        'compile_seconds': compile_seconds,
+        'import_seconds': import_seconds,
+        'parse_seconds': parse_seconds,
+        'megabytes_per_second': num_bytes / 1e6 / parse_seconds,
+        'peak_memory_bytes': peak_memory,
+        'memo_entries': stats.memo_entries,
+    }
+
+
+def measure_compile(num_rules, backend='generator', repeat=1, seed=0):
+    """Generates a grammar with "num_rules" rules, and returns a dict with the
+    best time out of "repeat" compilations. (For the "interpret" backend, the
+    "source_bytes" field is None.)
+    """
+    include_source = backend != 'interpret'
+    description = generate_grammar(num_rules, seed)
+
+    compile_seconds = float('inf')
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        grammar = Grammar(
+            description, include_source=include_source, backend=backend)
+        compile_seconds = min(compile_seconds, time.perf_counter() - start)
+
+    return {
+        'rules': num_rules,
+        'backend': backend,
+        'seed': seed,
+        'source_bytes': len(grammar._source_code) if include_source else None,
+        'compile_seconds': compile_seconds,
+        'seconds_per_rule': compile_seconds / num_rules,
+    }
+
+
+def _time_import(name, source_code):
+    module_name = f'_sourcer_bench_{name}'
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'{module_name}.py')
+        with open(path, 'w') as f:
+            f.write(source_code)
+
+        # Import the file from source, without any cached bytecode.
+        start = time.perf_counter()
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            sys.modules.pop(module_name, None)
+        return time.perf_counter() - start
@@ -0,0 +1,69 @@
+"""Builds a standalone Python module from a grammar.
+
+The module has the same interface as the one that ``Grammar`` returns, but it
+doesn't import sourcer (or anything outside of the standard library), so you
+can ship it without sourcer. This is the engine behind
+``python -m sourcer build``.
+"""
+
+import importlib.util
+import os
+import py_compile
+
+from . import __version__
+from .grammar import Grammar
+
+
+def build(description, path, name=None, release=False, **options):
+    """Writes the grammar's module to the path, along with its ".pyc" file.
+    Returns a pair of (path, pyc_path). (The pyc_path is the regular ".pyc"
+    file, even in release builds.)
+
+    - name: The name of the module. Defaults to the name of the file.
+    - release: If True, leave out the comments, the grammar's docstring, and
+      the definition strings of the rules and classes. Also write a second
+      ".pyc" file with Python's "-OO" optimizations, which drop the docstrings
+      and assert statements. Python only loads that file when it runs with the
+      "-OO" flag.
+
+    The other options are the same as the "Grammar" function's options, except
+    for the ones that need sourcer at runtime: "lazy", "match_token",
+    "result_cache", and the "interpret" backend.
+    """
+    for option in ['match_token', 'result_cache']:
+        if options.get(option) is not None:
+            raise ValueError(
+                f'The "{option}" option can\'t be saved in a module. Assign the'
+                f' "_{option}" variable of the module instead.'
+            )
+
+    if name is None:
+        name = os.path.splitext(os.path.basename(path))[0]
+
+    # Compile the grammar first, to make sure that it works.
+    grammar = Grammar(
+        description,
+        name=name,
+        include_source=True,
+        release=release,
+        **options,
+    )
+
+    with open(path, 'w') as f:
+        f.write(f'# Generated by sourcer {__version__}\n')
+        f.write(grammar._source_code)
+
+    # Put the ".pyc" files where the import system looks for them. The "-OO"
+    # file goes under its own name, so that Python only loads it when it runs
+    # with the "-OO" flag.
+    pyc_path = _compile(path, 0)
+    if release:
+        _compile(path, 2)
+    return path, pyc_path
+
+
+def _compile(path, optimize):
+    pyc_path = importlib.util.cache_from_source(
+        path, optimization=optimize or '')
+    py_compile.compile(path, cfile=pyc_path, doraise=True, optimize=optimize)
+    return pyc_path
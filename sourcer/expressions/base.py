@@ -1,6 +1,7 @@
 from collections import defaultdict
 from outsourcer import Code
-from .constants import POS, RESULT, STATUS, TEXT
+from . import utils
+from .constants import POS, TEXT
 
 
 class Expression:
@@ -11,6 +12,11 @@ class Expression:
     is_reference = False
     is_tagged = True
 
+    # The translator records the free variables of each expression before it
+    # compiles the grammar, so that "functionalize" doesn't have to walk the
+    # expression again.
+    _freevars = None
+
     def always_succeeds(self):
         return False
 
@@ -25,7 +31,7 @@ class Expression:
     def compile(self, out):
         if not out.has_available_blocks(self.num_blocks):
             func, params = self.functionalize(out, is_generator=False)
-            out += (STATUS, RESULT, POS) << func(*params)
+            utils.receive(out, func(*params))
             return
 
         if self.is_tagged:
@@ -39,8 +45,10 @@ class Expression:
         if self.is_tagged:
             out.add_comment(f'End {self.__class__.__name__}')
 
-    def error_func(self):
-        return Code(f'_raise_error{self.program_id}')
+    def error_id(self):
+        # Failed parses return the id of the expression that failed. The id is
+        # the expression's key in the table of error messages.
+        return self.program_id
 
     def operand_string(self):
         return str(self)
@@ -60,13 +68,17 @@ class Expression:
 
         with out.global_section():
             with out.DEF(name, params):
+                utils.begin_frame(out)
                 self.compile(out)
                 method = out.YIELD if is_generator else out.RETURN
-                method((STATUS, RESULT, POS))
+                method(utils.frame_result(out))
 
         return Code(name), [Code(x) for x in params]
 
     def freevars(self):
+        if self._freevars is not None:
+            return self._freevars
+
         counter = SymbolCounter()
         visit(self, counter.previsit, counter.postvisit)
         return counter.freevars
@@ -1,7 +1,8 @@
 from outsourcer import Code, Yield
 
+from . import utils
 from .base import Expression
-from .constants import CALL, POS, RESULT, STATUS
+from .constants import CALL, POS
 
 
 class Call(Expression):
@@ -31,7 +32,7 @@ class Call(Expression):
         _ParseFunction = Code('_ParseFunction')
         func = _ParseFunction(Code(self.func.resolved), tuple(args), tuple(kwargs))
         func = out.var('func', func)
-        out += (STATUS, RESULT, POS) << Yield((CALL, func, POS))
+        utils.receive(out, Yield((CALL, func, POS)))
 
 
 class KeywordArg:
@@ -33,7 +33,7 @@ class Choice(Expression):
         farthest_pos = out.var('farthest_pos') if needs_err else None
 
         if needs_err:
-            farthest_err = out.var('farthest_err', self.error_func())
+            farthest_err = out.var('farthest_err', self.error_id())
 
         if needs_err and needs_backtrack:
             out += backtrack << farthest_pos << POS
@@ -2,7 +2,7 @@ from outsourcer import Code
 
 from . import utils
 from .base import Expression
-from .constants import POS, RESULT, STATUS, TEXT
+from .constants import POS, TEXT
 from .seq import Seq
 
 
@@ -31,21 +31,32 @@ class Class(Expression):
 
     def _compile(self, out):
         parse_func = Code(f'{utils.implementation_name(self.name)}')
+        self.compile_interface(out, parse_func)
+        self.compile_parse_function(out)
+
+    def compile_parse_function(self, out):
+        parse_func = utils.implementation_name(self.name)
         field_names = [x.name for x in self.fields]
 
         with out.global_section():
-            with out.CLASS(self.name, 'Node'):
-                self._compile_class_body(out, parse_func, field_names)
-
             with out.DEF(parse_func, [str(TEXT), str(POS)] + (self.params or [])):
                 exprs = (x.expr for x in self.fields)
                 seq = Seq(*exprs, names=field_names, constructor=self.name)
                 seq.program_id = self.extra_id
+                utils.begin_frame(out)
                 seq.compile(out)
-                out.YIELD((STATUS, RESULT, POS))
+                out.YIELD(utils.frame_result(out))
+
+    def compile_interface(self, out, parse_func):
+        field_names = [x.name for x in self.fields]
+
+        with out.global_section():
+            with out.CLASS(self.name, 'Node'):
+                self._compile_class_body(out, parse_func, field_names)
 
     def _compile_class_body(self, out, parse_func, field_names):
-        out.add_docstring(str(self))
+        if not utils.is_release(out):
+            out.add_docstring(str(self))
         out += Code('_fields') << tuple(field_names)
         out.add_newline()
 
@@ -65,9 +76,23 @@ class Class(Expression):
                 args = tuple(Code(x) for x in self.params)
                 out += _closure << _ParseFunction(parse_func, args, {})
                 out.RETURN(Code(
-                    'lambda text, pos=0, fullparse=True:'
-                    ' _run(text, pos, _closure, fullparse)'
+                    'lambda text, pos=0, fullparse=True, **options:'
+                    ' _run(text, pos, _closure, fullparse, **options)'
                 ))
         else:
-            with out.DEF('parse', ['text', 'pos=0', 'fullparse=True']):
-                out.RETURN(Code(f'_run(text, pos, {parse_func}, fullparse)'))
+            with out.DEF('parse', ['text', 'pos=0', 'fullparse=True', '**options']):
+                out.RETURN(Code(f'_run(text, pos, {parse_func}, fullparse, **options)'))
+
+            find = Code(
+                f'_finditer(text, pos, {parse_func}, ',
+                utils.prefilter(out, self.name),
+                ')',
+            )
+
+            out += Code('@staticmethod')
+            with out.DEF('finditer', ['text', 'pos=0']):
+                out.RETURN(find)
+
+            out += Code('@staticmethod')
+            with out.DEF('search', ['text', 'pos=0']):
+                out.RETURN(Code('next(', find, ', None)'))
@@ -4,6 +4,8 @@ from outsourcer import Code
 BREAK = Code('break')
 CALL = 3
 
+EARLIEST = Code('_earliest')
+EXAMINED = Code('_examined')
 POS = Code('_pos')
 RESULT = Code('_result')
 STATUS = Code('_status')
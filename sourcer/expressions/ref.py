@@ -2,7 +2,7 @@ from outsourcer import Code, Yield
 
 from . import utils
 from .base import Expression
-from .constants import CALL, POS, RESULT, STATUS
+from .constants import CALL, POS
 
 
 class Ref(Expression):
@@ -23,7 +23,7 @@ class Ref(Expression):
         return self.name
 
     def _compile(self, out):
-        out += (STATUS, RESULT, POS) << Yield((CALL, Code(self.resolved), POS))
+        utils.receive(out, Yield((CALL, Code(self.resolved), POS)))
 
     def argumentize(self, out):
         return Code(self.resolved)
@@ -1,10 +1,14 @@
 import typing
 
-from outsourcer import Code
+from outsourcer import Code, Val
 
 from . import utils
 from .base import Expression
-from .constants import POS, RESULT, STATUS, TEXT
+from .constants import EARLIEST, EXAMINED, POS, RESULT, STATUS, TEXT
+from .regex_analysis import analyze
+
+
+UNBOUNDED = Code('_UNBOUNDED')
 
 
 class Regex(Expression):
@@ -18,6 +22,7 @@ class Regex(Expression):
         self.pattern = pattern
         self.skip_ignored = False
         self.ignore_case = ignore_case
+        self._analysis = None
 
     def __str__(self):
         pattern = self.pattern
@@ -31,29 +36,121 @@ class Regex(Expression):
     def can_partially_succeed(self):
         return False
 
-    def _match_func(self):
+    def _pattern(self):
         flags = '_IGNORECASE' if self.ignore_case else '0'
-        return f'_compile_re({self.pattern!r}, flags={flags}).match'
+        return f'_compile_re({self.pattern!r}, flags={flags})'
+
+    def _match_func(self):
+        return f'{self._pattern()}.match'
+
+    def _first_func(self):
+        info = self.analysis()
+        if info.first is None:
+            return None
+        return f'_compile_re({info.first!r}, flags={info.flags}).match'
+
+    def analysis(self):
+        if self._analysis is None:
+            self._analysis = analyze(self.pattern, self.ignore_case)
+        return self._analysis
 
     def precompile(self, out):
-        func = self._match_func()
-        if func not in out.state:
-            with out.global_section():
-                out.state[func] = out.var('matcher', Code(func))
+        if utils.lexer(out) is not None:
+            return
+
+        # Token grammars pass the compiled pattern to the token predicate.
+        if utils.parses_tokens(out):
+            funcs = [('pattern', self._pattern())]
+        else:
+            funcs = [('matcher', self._match_func())]
+
+        if utils.tracks_examined(out):
+            funcs.append(('first_matcher', self._first_func()))
+
+        # Name each matcher after its expression, so that rules compiled
+        # separately (in lazy grammars) can't clash.
+        for base_name, func in funcs:
+            if func is not None and func not in out.state:
+                name = Code(f'{base_name}{self.program_id}')
+                with out.global_section():
+                    out += name << Code(func)
+                out.state[func] = name
 
     def _compile(self, out):
+        token_lexer = utils.lexer(out)
+        if token_lexer is not None:
+            self._compile_token(out, token_lexer)
+            return
+
+        if utils.parses_tokens(out):
+            condition = utils.token_condition(out.state[self._pattern()])
+            utils.match_token(out, self, condition, TEXT[POS])
+            return
+
         func = out.state[self._match_func()]
         match = out.var('match', func(TEXT, POS))
         end = match.end()
 
+        # In incremental grammars, record how far the regex may have looked.
+        info = self.analysis() if utils.tracks_examined(out) else None
+
+        if info and info.width is not None:
+            utils.note_examined(out, POS + (info.width + 1))
+
+        # Lookbehinds and word boundaries look at the text before the match.
+        if info and info.lookbehind is None:
+            out += EARLIEST << Code('-', UNBOUNDED)
+        elif info and info.lookbehind:
+            utils.note_earliest(out, POS - info.lookbehind)
+
         with out.IF(match):
-            out += RESULT << match.group(0)
-            out += POS << (utils.skip_ignored(end) if self.skip_ignored else end)
+            if info and info.width is None:
+                if info.is_deterministic:
+                    utils.note_examined(out, end + 1)
+                else:
+                    out += EXAMINED << UNBOUNDED
+
+            if utils.returns_spans(out):
+                out += RESULT << utils.span(out, end)
+            else:
+                out += RESULT << match.group(0)
+            utils.advance(out, end, self.skip_ignored)
             out += STATUS << True
 
         with out.ELSE():
-            out += RESULT << self.error_func()
+            if info and info.width is None:
+                self._note_failure(out, info)
+
+            out += RESULT << self.error_id()
             out += STATUS << False
 
+    def _compile_token(self, out, token_lexer):
+        kind = TEXT.kinds[POS]
+        kinds = token_lexer.accepted_kinds(self)
+        if len(kinds) == 1:
+            condition = kind == kinds[0]
+        else:
+            condition = Code(kind, ' in ', Val(set(kinds)))
+
+        if utils.returns_spans(out):
+            value = utils.span(out, POS + 1)
+        else:
+            value = TEXT.text[TEXT.starts[POS] : TEXT.ends[POS]]
+        utils.match_token(out, self, condition, value)
+
+    def _note_failure(self, out, info):
+        # If the next character can't start a match, then the regex only
+        # looked at that one character.
+        first = self._first_func()
+        if first is None:
+            out += EXAMINED << UNBOUNDED
+            return
+
+        with out.IF(out.state[first](TEXT, POS)):
+            out += EXAMINED << UNBOUNDED
+
+        with out.ELSE():
+            utils.note_examined(out, POS + 1)
+
     def complain(self):
         return f'Expected to match the regular expression /{self.pattern}/'
@@ -0,0 +1,326 @@
+import re
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:
+    import sre_constants, sre_parse
+
+
+_CATEGORIES = {
+    sre_constants.CATEGORY_DIGIT: r'\d',
+    sre_constants.CATEGORY_NOT_DIGIT: r'\D',
+    sre_constants.CATEGORY_SPACE: r'\s',
+    sre_constants.CATEGORY_NOT_SPACE: r'\S',
+    sre_constants.CATEGORY_WORD: r'\w',
+    sre_constants.CATEGORY_NOT_WORD: r'\W',
+}
+
+_CHAR_OPS = (
+    sre_constants.ANY,
+    sre_constants.IN,
+    sre_constants.LITERAL,
+    sre_constants.NOT_LITERAL,
+)
+
+_REPEAT_OPS = (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT)
+
+# The largest explicit character set that we'll enumerate when we check if two
+# character sets overlap.
+_MAX_ENUMERATED_CHARS = 256
+
+
+class RegexInfo:
+    """Describes how much of the input a regular expression may examine.
+
+    - width: The maximum number of characters that the regex can examine, or
+      None if it is unbounded.
+    - first: A regex that matches a single character, if and only if the
+      character can begin a match. None if this can't be determined, or if the
+      regex can match an empty string.
+    - is_deterministic: True if the regex never needs to backtrack, meaning
+      that it examines at most one character past the end of its match.
+    - lookbehind: The maximum number of characters before the start of the
+      match that the regex can examine, or None if it is unbounded.
+    """
+
+    def __init__(self, width, first, flags, is_deterministic, lookbehind=None):
+        self.width = width
+        self.first = first
+        self.flags = flags
+        self.is_deterministic = is_deterministic
+        self.lookbehind = lookbehind
+
+
+def analyze(pattern, ignore_case=False):
+    flags = re.IGNORECASE if ignore_case else 0
+    try:
+        parsed = sre_parse.parse(pattern, flags)
+    except Exception:
+        return RegexInfo(None, None, flags, False)
+
+    # Python 3.8 renamed the "pattern" attribute to "state".
+    state = getattr(parsed, 'state', None) or parsed.pattern
+    flags = int(state.flags & ~(re.VERBOSE | re.DEBUG))
+    is_binary = isinstance(pattern, bytes)
+    items = list(parsed)
+    lookbehind = _lookbehind(items, bool(flags & re.MULTILINE))
+
+    width = None
+    if _has_known_width(items):
+        low, high = parsed.getwidth()
+        if high < sre_constants.MAXREPEAT:
+            width = high
+
+    try:
+        first, nullable = _first_set(items, is_binary, flags)
+        is_deterministic = _is_deterministic(items, [], is_binary, flags)
+    except _Unknown:
+        return RegexInfo(width, None, flags, False, lookbehind)
+
+    if nullable or not first:
+        first_pattern = None
+    else:
+        first_pattern = '|'.join(x.source for x in first)
+        if is_binary:
+            first_pattern = first_pattern.encode('latin-1')
+
+    return RegexInfo(width, first_pattern, flags, is_deterministic, lookbehind)
+
+
+class _Unknown(Exception):
+    """Raised when the analysis runs into a construct that it can't handle."""
+
+
+class _CharSet:
+    def __init__(self, source, chars, is_binary, flags):
+        self.source = source
+        self.chars = chars
+        self.is_binary = is_binary
+        pattern = source.encode('latin-1') if is_binary else source
+        self._match = re.compile(pattern, flags).match
+
+    def contains(self, char):
+        return self._match(bytes([char]) if self.is_binary else chr(char))
+
+    def is_disjoint(self, other):
+        if self.chars is not None:
+            return not any(other.contains(x) for x in self.chars)
+        if other.chars is not None:
+            return not any(self.contains(x) for x in other.chars)
+        return False
+
+
+def _escape(char):
+    return re.escape(chr(char))
+
+
+def _char_set(op, av, is_binary, flags):
+    if op == sre_constants.LITERAL:
+        return _CharSet(_escape(av), [av], is_binary, flags)
+
+    if op == sre_constants.NOT_LITERAL:
+        return _CharSet(f'[^{_escape(av)}]', None, is_binary, flags)
+
+    if op == sre_constants.ANY:
+        return _CharSet('.', None, is_binary, flags)
+
+    if op != sre_constants.IN:
+        raise _Unknown(op)
+
+    parts, chars, negate = [], [], False
+    for sub_op, sub_av in av:
+        if sub_op == sre_constants.NEGATE:
+            negate = True
+        elif sub_op == sre_constants.LITERAL:
+            parts.append(_escape(sub_av))
+            chars.append(sub_av)
+        elif sub_op == sre_constants.RANGE:
+            low, high = sub_av
+            parts.append(f'{_escape(low)}-{_escape(high)}')
+            chars.extend(range(low, high + 1))
+        elif sub_op == sre_constants.CATEGORY and sub_av in _CATEGORIES:
+            parts.append(_CATEGORIES[sub_av])
+            chars = None
+        else:
+            raise _Unknown(sub_op)
+
+        if chars is not None and len(chars) > _MAX_ENUMERATED_CHARS:
+            chars = None
+
+    source = f'[{"^" if negate else ""}{"".join(parts)}]'
+    return _CharSet(source, None if negate else chars, is_binary, flags)
+
+
+def _first_set(items, is_binary, flags):
+    """Returns a list of the character sets that can begin a match, and a flag
+    indicating if the items can match an empty string.
+    """
+    result = []
+    for op, av in items:
+        if op in _CHAR_OPS:
+            result.append(_char_set(op, av, is_binary, flags))
+            return result, False
+
+        if op == sre_constants.AT:
+            continue
+
+        if op == sre_constants.SUBPATTERN:
+            sub, nullable = _first_set(_subpattern_items(av), is_binary, flags)
+        elif op == sre_constants.BRANCH:
+            sub, nullable = [], False
+            for option in av[1]:
+                option_first, option_nullable = _first_set(option, is_binary, flags)
+                sub.extend(option_first)
+                nullable = nullable or option_nullable
+        elif op in _REPEAT_OPS:
+            low, high, body = av
+            sub, nullable = _first_set(body, is_binary, flags)
+            nullable = nullable or low == 0
+        else:
+            raise _Unknown(op)
+
+        result.extend(sub)
+        if not nullable:
+            return result, False
+
+    return result, True
+
+
+def _is_deterministic(items, follow, is_binary, flags):
+    """Returns True if the regex can always decide what to do by looking at the
+    next character. In that case, it never needs to backtrack.
+
+    The "follow" list contains the character sets that can appear after the
+    items.
+    """
+    items = list(items)
+    for index, (op, av) in enumerate(items):
+        if op in _CHAR_OPS or op == sre_constants.AT:
+            continue
+
+        rest, nullable = _first_set(items[index + 1:], is_binary, flags)
+        if nullable:
+            rest = rest + follow
+
+        if op == sre_constants.SUBPATTERN:
+            if not _is_deterministic(_subpattern_items(av), rest, is_binary, flags):
+                return False
+
+        elif op == sre_constants.BRANCH:
+            options = av[1]
+            firsts = []
+            for option in options:
+                option_first, option_nullable = _first_set(option, is_binary, flags)
+                if option_nullable:
+                    return False
+                if not _is_deterministic(option, rest, is_binary, flags):
+                    return False
+                firsts.append(option_first)
+
+            for i, a in enumerate(firsts):
+                for b in firsts[i + 1:]:
+                    if not _are_disjoint(a, b):
+                        return False
+
+        elif op in _REPEAT_OPS:
+            low, high, body = av
+            body_first, body_nullable = _first_set(body, is_binary, flags)
+            if body_nullable:
+                return False
+            if low != high and not _are_disjoint(body_first, rest):
+                return False
+            if not _is_deterministic(body, body_first + rest, is_binary, flags):
+                return False
+
+        else:
+            return False
+
+    return True
+
+
+def _are_disjoint(sets1, sets2):
+    return all(a.is_disjoint(b) for a in sets1 for b in sets2)
+
+
+def _subpattern_items(av):
+    # The last element is always the subpattern. Before that, Python 3.6 and
+    # later include the flags that the group adds or removes.
+    if len(av) == 4 and (av[1] or av[2]):
+        raise _Unknown('scoped flags')
+    return av[-1]
+
+
+def _has_known_width(items):
+    # Lookarounds and backreferences examine characters that don't count
+    # towards the width of the match, so we only trust the width of patterns
+    # that use the basic operators.
+    for op, av in items:
+        if op in _CHAR_OPS or op == sre_constants.AT:
+            continue
+        elif op == sre_constants.SUBPATTERN:
+            if not _has_known_width(av[-1]):
+                return False
+        elif op == sre_constants.BRANCH:
+            if not all(_has_known_width(x) for x in av[1]):
+                return False
+        elif op in _REPEAT_OPS:
+            if not _has_known_width(av[2]):
+                return False
+        else:
+            return False
+    return True
+
+
+# Word boundaries look at the character before the current position. Treat them
+# as unbounded, like variable lookbehinds.
+_BOUNDARY_CODES = tuple(
+    getattr(sre_constants, x) for x in [
+        'AT_BOUNDARY', 'AT_NON_BOUNDARY', 'AT_LOC_BOUNDARY',
+        'AT_LOC_NON_BOUNDARY', 'AT_UNI_BOUNDARY', 'AT_UNI_NON_BOUNDARY',
+    ]
+    if hasattr(sre_constants, x)
+)
+
+
+def _lookbehind(items, multiline):
+    """Returns the maximum number of characters before the start of the match
+    that the items can examine, or None if there's no limit. (In multiline
+    mode, "^" looks at the character before it.)
+    """
+    result = 0
+    for op, av in items:
+        if op == sre_constants.AT:
+            if av in _BOUNDARY_CODES:
+                return None
+            if av == sre_constants.AT_BEGINNING_LINE or (
+                multiline and av == sre_constants.AT_BEGINNING
+            ):
+                result = max(result, 1)
+            continue
+
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            direction, sub = av
+            if direction < 0:
+                low, high = sub.getwidth()
+                if low != high or high >= sre_constants.MAXREPEAT:
+                    return None
+                result = max(result, high)
+            subs = [sub]
+        elif op == sre_constants.SUBPATTERN:
+            subs = [av[-1]]
+        elif op == sre_constants.BRANCH:
+            subs = av[1]
+        elif op in _REPEAT_OPS:
+            subs = [av[2]]
+        elif op == sre_constants.GROUPREF_EXISTS:
+            subs = [x for x in av[1:] if x is not None]
+        else:
+            continue
+
+        for sub in subs:
+            width = _lookbehind(sub, multiline)
+            if width is None:
+                return None
+            result = max(result, width)
+
+    return result
@@ -2,7 +2,7 @@ from outsourcer import Code
 
 from . import utils
 from .base import Expression
-from .constants import POS, RESULT, STATUS, TEXT
+from .constants import POS, TEXT
 
 
 class Rule(Expression):
@@ -24,23 +24,41 @@ class Rule(Expression):
         return f'{self.name}{params} = {self.expr}'
 
     def _compile(self, out):
+        self.compile_parse_function(out)
+        self.compile_interface(out, Code(utils.implementation_name(self.name)))
+
+    def compile_parse_function(self, out):
         params = [str(TEXT), str(POS)] + (self.params or [])
         impl_name = utils.implementation_name(self.name)
+
+        with out.global_section():
+            with out.DEF(impl_name, params):
+                out.add_comment(f'Rule {self.name!r}')
+                utils.begin_frame(out)
+                self.expr.compile(out)
+                out.YIELD(utils.frame_result(out))
+
+    def compile_interface(self, out, parse_func):
         entry_name = f'_parse_{self.name}'
 
         definition = str(self)
         if '"""' in definition:
             definition = definition.replace('"""', '\\"\\"\\"')
 
+        find_name = f'_find_{self.name}'
+        prefilter = utils.prefilter(out, self.name)
+
         with out.global_section():
-            with out.DEF(impl_name, params):
-                out.add_comment(f'Rule {self.name!r}')
-                self.expr.compile(out)
-                out.YIELD((STATUS, RESULT, POS))
+            with out.DEF(entry_name, ['text', 'pos=0', 'fullparse=True', '**options']):
+                out.RETURN(Code(f'_run(text, pos, {parse_func}, fullparse, **options)'))
+
+            with out.DEF(find_name, ['text', 'pos=0']):
+                out.RETURN(Code(f'_finditer(text, pos, {parse_func}, ', prefilter, ')'))
 
-            with out.DEF(entry_name, ['text', 'pos=0', 'fullparse=True']):
-                out.RETURN(Code(f'_run(text, pos, {impl_name}, fullparse)'))
+            if utils.is_release(out):
+                out += Code(f'{self.name} = Rule({self.name!r}, {entry_name}, None, {find_name})')
+                return
 
             out += Code(f'{self.name} = Rule({self.name!r}, {entry_name}, """')
             out.extend(Code('    ', x) for x in definition.split('\n'))
-            out += Code('""")')
+            out += Code(f'""", {find_name})')
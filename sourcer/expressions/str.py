@@ -32,19 +32,33 @@ class Str(Expression):
     def _compile(self, out):
         if not self.value:
             out += STATUS << True
-            out += RESULT << ''
+            out += RESULT << (utils.span(out, POS) if utils.returns_spans(out) else '')
+            return
+
+        token_lexer = utils.lexer(out)
+        if token_lexer is not None:
+            kind = TEXT.kinds[POS]
+            condition = kind == token_lexer.kind(self)
+            value = utils.span(out, POS + 1) if utils.returns_spans(out) else self.value
+            utils.match_token(out, self, condition, value)
+            return
+
+        if utils.parses_tokens(out):
+            condition = utils.token_condition(self.value)
+            utils.match_token(out, self, condition, TEXT[POS])
             return
 
         value = out.var('value', self.value)
         end = out.var('end', POS + len(self.value))
+        utils.note_examined(out, end)
 
         with out.IF(TEXT[POS : end] == value):
-            out += RESULT << value
-            out += POS << (utils.skip_ignored(end) if self.skip_ignored else end)
+            out += RESULT << (utils.span(out, end) if utils.returns_spans(out) else value)
+            utils.advance(out, end, self.skip_ignored)
             out += STATUS << True
 
         with out.ELSE():
-            out += RESULT << self.error_func()
+            out += RESULT << self.error_id()
             out += STATUS << False
 
     def complain(self):
@@ -1,6 +1,6 @@
 from contextlib import contextmanager
 from outsourcer import Code, Yield
-from .constants import BREAK, CALL, STATUS
+from .constants import BREAK, CALL, EARLIEST, EXAMINED, POS, RESULT, STATUS, TEXT
 
 
 @contextmanager
@@ -37,8 +37,122 @@ def infix_str(expr1, op, expr2):
     return f'{arg1} {op} {arg2}'
 
 
-def skip_ignored(pos):
-    return Yield((CALL, Code(implementation_name('_ignored')), pos))[2]
+def _call_ignored(pos):
+    return Yield((CALL, Code(implementation_name('_ignored')), pos))
+
+
+def advance(out, end, skip_ignored):
+    if not skip_ignored:
+        out += POS << end
+    elif not tracks_examined(out):
+        out += POS << _call_ignored(end)[2]
+    else:
+        skipped = out.var('skipped', _call_ignored(end))
+        out += POS << skipped[2]
+        note_examined(out, skipped[3])
+        note_earliest(out, skipped[4])
+
+
+def lexer(out):
+    # In lexer mode, string literals and regular expressions match tokens.
+    return out.state.get('lexer')
+
+
+def parses_tokens(out):
+    # Token grammars parse a sequence of token objects instead of a string.
+    return out.state.get('tokens', False)
+
+
+def token_condition(expected):
+    # Checks the token at the current position with the grammar's predicate.
+    token = TEXT[POS]
+    in_bounds = POS < Code('len')(TEXT)
+    return Code('(', in_bounds, ' and ', Code('_match_token')(token, expected), ')')
+
+
+def match_token(out, expr, condition, value):
+    with out.IF(condition):
+        out += RESULT << value
+        advance(out, POS + 1, expr.skip_ignored)
+        out += STATUS << True
+
+    with out.ELSE():
+        out += RESULT << expr.error_id()
+        out += STATUS << False
+
+
+def returns_spans(out):
+    # In span mode, string literals and regular expressions return Span objects
+    # instead of copying the text.
+    return out.state.get('spans', False)
+
+
+def span(out, end):
+    # Returns the code for a Span of the text from the current position to
+    # "end". In lexer mode, the positions are token indexes, so "end" must be
+    # the current position or the next one.
+    if lexer(out) is None:
+        return Code('Span')(TEXT, POS, end)
+
+    start = TEXT.starts[POS]
+    return Code('Span')(TEXT.text, start, start if end is POS else TEXT.ends[POS])
+
+
+def is_release(out):
+    # Release builds leave out the comments and the definition strings.
+    return out.state.get('release', False)
+
+
+def tracks_examined(out):
+    # Incremental grammars record how far each parsing function looks ahead,
+    # and how far it looks behind.
+    return out.state.get('track_examined', False)
+
+
+def begin_frame(out):
+    if tracks_examined(out):
+        out += EXAMINED << POS
+        out += EARLIEST << POS
+
+
+def frame_result(out):
+    if tracks_examined(out):
+        return (STATUS, RESULT, POS, EXAMINED, EARLIEST)
+    else:
+        return (STATUS, RESULT, POS)
+
+
+def receive(out, value):
+    if tracks_examined(out):
+        examined, earliest = out.var('examined'), out.var('earliest')
+        out += (STATUS, RESULT, POS, examined, earliest) << value
+        note_examined(out, examined)
+        note_earliest(out, earliest)
+    else:
+        out += (STATUS, RESULT, POS) << value
+
+
+def note_examined(out, end):
+    if tracks_examined(out):
+        with out.IF(end > EXAMINED):
+            out += EXAMINED << end
+
+
+def note_earliest(out, start):
+    if tracks_examined(out):
+        with out.IF(start < EARLIEST):
+            out += EARLIEST << start
+
+
+def prefilter(out, name):
+    # Returns the code for a rule's search prefilter: a string, a compiled
+    # regex, or None.
+    info = out.state.get('prefilters', {}).get(name)
+    if info is None:
+        return Code('None')
+
+    is_literal, value = info
+    return Code(repr(value)) if is_literal else Code('_compile_re')(value)
 
 
 def implementation_name(name):
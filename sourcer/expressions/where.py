@@ -25,7 +25,7 @@ class Where(Expression):
                     out += RESULT << arg
 
                 with out.ELSE():
-                    out += RESULT << self.error_func()
+                    out += RESULT << self.error_id()
                     out += STATUS << False
 
     def complain(self):
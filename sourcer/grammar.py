@@ -2,11 +2,81 @@ import ast
 import re
 
 from . import expressions as ex
+from . import interpreter
+from . import lazy as lazy_module
 from . import meta
 from . import translator
 
 
-def Grammar(description, name='grammar', include_source=False):
+_backends = translator._backends + ('interpret',)
+
+
+def Grammar(
+        description,
+        name='grammar',
+        include_source=False,
+        incremental=False,
+        backend='generator',
+        compile_after=None,
+        compile_in_background=False,
+        lazy=False,
+        lexer=False,
+        tokens=False,
+        match_token=None,
+        release=False,
+        result_cache=None,
+        spans=False,
+    ):
+    if backend not in _backends:
+        raise ValueError(
+            f'Unknown backend: {backend!r}. Expected one of:'
+            f' {", ".join(repr(x) for x in _backends)}.'
+        )
+
+    if backend == 'interpret' and (incremental or include_source):
+        raise ValueError(
+            'The "interpret" backend does not support the "incremental" or'
+            ' "include_source" options.'
+        )
+
+    if compile_after is not None and backend != 'interpret':
+        raise ValueError(
+            'The "compile_after" option requires the "interpret" backend.'
+        )
+
+    if lazy and (backend != 'generator' or include_source):
+        raise ValueError(
+            'The "lazy" option requires the "generator" backend, and does not'
+            ' support the "include_source" option.'
+        )
+
+    if lexer and (incremental or lazy or backend == 'interpret'):
+        raise ValueError(
+            'The "lexer" option does not support the "incremental" or "lazy"'
+            ' options, or the "interpret" backend.'
+        )
+
+    if tokens and (lexer or incremental or lazy or backend == 'interpret'):
+        raise ValueError(
+            'The "tokens" option does not support the "lexer", "incremental",'
+            ' or "lazy" options, or the "interpret" backend.'
+        )
+
+    if match_token is not None and not tokens:
+        raise ValueError('The "match_token" option requires the "tokens" option.')
+
+    if spans and (tokens or incremental or lazy or backend == 'interpret'):
+        raise ValueError(
+            'The "spans" option does not support the "tokens", "incremental",'
+            ' or "lazy" options, or the "interpret" backend.'
+        )
+
+    if release and (lazy or backend == 'interpret'):
+        raise ValueError(
+            'The "release" option does not support the "lazy" option or the'
+            ' "interpret" backend.'
+        )
+
     # Parse the grammar description.
     raw = meta.parse(description)
 
@@ -20,13 +90,45 @@ def Grammar(description, name='grammar', include_source=False):
     # Convert the parse tree into a list of parsing expressions.
     nodes = meta.transform(raw, _create_parsing_expression)
 
-    # Generate and compile the souce code.
-    builder = translator.generate_source_code(docstring, nodes)
-    return builder.compile(
-        module_name=name,
-        docstring=docstring,
-        source_var='_source_code' if include_source else None,
-    )
+    if backend == 'interpret':
+        module = interpreter.create_module(
+            name,
+            docstring,
+            nodes,
+            compile_grammar=lambda: Grammar(description, name=name),
+            compile_after=compile_after,
+            compile_in_background=compile_in_background,
+        )
+    elif lazy:
+        module = lazy_module.create_module(
+            name, docstring, nodes, incremental=incremental,
+        )
+    else:
+        # Generate and compile the souce code.
+        builder = translator.generate_source_code(
+            docstring,
+            nodes,
+            incremental=incremental,
+            backend=backend,
+            lexer=lexer,
+            tokens=tokens,
+            release=release,
+            standalone=include_source,
+            spans=spans,
+        )
+        module = builder.compile(
+            module_name=name,
+            docstring=None if release else docstring,
+            source_var='_source_code' if include_source else None,
+        )
+
+    if match_token is not None:
+        module._match_token = match_token
+
+    if result_cache is not None:
+        module._result_cache = result_cache
+
+    return module
 
 
 def _create_parsing_expression(node):
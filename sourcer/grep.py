@@ -0,0 +1,228 @@
+"""Searches files for the matches of a grammar rule.
+
+This is the engine behind ``python -m sourcer grep``. Each worker process
+compiles the grammar once, and then searches one file at a time. In binary
+mode, plain files are searched through ``mmap``. Otherwise, each file is read,
+decoded, and searched in chunks of whole lines, so that large files don't have
+to fit in memory. Files that end with ".gz", ".bz2", or ".xz" are decompressed
+with the standard library.
+"""
+
+import bz2
+import codecs
+import gzip
+import json
+import lzma
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .grammar import Grammar
+
+
+_openers = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+
+class GrepMatch:
+    """A match of the rule in a file."""
+
+    def __init__(self, path, line, column, start, end, text):
+        self.path = path
+        self.line = line
+        self.column = column
+        self.start = start
+        self.end = end
+        self.text = text
+
+    def __repr__(self):
+        return (
+            f'GrepMatch(path={self.path!r}, line={self.line!r},'
+            f' column={self.column!r}, start={self.start!r}, end={self.end!r},'
+            f' text={self.text!r})'
+        )
+
+    def to_json(self):
+        return json.dumps({
+            'path': self.path,
+            'line': self.line,
+            'column': self.column,
+            'start': self.start,
+            'end': self.end,
+            'text': self.text,
+        })
+
+    def to_text(self):
+        # Keep each match on one line of output.
+        text = self.text.replace('\\', '\\\\').replace('\n', '\\n')
+        return f'{self.path}:{self.line}:{self.column}: {text}'
+
+
+def expand_paths(paths):
+    """Yields the files in the paths. Directories are searched recursively, in
+    sorted order.
+    """
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                yield os.path.join(root, name)
+
+
+def grep(description, rule_name, paths, jobs=None, encoding='utf-8', binary=False):
+    """Searches the files for the rule's matches, and yields a tuple of
+    (path, matches, error) for each file, in order. If the file couldn't be
+    searched, then "matches" is None and "error" is a message. Otherwise,
+    "matches" is a list of GrepMatch objects and "error" is None.
+
+    - jobs: The number of worker processes. If 1, then search in this process.
+      If None, then use one process for each CPU.
+    - encoding: The encoding of the files.
+    - binary: If True, search the bytes of each file instead of decoding it.
+      (The grammar must use byte strings.)
+    """
+    # Check the grammar and the rule before starting any workers.
+    searcher = _Searcher(description, rule_name, encoding, binary)
+    initargs = (description, rule_name, encoding, binary)
+    return _results(searcher, initargs, list(expand_paths(paths)), jobs)
+
+
+def _results(searcher, initargs, files, jobs):
+    if jobs == 1 or len(files) <= 1:
+        for path in files:
+            yield (path, *_search_file(path, searcher))
+        return
+
+    with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=initargs) as pool:
+        for path, result in zip(files, pool.map(_search_file, files)):
+            yield (path, *result)
+
+
+class _Searcher:
+    def __init__(self, description, rule_name, encoding, binary):
+        grammar = Grammar(description)
+        rule = getattr(grammar, rule_name, None)
+        if not hasattr(rule, 'finditer'):
+            raise ValueError(
+                f'The grammar does not have a rule or class named {rule_name!r}'
+                ' that can be searched.'
+            )
+        self.rule = rule
+        self.encoding = encoding
+        self.binary = binary
+
+    def search(self, path):
+        opener = _openers.get(os.path.splitext(path)[1])
+        if opener is not None:
+            with opener(path, 'rb') as f:
+                return self._search_chunks(path, f)
+
+        with open(path, 'rb') as f:
+            if not self.binary:
+                return self._search_chunks(path, f)
+
+            if os.fstat(f.fileno()).st_size == 0:
+                return self._search_chunks(path, f)
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return [
+                    self._grep_match(path, data, x, 0, 0)
+                    for x in self.rule.finditer(data)
+                ]
+
+    def _search_chunks(self, path, f):
+        # Search one chunk of whole lines at a time. (A chunk may be larger
+        # than _CHUNK_SIZE if it ends with a long line.) Each search also sees
+        # the start of the next chunk, up to _OVERLAP bytes, so that matches
+        # may end past the end of the chunk. Only the matches that start in the
+        # chunk count. The next search starts where the last match ended.
+        result = []
+        offset, line, resume = 0, 1, 0
+        data = _read_lines(f)
+
+        while data:
+            following = _read_lines(f)
+            chunk = self._decode(data)
+            text = chunk + self._decode(_lookahead(following), final=False)
+
+            for match in self.rule.finditer(text, max(0, resume - offset)):
+                if match.start >= len(chunk):
+                    break
+                result.append(self._grep_match(path, text, match, offset, line - 1))
+                resume = offset + match.end
+
+            line += chunk.count(b'\n' if self.binary else '\n')
+            offset += len(chunk)
+            data = following
+
+        return result
+
+    def _decode(self, data, final=True):
+        if self.binary:
+            return data
+        if final:
+            return str(data, self.encoding, 'replace')
+
+        # The data may end in the middle of a character. Leave out the partial
+        # character, instead of replacing it.
+        decoder = codecs.getincrementaldecoder(self.encoding)('replace')
+        return decoder.decode(data)
+
+    def _grep_match(self, path, text, match, offset, lines_before):
+        matched = text[match.start : match.end].rstrip()
+        if self.binary:
+            matched = matched.decode(self.encoding, 'replace')
+
+        return GrepMatch(
+            path,
+            lines_before + match.line,
+            match.column,
+            offset + match.start,
+            offset + match.end,
+            matched,
+        )
+
+
+# The number of bytes to read and search at a time, and the number of bytes
+# after each chunk that a match may reach into.
+_CHUNK_SIZE = 1 << 20
+_OVERLAP = 1 << 16
+
+
+def _read_lines(f):
+    # Reads whole lines, until it has at least _CHUNK_SIZE bytes or it reaches
+    # the end of the file.
+    return b''.join(f.readlines(_CHUNK_SIZE))
+
+
+def _lookahead(data):
+    # Returns the lines at the start of the data, up to _OVERLAP bytes. If the
+    # first line is longer than that, returns the first _OVERLAP bytes of it.
+    if len(data) <= _OVERLAP:
+        return data
+    end = data.rfind(b'\n', 0, _OVERLAP) + 1
+    return data[:end or _OVERLAP]
+
+
+# Each worker process compiles the grammar once, when it starts.
+_searcher = None
+
+
+def _init_worker(description, rule_name, encoding, binary):
+    global _searcher
+    _searcher = _Searcher(description, rule_name, encoding, binary)
+
+
+def _search_file(path, searcher=None):
+    # Send back the error as a message, in case the exception can't be pickled.
+    try:
+        return (searcher or _searcher).search(path), None
+    except Exception as exc:
+        return None, str(exc) or type(exc).__name__
@@ -0,0 +1,886 @@
+"""Runs a grammar by walking its parsing expressions, instead of generating and
+compiling Python code.
+
+Each expression becomes a generator function that takes the text, the position,
+and a dict of local variables. It follows the same protocol as the generated
+code: to call a rule, it yields ``(CALL, func, pos)`` and receives the result,
+and when it's done, it returns a tuple of ``(status, result, pos)``. So an
+interpreted grammar shares the runtime of a compiled grammar -- the trampoline,
+the memo policies, the budgets, and the error messages are all the same.
+
+The module that ``create_module`` returns has the same interface as a compiled
+grammar module. Optionally, it can switch itself over to compiled code after a
+number of parses. When it switches, it shares its classes and helper functions
+with the compiled code, so results and exceptions look the same before and
+after the switch.
+"""
+
+import ast
+import re
+import textwrap
+import threading
+import types
+
+from . import expressions as ex
+from . import prefilter
+from . import runtime
+from . import translator
+from .expressions.constants import CALL
+
+
+def create_module(
+        name,
+        docstring,
+        nodes,
+        compile_grammar,
+        compile_after=None,
+        compile_in_background=False,
+    ):
+    """Returns a module that parses the grammar with an interpreter.
+
+    - compile_grammar: A function that compiles the grammar into a regular
+      grammar module, for when the interpreter switches to compiled code.
+    - compile_after: The number of parses after which to switch to compiled
+      code. If None, then the module always uses the interpreter.
+    - compile_in_background: If True, then compile the grammar in a background
+      thread, and switch once it's ready.
+    """
+    module = types.ModuleType(name, doc=f'\n{docstring}\n')
+    ns = module.__dict__
+    main_code = _runtime_code()
+
+    sections, rules, default_rule, has_ignored = translator.collect_rules(nodes)
+
+    # Run the Python sections in the same order as a generated module does.
+    ns.update((x, getattr(runtime, x)) for x in runtime.__all__)
+    for section in sections:
+        exec(compile(section.source_code, f'<{name}>', 'exec'), ns)
+    exec(main_code, ns)
+
+    interpreter = _Interpreter(ns)
+    translator.prepare_rules(rules, has_ignored, interpreter.add_error)
+
+    interpreter.prefilters = prefilter.first_patterns(rules)
+
+    for rule in rules:
+        interpreter.define(rule)
+
+    start_name = ex.implementation_name(default_rule.name)
+    ns['_start'] = ns[start_name]
+    ns['_compiled'] = threading.Event()
+
+    if compile_after is not None:
+        _schedule_compilation(
+            ns, start_name, compile_grammar, compile_after, compile_in_background,
+        )
+
+    return module
+
+
+_runtime = None
+
+
+def _runtime_code():
+    # Compile the module's part of the runtime once, and share the code object
+    # across grammars.
+    global _runtime
+    if _runtime is None:
+        source = translator.runtime_source('_start')
+        _runtime = compile(source, '<sourcer.interpreter>', 'exec')
+    return _runtime
+
+
+def _schedule_compilation(ns, start_name, compile_grammar, compile_after, in_background):
+    run = ns['_run']
+    lock = threading.Lock()
+    count = 0
+    started = False
+
+    def switch():
+        compiled = vars(compile_grammar())
+
+        # Let the compiled code use our classes, exceptions, and helper
+        # functions. Keep its own parsing functions.
+        for key, value in ns.items():
+            if not key.startswith(('__', '_try_', '_parse_', '_start')):
+                compiled[key] = value
+
+        for key, value in compiled.items():
+            if key.startswith('_try_'):
+                ns[key] = value
+
+        ns['_start'] = compiled[start_name]
+        ns['_compiled'].set()
+
+    def start():
+        if in_background:
+            threading.Thread(target=switch, daemon=True).start()
+        else:
+            switch()
+
+    def counting_run(*args, **kwargs):
+        nonlocal count, started
+        try:
+            return run(*args, **kwargs)
+        finally:
+            with lock:
+                count += 1
+                is_ready = not started and count >= compile_after
+                if is_ready:
+                    started = True
+                    ns['_run'] = run
+            if is_ready:
+                start()
+
+    if compile_after <= 0:
+        started = True
+        start()
+    else:
+        ns['_run'] = counting_run
+
+
+class _Interpreter:
+    def __init__(self, ns):
+        self.ns = ns
+        self.prefilters = {}
+
+    def add_error(self, rule, expr, delegate):
+        if hasattr(expr, 'complain') and not expr.always_succeeds():
+            entry = (rule.name, str(delegate), expr.complain())
+            self.ns['_errors'][expr.error_id()] = entry
+
+    def define(self, rule):
+        ns = self.ns
+        params = list(rule.params or [])
+        impl_name = ex.implementation_name(rule.name)
+
+        find = _find_function(ns, impl_name, self.prefilters.get(rule.name))
+
+        if isinstance(rule, ex.Class):
+            exprs = [x.expr for x in rule.fields]
+            names = [x.name for x in rule.fields]
+            run = self._sequence(exprs, names, rule.name, params)
+            ns[rule.name] = _create_class(ns, rule, impl_name, find)
+        else:
+            run = self.build(rule.expr, params)
+            entry_name = f'_parse_{rule.name}'
+            ns[entry_name] = _entry_function(ns, entry_name, impl_name)
+            ns[rule.name] = ns['Rule'](
+                rule.name, ns[entry_name], _definition(rule), find,
+            )
+
+        ns[impl_name] = _parse_function(impl_name, params, run)
+
+    def build(self, expr, scope):
+        """Returns a generator function that runs the expression. The "scope"
+        is the list of local variables that the expression can see.
+        """
+        builder = getattr(self, f'_build_{expr.__class__.__name__}', None)
+        if builder is None:
+            raise Exception(f'Unexpected expression: {expr!r}')
+        return builder(expr, scope)
+
+    def _python(self, source_code, scope):
+        # Compile the Python expression as a lambda that takes the local
+        # variables, so that any nested lambdas can close over them. Don't
+        # compile it until it's needed.
+        names = tuple(dict.fromkeys(scope))
+        ns = self.ns
+        func = None
+
+        def evaluate(env):
+            nonlocal func
+            if func is None:
+                func = eval(f'lambda {", ".join(names)}: (\n{source_code}\n)', ns)
+            return func(*[env[x] for x in names])
+
+        return evaluate
+
+    def _reference(self, ref, scope):
+        ns = self.ns
+        name = ref.name
+
+        if ref.is_local:
+            return lambda env: env[name]
+
+        if ref._resolved is not None:
+            resolved = ref._resolved
+            return lambda env: ns[resolved]
+
+        return self._python(name, scope)
+
+    def _argument(self, expr, scope):
+        if isinstance(expr, ex.Ref):
+            return self._reference(expr, scope)
+
+        if isinstance(expr, ex.PythonExpression):
+            return self._python(expr.source_code, scope)
+
+        func = self._function(expr)
+        if isinstance(expr, ex.Str):
+            wrap, value = self.ns['_wrap_string_literal'], expr.value
+            return lambda env: wrap(value, func(env))
+
+        return func
+
+    def _function(self, expr):
+        # Turn the expression into a parsing function of its own. If it has free
+        # variables, then bind them with a _ParseFunction.
+        names = sorted(expr.freevars())
+        func = _parse_function(
+            f'_parse_function_{expr.program_id}', names, self.build(expr, names),
+        )
+
+        if not names:
+            return lambda env: func
+
+        ParseFunction = self.ns['_ParseFunction']
+        return lambda env: ParseFunction(func, tuple(env[x] for x in names), ())
+
+    def _length(self, value, scope):
+        if value is None:
+            return None
+
+        if isinstance(value, str):
+            return self._python(value, scope)
+
+        return lambda env: value
+
+    def _sequence(self, exprs, names, constructor, scope):
+        ns = self.ns
+        scope = list(scope)
+        steps = []
+        for name, expr in zip(names, exprs):
+            steps.append((name, self.build(expr, scope)))
+            if name is not None:
+                scope = scope + [name]
+
+        def run(text, pos, env):
+            start_pos = pos
+            items = []
+            for name, step in steps:
+                status, result, pos = yield from step(text, pos, env)
+                if not status:
+                    return (status, result, pos)
+                if name is not None:
+                    env[name] = result
+                items.append(result)
+
+            if constructor is None:
+                return (True, items, pos)
+
+            result = ns[constructor](*items)
+            result._position_info = (start_pos, pos)
+            return (True, result, pos)
+
+        return run
+
+    def _build_Apply(self, expr, scope):
+        first = self.build(expr.expr1, scope)
+        second = self.build(expr.expr2, scope)
+        apply_left = expr.apply_left
+
+        def run(text, pos, env):
+            status, result, pos = yield from first(text, pos, env)
+            if not status:
+                return (status, result, pos)
+
+            value = result
+            status, result, pos = yield from second(text, pos, env)
+            if status:
+                result = value(result) if apply_left else result(value)
+            return (status, result, pos)
+
+        return run
+
+    def _build_Call(self, expr, scope):
+        func = self._reference(expr.func, scope)
+        args, kwargs = [], []
+
+        for arg in expr.args:
+            if isinstance(arg, ex.KeywordArg):
+                kwargs.append((arg.name, self._argument(arg.expr, scope)))
+            else:
+                args.append(self._argument(arg, scope))
+
+        ParseFunction = self.ns['_ParseFunction']
+
+        def run(text, pos, env):
+            call = ParseFunction(
+                func(env),
+                tuple(x(env) for x in args),
+                tuple((k, v(env)) for k, v in kwargs),
+            )
+            return (yield (CALL, call, pos))
+
+        return run
+
+    def _build_Choice(self, expr, scope):
+        options = [
+            (self.build(x, scope), x.can_partially_succeed(), isinstance(x, ex.Fail))
+            for x in expr.exprs
+        ]
+        needs_err = not expr.always_succeeds()
+        error = expr.error_id()
+        last = len(options) - 1
+
+        def run(text, pos, env):
+            backtrack = farthest_pos = pos
+            farthest_err = error
+
+            for i, (option, is_partial, is_fail) in enumerate(options):
+                status, result, pos = yield from option(text, pos, env)
+                if status:
+                    return (status, result, pos)
+
+                if needs_err and is_partial:
+                    if farthest_pos <= pos if is_fail else farthest_pos < pos:
+                        farthest_pos = pos
+                        farthest_err = result
+
+                if i < last and is_partial:
+                    pos = backtrack
+
+            if needs_err:
+                return (status, farthest_err, farthest_pos)
+            return (status, result, pos)
+
+        return run
+
+    def _build_Discard(self, expr, scope):
+        first = self.build(expr.expr1, scope)
+        second = self.build(expr.expr2, scope)
+        discard_left = expr.discard_left
+
+        def run(text, pos, env):
+            status, result, pos = yield from first(text, pos, env)
+            if not status:
+                return (status, result, pos)
+
+            if discard_left:
+                return (yield from second(text, pos, env))
+
+            value = result
+            status, result, pos = yield from second(text, pos, env)
+            if status:
+                result = value
+            return (status, result, pos)
+
+        return run
+
+    def _build_Expect(self, expr, scope):
+        inner = self.build(expr.expr, scope)
+
+        def run(text, pos, env):
+            backtrack = pos
+            status, result, pos = yield from inner(text, pos, env)
+            if status:
+                pos = backtrack
+            return (status, result, pos)
+
+        return run
+
+    def _build_ExpectNot(self, expr, scope):
+        inner = self.build(expr.expr, scope)
+        error = expr.error_id()
+
+        def run(text, pos, env):
+            status, result, _ = yield from inner(text, pos, env)
+            if status:
+                return (False, error, pos)
+            return (True, None, pos)
+
+        return run
+
+    def _build_Fail(self, expr, scope):
+        error = expr.error_id()
+
+        # The "yield" makes this a generator function, like the others.
+        def run(text, pos, env):
+            return (False, error, pos)
+            yield
+
+        return run
+
+    def _build_Let(self, expr, scope):
+        value = self.build(expr.expr, scope)
+        body = self.build(expr.body, list(scope) + [expr.name])
+        name = expr.name
+
+        def run(text, pos, env):
+            status, result, pos = yield from value(text, pos, env)
+            if not status:
+                return (status, result, pos)
+            env[name] = result
+            return (yield from body(text, pos, env))
+
+        return run
+
+    def _build_List(self, expr, scope):
+        inner = self.build(expr.expr, scope)
+        is_partial = expr.expr.can_partially_succeed()
+        min_len = self._length(expr.min_len, scope)
+        max_len = self._length(expr.max_len, scope)
+        always_succeeds = expr.always_succeeds()
+        needs_one = expr.min_len == 1 or expr.min_len == '1'
+
+        def run(text, pos, env):
+            staging = []
+            limit = None if max_len is None else max_len(env)
+
+            while True:
+                checkpoint = pos
+                status, result, pos = yield from inner(text, pos, env)
+                if not status:
+                    if is_partial:
+                        pos = checkpoint
+                    break
+
+                staging.append(result)
+                if limit is not None and len(staging) == limit:
+                    break
+
+            if always_succeeds:
+                return (True, staging, pos)
+
+            if staging if needs_one else len(staging) >= min_len(env):
+                return (True, staging, pos)
+
+            return (status, result, pos)
+
+        return run
+
+    def _build_OperatorPrecedence(self, expr, scope):
+        prev = expr.atom
+        for rule in expr.rules:
+            rule.operand = prev
+            prev = rule
+        return self.build(prev, scope)
+
+    def _build_LeftAssoc(self, expr, scope):
+        ns = self.ns
+        operand = self.build(expr.operand, scope)
+        operators = self.build(expr.operators, scope)
+        is_nonassoc = expr.associativity is None
+
+        def run(text, pos, env):
+            is_first = True
+            staging = operator = None
+            checkpoint = pos
+
+            while True:
+                status, result, pos = yield from operand(text, pos, env)
+                if not status:
+                    break
+
+                checkpoint = pos
+                if is_first:
+                    is_first = False
+                    staging = result
+                else:
+                    staging = ns['Infix'](staging, operator, result)
+                    if is_nonassoc:
+                        break
+
+                status, result, pos = yield from operators(text, pos, env)
+                if not status:
+                    break
+                operator = result
+
+            if not is_first:
+                return (True, staging, checkpoint)
+            return (status, result, pos)
+
+        return run
+
+    _build_NonAssoc = _build_LeftAssoc
+
+    def _build_RightAssoc(self, expr, scope):
+        ns = self.ns
+        operand = self.build(expr.operand, scope)
+        operators = self.build(expr.operators, scope)
+
+        def run(text, pos, env):
+            backup = prev = staging = checkpoint = None
+
+            while True:
+                status, result, pos = yield from operand(text, pos, env)
+                if not status:
+                    if prev:
+                        if backup:
+                            backup.right = prev.left
+                            result = staging
+                        else:
+                            result = prev.left
+                        pos = checkpoint
+                        status = True
+                    break
+
+                checkpoint = pos
+                value = result
+
+                status, result, pos = yield from operators(text, pos, env)
+                if not status:
+                    if prev:
+                        prev.right = value
+                        result = staging
+                    else:
+                        result = value
+                    pos = checkpoint
+                    status = True
+                    break
+
+                step = ns['Infix'](value, result, None)
+                if prev:
+                    backup = prev
+                    backup.right = prev = step
+                else:
+                    staging = prev = step
+
+            return (status, result, pos)
+
+        return run
+
+    def _build_Postfix(self, expr, scope):
+        ns = self.ns
+        operand = self.build(expr.operand, scope)
+        operators = self.build(expr.operators, scope)
+
+        def run(text, pos, env):
+            status, result, pos = yield from operand(text, pos, env)
+            if not status:
+                return (status, result, pos)
+
+            staging, checkpoint = result, pos
+            while True:
+                status, result, pos = yield from operators(text, pos, env)
+                if not status:
+                    return (True, staging, checkpoint)
+                staging = ns['Postfix'](staging, result)
+                checkpoint = pos
+
+        return run
+
+    def _build_Prefix(self, expr, scope):
+        ns = self.ns
+        operand = self.build(expr.operand, scope)
+        operators = self.build(expr.operators, scope)
+
+        def run(text, pos, env):
+            prev = staging = None
+            checkpoint = pos
+
+            while True:
+                status, result, pos = yield from operators(text, pos, env)
+                if not status:
+                    pos = checkpoint
+                    break
+
+                checkpoint = pos
+                step = ns['Prefix'](result, None)
+                if prev is None:
+                    prev = staging = step
+                else:
+                    prev.right = step
+                    prev = step
+
+            status, result, pos = yield from operand(text, pos, env)
+            if status and prev:
+                prev.right = result
+                result = staging
+            return (status, result, pos)
+
+        return run
+
+    def _build_Opt(self, expr, scope):
+        inner = self.build(expr.expr, scope)
+
+        def run(text, pos, env):
+            backtrack = pos
+            status, result, pos = yield from inner(text, pos, env)
+            if not status:
+                return (True, None, backtrack)
+            return (status, result, pos)
+
+        return run
+
+    def _build_PythonExpression(self, expr, scope):
+        evaluate = self._python(expr.source_code, scope)
+
+        def run(text, pos, env):
+            return (True, evaluate(env), pos)
+            yield
+
+        return run
+
+    def _build_Ref(self, expr, scope):
+        if expr._resolved is not None and not expr.is_local:
+            ns, resolved = self.ns, expr._resolved
+
+            def run(text, pos, env):
+                return (yield (CALL, ns[resolved], pos))
+        else:
+            func = self._reference(expr, scope)
+
+            def run(text, pos, env):
+                return (yield (CALL, func(env), pos))
+
+        return run
+
+    def _build_Regex(self, expr, scope):
+        flags = re.IGNORECASE if expr.ignore_case else 0
+        match = re.compile(expr.pattern, flags=flags).match
+        error = expr.error_id()
+
+        if expr.skip_ignored:
+            ns = self.ns
+
+            def run(text, pos, env):
+                m = match(text, pos)
+                if not m:
+                    return (False, error, pos)
+                skipped = yield (CALL, ns['_try__ignored'], m.end())
+                return (True, m.group(0), skipped[2])
+        else:
+            def run(text, pos, env):
+                m = match(text, pos)
+                if not m:
+                    return (False, error, pos)
+                return (True, m.group(0), m.end())
+                yield
+
+        return run
+
+    def _build_Sep(self, expr, scope):
+        item = self.build(expr.expr, scope)
+        separator = self.build(expr.separator, scope)
+        discard_separators = expr.discard_separators
+        allow_trailer = expr.allow_trailer
+        allow_empty = expr.allow_empty
+
+        def run(text, pos, env):
+            staging = []
+            checkpoint = pos
+
+            while True:
+                status, result, pos = yield from item(text, pos, env)
+                if not status:
+                    if not discard_separators and not allow_trailer and staging:
+                        staging.pop()
+                    break
+
+                staging.append(result)
+                checkpoint = pos
+
+                status, result, pos = yield from separator(text, pos, env)
+                if not status:
+                    break
+
+                if not discard_separators:
+                    staging.append(result)
+
+                if allow_trailer:
+                    checkpoint = pos
+
+            if allow_empty or staging:
+                return (True, staging, checkpoint)
+            return (status, result, pos)
+
+        return run
+
+    def _build_Seq(self, expr, scope):
+        constructor = None if expr.constructor is None else str(expr.constructor)
+        return self._sequence(expr.exprs, expr.names, constructor, scope)
+
+    def _build_Skip(self, expr, scope):
+        steps = [
+            (self.build(x, scope), x.always_succeeds(), x.can_partially_succeed())
+            for x in expr.exprs
+        ]
+
+        def run(text, pos, env):
+            while True:
+                checkpoint = pos
+                for step, always_succeeds, is_partial in steps:
+                    status, result, pos = yield from step(text, pos, env)
+                    if always_succeeds:
+                        if pos != checkpoint:
+                            break
+                        continue
+
+                    if status:
+                        break
+
+                    if is_partial:
+                        pos = checkpoint
+                else:
+                    return (True, None, pos)
+
+        return run
+
+    def _build_Str(self, expr, scope):
+        value = expr.value
+        end_offset = len(value)
+
+        if not value:
+            def run(text, pos, env):
+                return (True, '', pos)
+                yield
+            return run
+
+        error = expr.error_id()
+
+        if expr.skip_ignored:
+            ns = self.ns
+
+            def run(text, pos, env):
+                end = pos + end_offset
+                if text[pos:end] != value:
+                    return (False, error, pos)
+                skipped = yield (CALL, ns['_try__ignored'], end)
+                return (True, value, skipped[2])
+        else:
+            def run(text, pos, env):
+                end = pos + end_offset
+                if text[pos:end] != value:
+                    return (False, error, pos)
+                return (True, value, end)
+                yield
+
+        return run
+
+    def _build_Where(self, expr, scope):
+        inner = self.build(expr.expr, scope)
+        predicate = self.build(expr.predicate, scope)
+        error = expr.error_id()
+
+        def run(text, pos, env):
+            status, result, pos = yield from inner(text, pos, env)
+            if not status:
+                return (status, result, pos)
+
+            value = result
+            status, result, pos = yield from predicate(text, pos, env)
+            if not status:
+                return (status, result, pos)
+
+            if result(value):
+                return (True, value, pos)
+            return (False, error, pos)
+
+        return run
+
+
+def _parse_function(name, params, run):
+    if params:
+        def parse_function(text, pos, *args, **kwargs):
+            env = _bind_arguments(name, params, args, kwargs)
+            result = yield from run(text, pos, env)
+            yield result
+    else:
+        def parse_function(text, pos):
+            result = yield from run(text, pos, {})
+            yield result
+
+    parse_function.__name__ = parse_function.__qualname__ = name
+    return parse_function
+
+
+def _entry_function(ns, name, impl_name):
+    def parse(text, pos=0, fullparse=True, **options):
+        return ns['_run'](text, pos, ns[impl_name], fullparse, **options)
+
+    parse.__name__ = parse.__qualname__ = name
+    return parse
+
+
+def _find_function(ns, impl_name, info):
+    # Compile the prefilter up front, like a generated module does.
+    prefilter = None
+    if info is not None:
+        is_literal, value = info
+        prefilter = value if is_literal else re.compile(value)
+
+    def find(text, pos=0):
+        return ns['_finditer'](text, pos, ns[impl_name], prefilter)
+
+    return find
+
+
+def _bind_arguments(func_name, params, args, kwargs):
+    if len(args) > len(params):
+        raise TypeError(
+            f'{func_name}() takes {len(params)} positional arguments but'
+            f' {len(args)} were given'
+        )
+
+    env = dict(zip(params, args))
+    for key, value in kwargs.items():
+        if key not in params:
+            raise TypeError(
+                f'{func_name}() got an unexpected keyword argument {key!r}'
+            )
+        if key in env:
+            raise TypeError(
+                f'{func_name}() got multiple values for argument {key!r}'
+            )
+        env[key] = value
+
+    if len(env) < len(params):
+        missing = ', '.join(repr(x) for x in params if x not in env)
+        raise TypeError(f'{func_name}() missing required arguments: {missing}')
+
+    return env
+
+
+def _create_class(ns, rule, impl_name, find):
+    name = rule.name
+    fields = tuple(x.name for x in rule.fields)
+    params = rule.params
+
+    def __init__(self, *args, **kwargs):
+        values = _bind_arguments('__init__', fields, args, kwargs)
+        for field in fields:
+            setattr(self, field, values[field])
+        self._position_info = None
+
+    def __repr__(self):
+        values = ', '.join(f'{x}={getattr(self, x)!r}' for x in fields)
+        return f'{name}({values})'
+
+    if params:
+        def parse(*args, **kwargs):
+            values = _bind_arguments('parse', params, args, kwargs)
+            closure = ns['_ParseFunction'](
+                ns[impl_name], tuple(values[x] for x in params), {},
+            )
+            return lambda text, pos=0, fullparse=True, **options: (
+                ns['_run'](text, pos, closure, fullparse, **options)
+            )
+    else:
+        def parse(text, pos=0, fullparse=True, **options):
+            return ns['_run'](text, pos, ns[impl_name], fullparse, **options)
+
+    body = {
+        '__module__': ns['__name__'],
+        '__doc__': '\n' + textwrap.indent(str(rule), '    ') + '\n    ',
+        '_fields': fields,
+        '__init__': __init__,
+        '__repr__': __repr__,
+        'parse': staticmethod(parse),
+    }
+
+    if not params:
+        body['finditer'] = staticmethod(find)
+        body['search'] = staticmethod(lambda text, pos=0: next(find(text, pos), None))
+
+    return type(name, (ns['Node'],), body)
+
+
+def _definition(rule):
+    # Match the definition string of a generated module, which is a Python
+    # string literal.
+    definition = str(rule).replace('"""', '\\"\\"\\"')
+    lines = ''.join(f'    {x}\n' for x in definition.split('\n'))
+    return ast.literal_eval(f'"""\n{lines}"""')
+
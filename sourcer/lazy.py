@@ -0,0 +1,119 @@
+"""Builds grammar modules that generate the code for each rule on demand.
+
+A lazy grammar module starts out as a stub. It has the runtime, the Python
+sections, the classes, and the Rule objects, but none of the parsing functions.
+The first time you parse with a rule, the module generates and compiles the code
+for that rule and for every rule that it can reach. Rules that you never use are
+never compiled.
+"""
+
+import threading
+
+from outsourcer import CodeBuilder, Code
+
+from . import expressions as ex
+from . import translator
+
+
+def create_module(name, docstring, nodes, incremental=False):
+    sections, rules, default_rule, has_ignored = translator.collect_rules(nodes)
+
+    out = translator.begin_module(
+        docstring,
+        sections,
+        _load_call(default_rule.name),
+        incremental=incremental,
+    )
+
+    loader = _Loader(name, rules, has_ignored, out.state)
+    translator.prepare_rules(rules, has_ignored, loader.add)
+    translator.add_prefilters(out, rules)
+
+    out.add_newline()
+    for rule in rules:
+        rule.compile_interface(out, Code(_load_call(rule.name)))
+
+    module = out.compile(module_name=name, docstring=docstring)
+    loader.namespace = module.__dict__
+    module._load = loader.load
+    return module
+
+
+def _load_call(rule_name):
+    return f'_load({ex.implementation_name(rule_name)!r})'
+
+
+class _Loader:
+    def __init__(self, module_name, rules, has_ignored, state):
+        self.module_name = module_name
+        self.rules = {ex.implementation_name(x.name): x for x in rules}
+        self.has_ignored = has_ignored
+        self.state = state
+        self.namespace = None
+        self.loaded = set()
+        self.nodes = {x: [] for x in self.rules}
+        self.dependencies = {x: set() for x in self.rules}
+        self.lock = threading.Lock()
+
+    def add(self, rule, expr, error_delegate):
+        # Called for each expression, when the grammar is prepared. Remember the
+        # expression for later, and note which rules it refers to.
+        impl_name = ex.implementation_name(rule.name)
+        self.nodes[impl_name].append((expr, error_delegate))
+
+        if isinstance(expr, ex.Ref) and expr._resolved is not None:
+            self.dependencies[impl_name].add(expr._resolved)
+
+        if self.has_ignored and not rule.is_ignored:
+            self.dependencies[impl_name].add(ex.implementation_name('_ignored'))
+
+    def load(self, impl_name):
+        """Returns the parsing function with the given name, compiling it first
+        if necessary.
+        """
+        if impl_name not in self.loaded:
+            with self.lock:
+                if impl_name not in self.loaded:
+                    self._compile(self._unloaded_rules(impl_name))
+
+        return self.namespace[impl_name]
+
+    def _unloaded_rules(self, impl_name):
+        result = []
+        pending = [impl_name]
+        visited = set(pending)
+
+        while pending:
+            name = pending.pop()
+            if name in self.loaded:
+                continue
+
+            result.append(self.rules[name])
+            for dependency in self.dependencies[name]:
+                if dependency not in visited:
+                    visited.add(dependency)
+                    pending.append(dependency)
+
+        return result
+
+    def _compile(self, rules):
+        # Share the state with the rest of the module, so that the new code can
+        # reuse the regular expressions that the other rules already compiled.
+        out = CodeBuilder()
+        out.state = self.state
+
+        for rule in rules:
+            for expr, error_delegate in self.nodes[ex.implementation_name(rule.name)]:
+                expr.precompile(out)
+                translator._compile_error_message(out, rule, expr, error_delegate)
+
+        for rule in rules:
+            rule.compile_parse_function(out)
+
+        code_object = compile(
+            out.source_code(), f'<{self.module_name}>', 'exec', optimize=2,
+        )
+        exec(code_object, self.namespace)
+
+        # Don't hand out any of the new functions until they're all defined.
+        self.loaded.update(ex.implementation_name(x.name) for x in rules)
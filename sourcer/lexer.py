@@ -0,0 +1,274 @@
+"""Builds a lexer from the terminals of a grammar.
+
+In lexer mode, a grammar splits its input into tokens before it parses. The
+lexer is one regular expression, with a named group for each kind of token:
+
+- first, one group for each ignored rule,
+- then one group for each string literal, longest first,
+- then one group for each regular expression, in the order they appear.
+
+At each position, the first group that matches wins. (String literals that end
+with a word character only match at the end of a word, so that a keyword like
+"if" doesn't match the start of a name like "iffy".) Tokens from ignored rules
+are dropped.
+
+The rules then run over the token indexes. A string literal matches a token of
+its own kind. A regular expression matches a token of its own kind, and also
+any string literal token that it would match in full.
+"""
+
+import re
+import warnings
+
+from . import expressions as ex
+from .expressions.regex_analysis import analyze
+
+
+class Lexer:
+    def __init__(self):
+        self.kinds = {}
+        self.literals = {}
+        self.regexes = {}
+        self.ignored = []
+
+    def add(self, rule, expr):
+        """Records a terminal expression from a rule. Call this for each
+        expression in the grammar, in order.
+        """
+        if not isinstance(expr, (ex.Str, ex.Regex)):
+            return
+
+        value = expr.value if isinstance(expr, ex.Str) else expr.pattern
+        if isinstance(value, bytes):
+            raise Exception(
+                'Lexer mode does not support byte strings. Found one in the'
+                f' {rule.name!r} rule: {expr}'
+            )
+
+        if not value:
+            return
+
+        key = _key(expr)
+        if key not in self.kinds:
+            self.kinds[key] = len(self.kinds)
+
+        # The terminals of ignored rules only appear inside the ignored rules'
+        # tokens, so they don't get tokens of their own.
+        if not rule.is_ignored:
+            table = self.literals if isinstance(expr, ex.Str) else self.regexes
+            table.setdefault(key, expr)
+
+    def add_ignored(self, rule, rules_by_name):
+        """Records an ignored rule. Its expression must be made of literals and
+        regular expressions.
+        """
+        if not isinstance(rule, ex.Rule) or rule.params:
+            raise Exception(
+                f'In lexer mode, the ignored rule {rule.name!r} must be a'
+                ' simple rule without any parameters.'
+            )
+        self.ignored.append(_to_regex(rule.expr, rules_by_name, [rule.name]))
+
+    def kind(self, expr):
+        return self.kinds[_key(expr)]
+
+    def accepted_kinds(self, regex):
+        """Returns the token kinds that a regular expression matches."""
+        result = [self.kind(regex)]
+        if _key(regex) not in self.regexes:
+            return result
+
+        flags = re.IGNORECASE if regex.ignore_case else 0
+        fullmatch = re.compile(regex.pattern, flags).fullmatch
+        for literal in self.literals.values():
+            if fullmatch(literal.value):
+                result.append(self.kind(literal))
+        return result
+
+    def token_pattern(self):
+        """Returns the source of the lexer's regular expression, and a dict that
+        maps each group name to a token kind. Ignored tokens have negative kinds.
+        """
+        groups, kinds = [], {}
+
+        for i, pattern in enumerate(self.ignored):
+            name = f'i{i}'
+            groups.append(f'(?P<{name}>{pattern})')
+            kinds[name] = -2 - i
+
+        literals = sorted(self.literals.values(), key=lambda x: -len(x.value))
+        for expr in literals + list(self.regexes.values()):
+            kind = self.kind(expr)
+            name = f't{kind}'
+            if isinstance(expr, ex.Str):
+                pattern = re.escape(expr.value)
+                if re.match(r'\w', expr.value[-1]):
+                    pattern += r'(?!\w)'
+            else:
+                pattern = _scoped(expr.pattern, expr.ignore_case)
+            groups.append(f'(?P<{name}>{pattern})')
+            kinds[name] = kind
+
+        source = '|'.join(groups)
+        try:
+            re.compile(source)
+        except re.error as exc:
+            raise Exception(
+                'Lexer mode could not combine the grammar\'s regular expressions'
+                f' into one pattern: {exc}. (Regular expressions with named'
+                ' groups or backreferences are not supported in lexer mode.)'
+            )
+        return source, kinds
+
+    def conflicts(self):
+        """Returns a list of pairs of terminals that may match the same text.
+
+        The lexer doesn't know what the rules expect at each position, so only
+        the first of the two terminals gets the text. The grammar may then parse
+        the text differently in lexer mode. This check compares the characters
+        that each terminal can start with, so it may report pairs that never
+        actually conflict.
+        """
+        ignored = [(f'/{x}/', _first_chars(x, False)) for x in self.ignored]
+        regexes = [(x, _first_chars(x.pattern, x.ignore_case))
+            for x in self.regexes.values()]
+
+        # The groups of ignored rules come first, and then the literals, and
+        # then the regular expressions, in order.
+        result = []
+        for literal in self.literals.values():
+            for name, chars in ignored:
+                if literal.value[0] in chars:
+                    result.append((name, repr(literal.value)))
+
+        for i, (regex, chars) in enumerate(regexes):
+            for name, other_chars in ignored:
+                if chars & other_chars:
+                    result.append((name, _name(regex)))
+
+            flags = re.IGNORECASE if regex.ignore_case else 0
+            for literal in self.literals.values():
+                # If the regex matches the whole literal, then it accepts the
+                # literal's tokens, too.
+                if (literal.value[0] in chars
+                        and not re.fullmatch(regex.pattern, literal.value, flags)):
+                    result.append((repr(literal.value), _name(regex)))
+
+            for other, other_chars in regexes[:i]:
+                if chars & other_chars:
+                    result.append((_name(other), _name(regex)))
+
+        return result
+
+    def check(self):
+        """Warns about the terminals that may match the same text."""
+        conflicts = self.conflicts()
+        if not conflicts:
+            return
+
+        pairs = ''.join(f'\n    {a} and {b}' for a, b in conflicts[:10])
+        more = len(conflicts) - 10
+        if more > 0:
+            pairs += f'\n    (and {more} more)'
+        warnings.warn(
+            'In lexer mode, each part of the text becomes a token before the'
+            ' rules run, so terminals that match the same text may parse'
+            ' differently than they do without the lexer. These terminals may'
+            f' match the same text:{pairs}',
+            stacklevel=4,
+        )
+
+
+def _key(expr):
+    if isinstance(expr, ex.Str):
+        return ('str', expr.value)
+    else:
+        return ('regex', expr.pattern, expr.ignore_case)
+
+
+def _scoped(pattern, ignore_case):
+    # Move any global flags into a group, so that the pattern can be combined
+    # with other patterns.
+    match = re.match(r'\(\?([aiLmsux]+)\)', pattern)
+    flags = ''
+    if match:
+        flags = match.group(1)
+        pattern = pattern[match.end():]
+
+    if ignore_case and 'i' not in flags:
+        flags += 'i'
+
+    if _has_backreference(pattern):
+        raise Exception(
+            'Lexer mode does not support regular expressions with named groups'
+            f' or backreferences: /{pattern}/'
+        )
+
+    return f'(?{flags}:{pattern})' if flags else f'(?:{pattern})'
+
+
+def _has_backreference(pattern):
+    return bool(re.search(r'\(\?P[<=]|\\[1-9]', pattern))
+
+
+def _to_regex(expr, rules_by_name, stack):
+    if isinstance(expr, ex.Str):
+        return re.escape(expr.value)
+
+    if isinstance(expr, ex.Regex):
+        return _scoped(expr.pattern, expr.ignore_case)
+
+    if isinstance(expr, ex.Choice):
+        return '(?:' + '|'.join(_to_regex(x, rules_by_name, stack) for x in expr.exprs) + ')'
+
+    if isinstance(expr, ex.Seq):
+        return ''.join(_to_regex(x, rules_by_name, stack) for x in expr.exprs)
+
+    if isinstance(expr, ex.Discard):
+        first = _to_regex(expr.expr1, rules_by_name, stack)
+        second = _to_regex(expr.expr2, rules_by_name, stack)
+        return first + second
+
+    if isinstance(expr, ex.Opt):
+        return f'(?:{_to_regex(expr.expr, rules_by_name, stack)})?'
+
+    if isinstance(expr, ex.List) and _is_int(expr.min_len) and _is_int(expr.max_len):
+        inner = _to_regex(expr.expr, rules_by_name, stack)
+        low = int(expr.min_len or 0)
+        high = '' if expr.max_len is None else int(expr.max_len)
+        return f'(?:{inner}){{{low},{high}}}'
+
+    if isinstance(expr, ex.Ref):
+        rule = rules_by_name.get(expr.name)
+        if (isinstance(rule, ex.Rule) and not rule.params
+                and expr.name not in stack):
+            return _to_regex(rule.expr, rules_by_name, stack + [expr.name])
+
+    raise Exception(
+        'In lexer mode, ignored rules may only use string literals, regular'
+        f' expressions, and references to other such rules. Found: {expr}'
+    )
+
+
+def _name(regex):
+    return f'/{regex.pattern}/' + ('i' if regex.ignore_case else '')
+
+
+# The characters to try when comparing the first characters of two regular
+# expressions.
+_PROBE_CHARS = [chr(x) for x in range(0x300)]
+
+
+def _first_chars(pattern, ignore_case):
+    # Returns the set of characters (out of the probe characters) that can begin
+    # a match of the pattern. If the pattern can match an empty string, or if
+    # the analysis can't tell, then every character can begin a match.
+    info = analyze(pattern, ignore_case)
+    if info.first is None:
+        return set(_PROBE_CHARS)
+    match = re.compile(info.first, info.flags).match
+    return {x for x in _PROBE_CHARS if match(x)}
+
+
+def _is_int(value):
+    return value is None or isinstance(value, int) or str(value).isdigit()
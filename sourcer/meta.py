@@ -129,14 +129,24 @@ SingleExpr = Expr << Opt(Sep)
 start = Skip(Newline) >> (ManyStmts | SingleExpr)
 
 """
-
-from collections import namedtuple as _nt
+from collections import namedtuple as _nt, OrderedDict as _OrderedDict
+from copy import deepcopy as _deepcopy
+from hashlib import sha256 as _sha256
+from itertools import islice as _islice
+from operator import attrgetter as _attrgetter
 from re import compile as _compile_re, IGNORECASE as _IGNORECASE
+from struct import Struct as _Struct, error as _StructError
+from sys import getsizeof as _getsizeof
+from threading import Lock as _Lock
+from time import monotonic as _monotonic
+
 
 class Node:
     _fields = ()
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if not isinstance(other, self.__class__):
             return False
         for field in self._fields:
@@ -155,27 +165,97 @@ class Node:
 
 
 class Rule:
-    def __init__(self, name, parse, definition):
+    def __init__(self, name, parse, definition, find=None):
         self.name = name
         self.parse = parse
         self.definition = definition
+        self._find = find
+
+    def finditer(self, text, pos=0):
+        """Returns an iterator over the matches of the rule in the text, from
+        left to right. The matches don't overlap.
+        """
+        return self._find(text, pos)
+
+    def search(self, text, pos=0):
+        """Returns the first match of the rule in the text, or None."""
+        return next(self._find(text, pos), None)
 
     def __repr__(self):
         return (f'Rule(name={self.name!r}, parse={self.parse.__name__},'
             f' definition={self.definition!r})')
 
 
-import textwrap
-
-
 class SourcerError(Exception):
     """Common superclass for ParseError and PartialParseError."""
 
 
 class ParseError(SourcerError):
+    """Raised when the text doesn't match the grammar.
+
+    When a parse fails, the error keeps a reference to the text. It works out
+    the line and column of its position, and its message, the first time you
+    ask for them. So code that only checks whether a text parses doesn't pay
+    for them. (The "args" field holds the message, too, so it's formatted the
+    first time you read "args".)
+    """
     def __init__(self, message, index, line, column):
         super().__init__(message)
-        self.position = _Position(index, line, column)
+        self.text = None
+        self.index = index
+        self._error = None
+        self._position = _Position(index, line, column)
+        self._message = message
+
+    @classmethod
+    def _on_demand(cls, text, index, error):
+        # Creates an error that formats its message when someone asks for it.
+        # The "error" argument is the entry from the module's "_errors" table.
+        self = cls.__new__(cls)
+        self.text = text
+        self.index = index
+        self._error = error
+        self._position = None
+        self._message = None
+        return self
+
+    def __reduce__(self):
+        if self.text is None:
+            return (self.__class__, (self._message, self.index, *self.position[1:]))
+        return (self.__class__._on_demand, (self.text, self.index, self._error))
+
+    def __str__(self):
+        if self._message is None:
+            self._message = _format_error(self.text, self.position, self._error)
+        return self._message
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({str(self)!r})'
+
+    @property
+    def args(self):
+        return (str(self),)
+
+    @args.setter
+    def args(self, value):
+        self._message = str(value[0]) if value else ''
+
+    @property
+    def position(self):
+        if self._position is None:
+            if len(self.text) <= self.index:
+                line = col = None
+            else:
+                line, col = _get_line_and_column(self.text, self.index)
+            self._position = _Position(self.index, line, col)
+        return self._position
+
+    @property
+    def excerpt(self):
+        col = self.position.column
+        if self.text is None or col is None:
+            return None
+        return _extract_excerpt(self.text, self.index, col)
 
 
 class PartialParseError(SourcerError):
@@ -186,6 +266,16 @@ class PartialParseError(SourcerError):
         self.last_position = last_position
 
 
+class ParseBudgetExceeded(SourcerError):
+    """Raised when a parse takes more steps than "max_steps", or runs past its
+    "deadline". The "stats" field has the counts up to that point.
+    """
+    def __init__(self, message, index, stats):
+        super().__init__(message)
+        self.index = index
+        self.stats = stats
+
+
 class Infix(Node):
     _fields = ('left', 'operator', 'right')
 
@@ -220,8 +310,47 @@ class Prefix(Node):
         return f'Prefix({self.operator!r}, {self.right!r})'
 
 
-def parse(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_start, fullparse)
+class Span:
+    """A range of the text. In grammars with the "spans" option, string literals
+    and regular expressions return a Span instead of a copy of the text that
+    they matched. The span only copies the text when you ask for it.
+    """
+
+    __slots__ = ('text', 'start', 'end')
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    @property
+    def value(self):
+        """The text of the span, as a str or a bytes object."""
+        return self.text[self.start : self.end]
+
+    def __str__(self):
+        value = self.value
+        return value if isinstance(value, str) else str(value, 'utf-8', 'replace')
+
+    def __bytes__(self):
+        value = self.value
+        return value.encode('utf-8') if isinstance(value, str) else bytes(value)
+
+    def __len__(self):
+        return self.end - self.start
+
+    # Spans compare and hash like their text, so that they work as dict keys,
+    # and so that a span equals the string that it covers.
+    def __eq__(self, other):
+        if isinstance(other, Span):
+            other = other.value
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return f'Span({self.start}, {self.end}, {self.value!r})'
 
 
 _PositionInfo = _nt('_PositionInfo', 'start, end')
@@ -245,34 +374,376 @@ def _wrap_string_literal(string_value, parse_function):
     return result
 
 
-def _run(text, pos, start, fullparse):
-    memo = {}
-    result = None
+def _format_error(text, position, error):
+    rule_name, expression, complaint = error
+    pos, line, col = position
 
-    key = (3, start, pos)
-    gtor = start(text, pos)
-    stack = [(key, gtor)]
+    if line is None:
+        title = 'Unexpected end of input.'
+    else:
+        excerpt = _extract_excerpt(text, pos, col)
+        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
 
-    while stack:
-        key, gtor = stack[-1]
-        result = gtor.send(result)
+    details = (
+        f'Failed to parse the {rule_name!r} rule, at the expression:\n'
+        f'    {expression}\n\n{complaint}'
+    )
+    return title + details
 
-        if result[0] != 3:
-            stack.pop()
-            memo[key] = result
-        elif result in memo:
-            result = memo[result]
+
+class ParseStats:
+    """Counts memo table activity. Pass an instance to "parse" with the
+    "stats" keyword argument. The counts accumulate across parses.
+    """
+
+    def __init__(self):
+        self.memo_policy = None
+        self.calls = 0
+        self.memo_hits = 0
+        self.memo_entries = 0
+        self.evictions = 0
+        self.memo_sheds = 0
+
+    @property
+    def memo_misses(self):
+        return self.calls - self.memo_hits
+
+    @property
+    def hit_rate(self):
+        return self.memo_hits / self.calls if self.calls else 0.0
+
+    def _record(self, memo, calls, hits):
+        self.memo_policy = memo.name
+        self.calls += calls
+        self.memo_hits += hits
+        self.memo_entries = max(self.memo_entries, memo.peak_size)
+        self.evictions += memo.evictions
+        self.memo_sheds += memo.sheds
+
+    def __repr__(self):
+        return (f'ParseStats(memo_policy={self.memo_policy!r},'
+            f' calls={self.calls}, memo_hits={self.memo_hits},'
+            f' hit_rate={self.hit_rate:.3f}, memo_entries={self.memo_entries},'
+            f' evictions={self.evictions}, memo_sheds={self.memo_sheds})')
+
+
+class _Budget:
+    # How many steps to take between checks of the clock.
+    clock_interval = 1024
+
+    def __init__(self, max_steps, deadline):
+        self.max_steps = max_steps
+        self.deadline = deadline
+
+    def check(self, steps, pos, stats):
+        """Raises ParseBudgetExceeded if the parse is over its budget.
+        Otherwise, returns the step count for the next check.
+        """
+        if self.max_steps is not None and steps > self.max_steps:
+            raise ParseBudgetExceeded(
+                f'Exceeded the maximum number of steps ({self.max_steps})'
+                f' at index {pos}.', pos, stats,
+            )
+
+        if self.deadline is not None and _monotonic() > self.deadline:
+            raise ParseBudgetExceeded(
+                f'Exceeded the deadline at index {pos}.', pos, stats,
+            )
+
+        result = float('inf')
+        if self.max_steps is not None:
+            result = self.max_steps + 1
+        if self.deadline is not None:
+            result = min(result, steps + self.clock_interval)
+        return result
+
+
+def _create_memo(policy, size, max_entries):
+    if policy not in _memo_policies:
+        raise ValueError(
+            f'Unknown memo_policy: {policy!r}. Expected one of:'
+            f' {", ".join(repr(x) for x in _memo_policies)}.'
+        )
+
+    memo = _memo_policies[policy](size)
+
+    if max_entries is None:
+        return memo
+
+    if max_entries < 1:
+        raise ValueError(
+            f'Expected max_memo_entries to be at least 1.'
+            f' Received: {max_entries!r}.'
+        )
+
+    return _BoundedMemo(memo, max_entries)
+
+
+class _FullMemo(dict):
+    """Keeps every entry. (This is what "parse" does by default.)"""
+    name = 'full'
+    evictions = 0
+    sheds = 0
+
+    def __init__(self, size):
+        dict.__init__(self)
+
+    put = dict.__setitem__
+
+    @property
+    def peak_size(self):
+        return len(self)
+
+
+class _WindowMemo(dict):
+    """Keeps the entries within "size" characters of the farthest position."""
+    name = 'window'
+
+    def __init__(self, size):
+        dict.__init__(self)
+        self.window = 1024 if size is None else size
+        self.evictions = 0
+        self.sheds = 0
+        self.peak_size = 0
+        self._buckets = {}
+        self._farthest = self._horizon = 0
+
+    def put(self, key, value):
+        pos = key[2]
+        if pos < self._horizon:
+            return
+
+        self[key] = value
+        bucket = self._buckets.get(pos)
+        if bucket is None:
+            self._buckets[pos] = [key]
         else:
-            gtor = result[1](text, result[2])
-            stack.append((result, gtor))
-            result = None
+            bucket.append(key)
+
+        if len(self) > self.peak_size:
+            self.peak_size = len(self)
+
+        if pos <= self._farthest:
+            return
+
+        self._farthest = pos
+        horizon = pos - self.window
+        for old_pos in range(self._horizon, horizon):
+            for old_key in self._buckets.pop(old_pos, ()):
+                if self.pop(old_key, None) is not None:
+                    self.evictions += 1
+        self._horizon = max(self._horizon, horizon)
+
+
+class _LRUMemo(_OrderedDict):
+    """Keeps the "size" most recently used entries."""
+    name = 'lru'
+
+    def __init__(self, size):
+        _OrderedDict.__init__(self)
+        self.max_entries = 65536 if size is None else size
+        self.evictions = 0
+        self.sheds = 0
+
+    def get(self, key):
+        value = _OrderedDict.get(self, key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self[key] = value
+        if len(self) > self.max_entries:
+            self.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def peak_size(self):
+        return len(self)
+
+
+class _NoMemo:
+    """Doesn't keep any entries."""
+    name = 'none'
+    evictions = 0
+    sheds = 0
+    peak_size = 0
+
+    def __init__(self, size):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value):
+        pass
+
+
+class _BoundedMemo:
+    """Wraps a memo policy. When the memo table grows past "max_entries", it
+    sheds the oldest half of its entries.
+    """
+
+    def __init__(self, memo, max_entries):
+        self.memo = memo
+        self.max_entries = max_entries
+        self.name = memo.name
+        self.get = memo.get
+        self.sheds = 0
+        self._shed_entries = 0
+        self._peak = 0
+
+    @property
+    def evictions(self):
+        return self.memo.evictions + self._shed_entries
+
+    @property
+    def peak_size(self):
+        return max(self._peak, self.memo.peak_size)
+
+    def put(self, key, value):
+        memo = self.memo
+        memo.put(key, value)
+
+        size = len(memo)
+        if size <= self.max_entries:
+            return
+
+        # The entries come out in insertion order, so the oldest go first.
+        # (For the LRU policy, they come out least recently used first.)
+        self._peak = max(self._peak, size)
+        self.sheds += 1
+        count = size - self.max_entries // 2
+        for old_key in list(_islice(memo.keys(), count)):
+            del memo[old_key]
+        self._shed_entries += count
+
+
+_memo_policies = {
+    'full': _FullMemo,
+    'window': _WindowMemo,
+    'lru': _LRUMemo,
+    'none': _NoMemo,
+}
 
-    if result[0]:
-        return _finalize_parse_info(text, result[1], result[2], fullparse)
-    else:
-        pos = result[2]
-        message = result[1](text, pos)
-        raise ParseError(message, pos)
+
+class ResultCache:
+    """Keeps the results of whole parses, so that parsing the same text again
+    returns the earlier result. Pass an instance to the "Grammar" function with
+    the "result_cache" keyword argument.
+
+    - max_entries: The maximum number of results to keep.
+    - max_bytes: The maximum number of bytes that the texts and the results may
+      use, as estimated by "sys.getsizeof". If None, then there is no limit.
+    - copy: If True, then each parse returns a deep copy of the cached result,
+      so that callers may change it. Otherwise, the callers share the result,
+      and must treat it as immutable.
+
+    The cache only keeps successful parses, and it skips parses that use any
+    options, like "memo_policy" or "max_steps". When it's full, it evicts the
+    least recently used result.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, copy=False):
+        if max_entries < 1:
+            raise ValueError(
+                f'Expected max_entries to be at least 1.'
+                f' Received: {max_entries!r}.'
+            )
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.copy = copy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries = _OrderedDict()
+        self._lock = _Lock()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def run(self, run, text, pos, start, fullparse):
+        # The "run" argument is the module's "_run" function. This passes it an
+        # empty memo table, so that it doesn't look in the cache again.
+        key = (start, text, pos, fullparse)
+        try:
+            hash(key)
+        except TypeError:
+            return run(text, pos, start, fullparse, {})
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            return _deepcopy(entry[0]) if self.copy else entry[0]
+
+        result = run(text, pos, start, fullparse, {})
+        size = _getsizeof(text) + _sizeof(result)
+        if self.max_bytes is None or size <= self.max_bytes:
+            self._put(key, result, size)
+        return _deepcopy(result) if self.copy else result
+
+    def _put(self, key, result, size):
+        with self._lock:
+            entries = self._entries
+            if key in entries:
+                return
+
+            entries[key] = (result, size)
+            self.total_bytes += size
+
+            while len(entries) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                _, (_, old_size) = entries.popitem(last=False)
+                self.total_bytes -= old_size
+                self.evictions += 1
+
+    def __repr__(self):
+        return (f'ResultCache(entries={len(self)}, hits={self.hits},'
+            f' misses={self.misses}, hit_rate={self.hit_rate:.3f},'
+            f' total_bytes={self.total_bytes}, evictions={self.evictions})')
+
+
+def _sizeof(value):
+    # Estimates the size of a parse result, counting each object once.
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        total += _getsizeof(value)
+
+        if isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, Node):
+            stack.append(vars(value))
+    return total
 
 
 def visit(node):
@@ -299,7 +770,7 @@ def visit(node):
                 stack.extend(getattr(node, x) for x in node._fields)
 
 
-def transform(node, *callbacks):
+def transform(node, *callbacks, in_place=False):
     if not callbacks:
         return node
 
@@ -311,42 +782,199 @@ def transform(node, *callbacks):
                 node = f(node)
             return node
 
-    return _transform(node, callback)
+    return _transform(node, callback, in_place)
 
 
-def _transform(node, callback):
-    if isinstance(node, list):
-        return [_transform(x, callback) for x in node]
+def _transform(tree, callback, in_place):
+    # Transforms the tree from the bottom up, with an explicit stack. Each entry
+    # on the stack is a value, along with the list and the index where its
+    # result goes. When a node or a list comes off the stack the first time, it
+    # goes back on with a list for the results of its children, and then its
+    # children go on top of it. The second time, the results are ready.
+    getters = {}
+    root = [tree]
+    stack = [(tree, root, 0, None)]
 
-    if not isinstance(node, Node):
-        return node
+    # When nodes are updated in place, a node that appears in more than one
+    # place must only be transformed once.
+    done = {} if in_place else None
+
+    while stack:
+        value, target, index, children = stack.pop()
+
+        if children is None:
+            if isinstance(value, Node):
+                if in_place and id(value) in done:
+                    target[index] = done[id(value)]
+                    continue
+
+                cls = type(value)
+                getter = getters.get(cls)
+                if getter is None:
+                    getter = getters[cls] = _compile_field_getter(cls._fields)
+                children = getter(value)
+
+                # Transform a node right away if it doesn't have any nodes or
+                # lists inside of it.
+                for child in children:
+                    if isinstance(child, (Node, list)):
+                        children = list(children)
+                        break
+                else:
+                    result = callback(value)
+                    if in_place:
+                        done[id(value)] = result
+                    target[index] = result
+                    continue
+
+            elif isinstance(value, list):
+                children = value if in_place else value[:]
+
+            else:
+                continue
 
-    updates = {}
-    for field in node._fields:
-        was = getattr(node, field)
-        now = _transform(was, callback)
-        if was is not now:
-            updates[field] = now
+            stack.append((value, target, index, children))
+            for i in range(len(children) - 1, -1, -1):
+                child = children[i]
+                if isinstance(child, (Node, list)):
+                    stack.append((child, children, i, None))
 
-    if updates:
-        node = node._replace(**updates)
+        elif isinstance(value, list):
+            target[index] = children
 
-    return callback(node)
+        else:
+            node, cls = value, type(value)
+            for field, was, now in zip(cls._fields, getters[cls](value), children):
+                if was is not now:
+                    if not in_place:
+                        node = cls(*children)
+                        break
+                    setattr(node, field, now)
+
+            result = callback(node)
+            if in_place:
+                done[id(value)] = result
+            target[index] = result
+
+    return root[0]
+
+
+def _compile_field_getter(fields):
+    # Returns a function that returns a tuple of a node's field values.
+    if not fields:
+        return lambda node: ()
+    if len(fields) == 1:
+        getter = _attrgetter(fields[0])
+        return lambda node: (getter(node),)
+    return _attrgetter(*fields)
+
+
+def _share(tree, index=None):
+    # Replaces equal strings, numbers, and immutable subtrees with one shared
+    # object. A node or a tuple is immutable if all of its fields are. Lists and
+    # dicts are updated in place, but never shared. Floats are compared by their
+    # exact values, so that 0.0 and -0.0 stay apart.
+    #
+    # A shared node stands for more than one place in the text, so its
+    # "_position_info" becomes None. (A node that only appears once keeps its
+    # position.) If there's an index, its lists get the shared nodes, too.
+    table = {}
+    shared = set()
+    replaced = {}
+    results = []
+    stack = [(False, tree)]
+
+    while stack:
+        is_ready, value = stack.pop()
+
+        if not is_ready:
+            if isinstance(value, Node):
+                children = [getattr(value, x) for x in value._fields]
+            elif isinstance(value, list) or type(value) is tuple:
+                children = value
+            elif isinstance(value, dict):
+                children = list(value.values())
+            else:
+                if isinstance(value, _shared_types):
+                    key = value.hex() if isinstance(value, float) else value
+                    value = table.setdefault((type(value), key), value)
+                    shared.add(id(value))
+                results.append(value)
+                continue
+
+            stack.append((True, value))
+            stack.extend((False, x) for x in reversed(children))
+            continue
 
+        count = len(value._fields) if isinstance(value, Node) else len(value)
+        children = results[len(results) - count:]
+        del results[len(results) - count:]
+        is_shared = all(id(x) in shared for x in children)
+
+        if isinstance(value, list):
+            value[:] = children
+        elif isinstance(value, dict):
+            value.update(zip(value.keys(), children))
+        elif isinstance(value, tuple):
+            if is_shared:
+                value = table.setdefault((tuple, *map(id, children)), tuple(children))
+                shared.add(id(value))
+        else:
+            for field, child in zip(value._fields, children):
+                setattr(value, field, child)
+            if is_shared:
+                original = value
+                value = table.setdefault((type(value), *map(id, children)), value)
+                shared.add(id(value))
+                if value is not original:
+                    replaced[id(original)] = value
+                    if hasattr(value, '_position_info'):
+                        value._position_info = None
+
+        results.append(value)
+
+    if index is not None and replaced:
+        for found in index.values():
+            found[:] = [replaced.get(id(x), x) for x in found]
+
+    return results[0]
 
-def _finalize_parse_info(text, nodes, pos, fullparse):
+
+_shared_types = (str, bytes, int, float, type(None))
+
+
+def _finalize_parse_info(text, nodes, pos, fullparse, tokens=None, index=None):
     line_numbers, column_numbers = _map_index_to_line_and_column(text)
 
     for node in visit(nodes):
         pos_info = getattr(node, '_position_info', None)
-        if pos_info:
+
+        # Since "visit" yields each node once, a memoized subtree that appears
+        # in more than one place is only indexed once.
+        if index is not None:
+            found = index.get(type(node).__name__)
+            if found is not None:
+                found.append(node)
+
+        # Skip nodes that already have their line and column numbers. (This
+        # happens when a reparse reuses nodes from a previous parse.)
+        if pos_info and type(pos_info) is tuple:
             start, end = pos_info
+            if tokens is not None:
+                start, end = tokens.span(start, end)
             end -= 1
             node._position_info = _PositionInfo(
                 start=_Position(start, line_numbers[start], column_numbers[start]),
                 end=_Position(end, line_numbers[end], column_numbers[end]),
             )
 
+    if index is not None:
+        # Put the nodes in the order of their positions. (The sort is stable,
+        # and "visit" yields a node before the nodes inside of it.)
+        for found in index.values():
+            if all(getattr(x, '_position_info', None) for x in found):
+                found.sort(key=lambda x: x._position_info.start.index)
+
     if fullparse and pos < len(text):
         line, col = line_numbers[pos], column_numbers[pos]
         position = _Position(pos, line, col)
@@ -356,8 +984,25 @@ def _finalize_parse_info(text, nodes, pos, fullparse):
     return nodes
 
 
+def _create_index(names, namespace):
+    # Returns a dict that maps each class name to an empty list. The
+    # "_finalize_parse_info" function fills in the lists.
+    if isinstance(names, str):
+        names = [names]
+
+    index = {}
+    for name in names:
+        cls = namespace.get(name)
+        if not (isinstance(cls, type) and issubclass(cls, Node)):
+            raise ValueError(
+                f'Expected the name of a class in the grammar. Received: {name!r}.'
+            )
+        index[name] = []
+    return index
+
+
 def _extract_excerpt(text, pos, col):
-    if isinstance(text, bytes):
+    if not isinstance(text, str):
         return repr(text[max(0, pos - 1) : pos + 2])
 
     start = pos - (col - 1)
@@ -384,12 +1029,30 @@ def _caret_at(index):
     return '\n' + (' ' * index) + '^'
 
 
+class _SingleLine:
+    def __getitem__(self, index):
+        return 1
+
+
 def _get_line_and_column(text, pos):
-    line_numbers, column_numbers = _map_index_to_line_and_column(text)
-    return line_numbers[pos], column_numbers[pos]
+    # This gives the same answer as "_map_index_to_line_and_column", without
+    # building the whole map. (Byte strings and token sequences are all on one
+    # line.)
+    if not isinstance(text, str):
+        return 1, pos + 1
+
+    if text[pos] == '\n':
+        return text.count('\n', 0, pos) + 2, 0
+
+    return text.count('\n', 0, pos) + 1, pos - text.rfind('\n', 0, pos)
 
 
 def _map_index_to_line_and_column(text):
+    # Byte strings and token sequences are all on one line, so their maps don't
+    # need a list entry for each position.
+    if not isinstance(text, str):
+        return _SingleLine(), range(1, len(text) + 1)
+
     line_numbers = []
     column_numbers = []
 
@@ -407,130 +1070,735 @@ def _map_index_to_line_and_column(text):
 
     return line_numbers, column_numbers
 
-matcher1 = _compile_re('[ \\t]+', flags=0).match
-matcher2 = _compile_re('#[^\\r\\n]*', flags=0).match
-matcher3 = _compile_re('[\\r\\n][\\s]*', flags=0).match
-matcher4 = _compile_re('[_a-zA-Z][_a-zA-Z0-9]*', flags=0).match
-matcher5 = _compile_re('(?s)[bB]?("""([^\\\\]|\\\\.)*?""")[iI]?', flags=0).match
-matcher6 = _compile_re("(?s)[bB]?('''([^\\\\]|\\\\.)*?''')[iI]?", flags=0).match
-matcher7 = _compile_re('[bB]?("([^"\\\\]|\\\\.)*")[iI]?', flags=0).match
-matcher8 = _compile_re("[bB]?('([^'\\\\]|\\\\.)*')[iI]?", flags=0).match
-matcher9 = _compile_re('[bB]?\\/([^\\/\\\\]|\\\\.)*\\/[iI]?', flags=0).match
-matcher10 = _compile_re('(?s)```.*?```', flags=0).match
-matcher11 = _compile_re('`.*?`', flags=0).match
-matcher12 = _compile_re('\\d+', flags=0).match
+
+# Each match from "search" or "finditer" has the rule's result, the start and
+# end of the match, and the line and column where it starts. The end includes
+# any ignored text after the match.
+_Match = _nt('Match', 'value, start, end, line, column')
+
+# When a search moves this far ahead, it drops the memo entries behind it.
+_PRUNE_DISTANCE = 4096
+
+
+def _locate_nodes(nodes, lines):
+    for node in visit(nodes):
+        pos_info = getattr(node, '_position_info', None)
+        if pos_info and type(pos_info) is tuple:
+            start, end = pos_info
+            end -= 1
+            node._position_info = _PositionInfo(
+                start=_Position(start, *lines.locate(start)),
+                end=_Position(end, *lines.locate(end)),
+            )
+
+
+class _LineCounter:
+    """Works out line and column numbers for positions that move forward
+    through the text, without rescanning the text from the start.
+
+    Unlike the positions of a parse, the positions of a search count the lines
+    of byte strings and memory maps, too. (Token sequences are all on one
+    line.)
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.line = 1
+        self.line_start = 0
+
+        if isinstance(text, str):
+            self.newline = '\n'
+        elif hasattr(text, 'rfind'):
+            self.newline = b'\n'
+        else:
+            self.newline = None
+
+    def advance(self, pos):
+        if pos <= self.pos or self.newline is None:
+            return
+        count = self._count(self.pos, pos)
+        if count:
+            self.line += count
+            self.line_start = self.text.rfind(self.newline, self.pos, pos) + 1
+        self.pos = pos
+
+    def locate(self, pos):
+        # For strings, this gives the same answer as "_get_line_and_column".
+        text = self.text
+        if pos >= len(text):
+            return None, None
+
+        if self.newline is None:
+            return _get_line_and_column(text, pos)
+
+        if pos < self.pos:
+            start, line, line_start = 0, 1, 0
+        else:
+            start, line, line_start = self.pos, self.line, self.line_start
+
+        count = self._count(start, pos)
+        line += count
+        if text[pos : pos + 1] == self.newline:
+            return line + 1, 0
+
+        if count:
+            line_start = text.rfind(self.newline, start, pos) + 1
+        return line, pos - line_start + 1
+
+    def _count(self, start, end):
+        text = self.text
+        if hasattr(text, 'count'):
+            return text.count(self.newline, start, end)
+
+        # Memory maps don't have a "count" method, so count their lines one
+        # slice at a time, instead of copying the whole range.
+        return sum(
+            text[i : min(i + _CHUNK_SIZE, end)].count(self.newline)
+            for i in range(start, end, _CHUNK_SIZE)
+        )
+
+
+# The binary format of "dumps" starts with this header, followed by a hash of
+# the grammar's classes and their fields. The tree follows in prefix order. Each
+# value starts with one of these tags.
+_TREE_MAGIC = b'SRCT\x01'
+(
+    _T_NONE, _T_TRUE, _T_FALSE, _T_INT, _T_FLOAT, _T_STR, _T_STR_REF, _T_BYTES,
+    _T_LIST, _T_TUPLE, _T_DICT, _T_NODE,
+) = range(12)
+
+_DOUBLE = _Struct('<d')
+
+# The size of each chunk that "dump" writes.
+_CHUNK_SIZE = 65536
+
+
+class _TreeSchema:
+    """Numbers the Node classes of a grammar module, and reads and writes parse
+    trees in the binary format of "dumps" and "loads".
+    """
+
+    def __init__(self, namespace):
+        classes = {}
+        for value in namespace.values():
+            if isinstance(value, type) and issubclass(value, Node):
+                classes[value.__name__] = value
+
+        self.classes = [classes[x] for x in sorted(classes)]
+        self.indexes = {x: i for i, x in enumerate(self.classes)}
+        fields = [(x.__name__, tuple(x._fields)) for x in self.classes]
+        self.header = _TREE_MAGIC + _sha256(repr(fields).encode('utf-8')).digest()[:8]
+
+    def dump(self, tree, write):
+        # Walk the tree with a stack, so that deep trees don't overflow the
+        # Python stack.
+        out = bytearray(self.header)
+        strings = {}
+        indexes = self.indexes
+        prev_start = prev_line = 0
+        stack = [tree]
+
+        while stack:
+            value = stack.pop()
+
+            if value is None:
+                out.append(_T_NONE)
+            elif value is True:
+                out.append(_T_TRUE)
+            elif value is False:
+                out.append(_T_FALSE)
+            elif isinstance(value, int):
+                out.append(_T_INT)
+                _put_varint(out, _zigzag(value))
+            elif isinstance(value, str):
+                index = strings.get(value)
+                if index is None:
+                    strings[value] = len(strings)
+                    data = value.encode('utf-8')
+                    out.append(_T_STR)
+                    _put_varint(out, len(data))
+                    out += data
+                else:
+                    out.append(_T_STR_REF)
+                    _put_varint(out, index)
+            elif isinstance(value, (list, tuple)):
+                out.append(_T_LIST if isinstance(value, list) else _T_TUPLE)
+                _put_varint(out, len(value))
+                stack.extend(reversed(value))
+            elif isinstance(value, Node):
+                index = indexes.get(type(value))
+                if index is None:
+                    raise TypeError(
+                        f'The grammar does not have the class'
+                        f' {type(value).__name__!r}.'
+                    )
+                out.append(_T_NODE)
+                _put_varint(out, index)
+                stack.extend(getattr(value, x) for x in reversed(value._fields))
+
+                info = getattr(value, '_position_info', None)
+                if info is None:
+                    out.append(0)
+                elif type(info) is _PositionInfo and None not in info.start + info.end:
+                    # Store each position as the difference from the previous
+                    # one, so that most of the numbers fit in one byte.
+                    (start, line, col), (end, end_line, end_col) = info
+                    out.append(1)
+                    _put_varint(out, _zigzag(start - prev_start))
+                    _put_varint(out, _zigzag(line - prev_line))
+                    _put_varint(out, col)
+                    _put_varint(out, _zigzag(end - start))
+                    _put_varint(out, _zigzag(end_line - line))
+                    _put_varint(out, end_col)
+                    prev_start, prev_line = start, line
+                elif type(info) is _PositionInfo:
+                    out.append(2)
+                    stack.append((tuple(info.start), tuple(info.end)))
+                else:
+                    out.append(3)
+                    stack.append(info)
+            elif isinstance(value, Span):
+                # Save the text of the span, since the data doesn't have the
+                # whole input.
+                stack.append(value.value)
+                continue
+            elif isinstance(value, float):
+                out.append(_T_FLOAT)
+                out += _DOUBLE.pack(value)
+            elif isinstance(value, bytes):
+                out.append(_T_BYTES)
+                _put_varint(out, len(value))
+                out += value
+            elif isinstance(value, dict):
+                out.append(_T_DICT)
+                _put_varint(out, len(value))
+                for key, item in reversed(list(value.items())):
+                    stack.append(item)
+                    stack.append(key)
+            else:
+                raise TypeError(
+                    f'Cannot serialize a value of type {type(value).__name__!r}.'
+                )
+
+            if len(out) >= _CHUNK_SIZE:
+                write(bytes(out))
+                out.clear()
+
+        write(bytes(out))
+
+    def loads(self, data):
+        header = self.header
+        if data[:len(_TREE_MAGIC)] != _TREE_MAGIC:
+            raise ValueError('The data is not a parse tree from "dumps".')
+        if data[:len(header)] != header:
+            raise ValueError(
+                'The parse tree is from a grammar with different classes.'
+            )
+
+        try:
+            return self._read(data, len(header))
+        except (IndexError, UnicodeDecodeError, _StructError):
+            raise ValueError('The parse tree data is truncated.') from None
+
+    def _read(self, data, pos):
+        strings = []
+        classes = self.classes
+        prev_start = prev_line = 0
+
+        # Each entry on the stack is a list of [tag, count, items, extra],
+        # for a container that is waiting for "count" more items.
+        stack = []
+
+        while True:
+            tag = data[pos]
+            pos += 1
+
+            if tag == _T_NONE:
+                value = None
+            elif tag == _T_TRUE:
+                value = True
+            elif tag == _T_FALSE:
+                value = False
+            elif tag == _T_INT:
+                value, pos = _get_varint(data, pos)
+                value = _unzigzag(value)
+            elif tag == _T_STR:
+                size, pos = _get_varint(data, pos)
+                value = str(data[pos : pos + size], 'utf-8')
+                pos += size
+                strings.append(value)
+            elif tag == _T_STR_REF:
+                index, pos = _get_varint(data, pos)
+                value = strings[index]
+            elif tag == _T_NODE:
+                index, pos = _get_varint(data, pos)
+                cls = classes[index]
+                flag = data[pos]
+                pos += 1
+                info = None
+                if flag == 1:
+                    numbers = []
+                    for _ in range(6):
+                        number, pos = _get_varint(data, pos)
+                        numbers.append(number)
+                    start = prev_start + _unzigzag(numbers[0])
+                    line = prev_line + _unzigzag(numbers[1])
+                    info = _PositionInfo(
+                        start=_Position(start, line, numbers[2]),
+                        end=_Position(
+                            start + _unzigzag(numbers[3]),
+                            line + _unzigzag(numbers[4]),
+                            numbers[5],
+                        ),
+                    )
+                    prev_start, prev_line = start, line
+
+                # If the position isn't in the compact form, then it's the
+                # node's first item.
+                count = len(cls._fields) + (flag >= 2)
+                frame = [tag, count, [], (cls, flag, info)]
+                if count:
+                    stack.append(frame)
+                    continue
+                value = _finish_node(frame)
+            elif tag in (_T_LIST, _T_TUPLE, _T_DICT):
+                count, pos = _get_varint(data, pos)
+                frame = [tag, count * 2 if tag == _T_DICT else count, [], None]
+                if count:
+                    stack.append(frame)
+                    continue
+                value = _finish_container(frame)
+            elif tag == _T_FLOAT:
+                value, = _DOUBLE.unpack_from(data, pos)
+                pos += _DOUBLE.size
+            elif tag == _T_BYTES:
+                size, pos = _get_varint(data, pos)
+                value = bytes(data[pos : pos + size])
+                pos += size
+            else:
+                raise ValueError(f'Unexpected tag in parse tree data: {tag}.')
+
+            # Add the value to the container that's waiting for it. If that
+            # fills the container, then add the container to its parent, and
+            # so on.
+            while stack:
+                frame = stack[-1]
+                frame[2].append(value)
+                if len(frame[2]) < frame[1]:
+                    break
+                stack.pop()
+                value = _finish_node(frame) if frame[0] == _T_NODE else _finish_container(frame)
+            else:
+                if pos != len(data):
+                    raise ValueError('Unexpected data after the parse tree.')
+                return value
+
+
+def _finish_container(frame):
+    tag, _, items, _ = frame
+    if tag == _T_LIST:
+        return items
+    if tag == _T_TUPLE:
+        return tuple(items)
+    return dict(zip(items[::2], items[1::2]))
+
+
+def _finish_node(frame):
+    items = frame[2]
+    cls, flag, info = frame[3]
+    if flag >= 2:
+        info = items.pop(0)
+        if flag == 2:
+            info = _PositionInfo(_Position(*info[0]), _Position(*info[1]))
+
+    node = cls.__new__(cls)
+    for name, item in zip(cls._fields, items):
+        setattr(node, name, item)
+    node._position_info = info
+    return node
+
+
+def _zigzag(number):
+    return number * 2 if number >= 0 else -number * 2 - 1
+
+
+def _unzigzag(number):
+    return (number >> 1) ^ -(number & 1)
+
+
+def _put_varint(out, number):
+    while number > 0x7f:
+        out.append((number & 0x7f) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _get_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+import textwrap
+
+
+def parse(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_start, fullparse, **options)
+
+
+def _run(text, pos, start, fullparse, memo=None, share=False, index=None,
+        **options):
+    if (_result_cache is not None and memo is None and not options and not share
+            and index is None):
+        return _result_cache.run(_run, text, pos, start, fullparse)
+
+    if options:
+        result = _run_with_options(text, pos, start, **options)
+    else:
+        result = _trampoline(text, pos, start, {} if memo is None else memo)
+
+    if result[0]:
+        nodes = None if index is None else _create_index(index, globals())
+        value = _finalize_parse_info(text, result[1], result[2], fullparse,
+            index=nodes)
+        if share:
+            value = _share(value, nodes)
+        return value if index is None else (value, nodes)
+    else:
+        _raise_error(text, result[2], result[1])
+
+
+# Each expression that can fail has an entry in this table. The entry is a tuple
+# of the rule's name, the expression, and the complaint. Failed parses return
+# the expression's id instead of a message, and the ParseError formats the
+# message from the entry when someone asks for it.
+_errors = {}
+
+
+def _raise_error(text, pos, error_id):
+    raise ParseError._on_demand(text, pos, _errors[error_id])
+
+
+# The "Grammar" function sets this to a ResultCache when it has one.
+_result_cache = None
+
+
+def _trampoline(text, pos, start, memo):
+    # The memo table maps each parse function to its own table, which maps
+    # positions to results. This way, each lookup hashes the function and an
+    # int, rather than a new (CALL, function, position) tuple.
+    result = None
+
+    table = memo.get(start)
+    if table is None:
+        table = memo[start] = {}
+
+    gtor = start(text, pos)
+    stack = [(table, pos, gtor)]
+
+    while stack:
+        table, pos, gtor = stack[-1]
+        result = gtor.send(result)
+
+        if result[0] != 3:
+            stack.pop()
+            table[pos] = result
+            continue
+
+        func, pos = result[1], result[2]
+        table = memo.get(func)
+        if table is None:
+            table = memo[func] = {}
+
+        if pos in table:
+            result = table[pos]
+        else:
+            stack.append((table, pos, func(text, pos)))
+            result = None
+
+    return result
+
+
+def _run_with_options(text, pos, start, memo_policy='full', memo_size=None,
+        max_memo_entries=None, stats=None, max_steps=None, deadline=None):
+    # This is the same loop as "_trampoline", only it uses a memo policy, it
+    # counts calls and memo hits, and it enforces the budget.
+    memo = _create_memo(memo_policy, memo_size, max_memo_entries)
+    get, put = memo.get, memo.put
+    budget = _Budget(max_steps, deadline)
+
+    if stats is None:
+        stats = ParseStats()
+
+    # Count the call to the start rule as the first memo miss.
+    calls, hits = 1, 0
+    check_at = budget.check(calls, pos, stats)
+    result = None
+
+    key = (3, start, pos)
+    gtor = start(text, pos)
+    stack = [(key, gtor)]
+
+    try:
+        while stack:
+            key, gtor = stack[-1]
+            result = gtor.send(result)
+
+            if result[0] != 3:
+                stack.pop()
+                put(key, result)
+                continue
+
+            calls += 1
+            if calls >= check_at:
+                check_at = budget.check(calls, result[2], stats)
+
+            cached = get(result)
+
+            if cached is None:
+                gtor = result[1](text, result[2])
+                stack.append((result, gtor))
+                result = None
+            else:
+                hits += 1
+                result = cached
+    finally:
+        stats._record(memo, calls, hits)
+
+    return result
+
+
+def _finditer(text, pos, start, prefilter):
+    # The prefilter is a string or a compiled regex that finds the positions
+    # where a match might begin. Without one, try every position. (The text may
+    # also be a bytes-like object, like an mmap, or a sequence of tokens.)
+    is_str = isinstance(getattr(prefilter, 'pattern', prefilter), str)
+    if is_str != isinstance(text, str) or not hasattr(text, 'find'):
+        prefilter = None
+
+    memo = {}
+    lines = _LineCounter(text)
+    pruned = pos
+    length = len(text)
+
+    while pos <= length:
+        if isinstance(prefilter, (str, bytes)):
+            pos = text.find(prefilter, pos)
+            if pos < 0:
+                return
+        elif prefilter is not None:
+            found = prefilter.search(text, pos)
+            if found is None:
+                return
+            pos = found.start()
+
+        # Every attempt shares the memo table. No attempt looks behind its
+        # starting position, so the entries behind it are dead.
+        if pos - pruned >= _PRUNE_DISTANCE:
+            for func, table in memo.items():
+                memo[func] = {k: v for k, v in table.items() if k >= pos}
+            pruned = pos
+
+        result = _trampoline(text, pos, start, memo)
+        if not result[0]:
+            pos += 1
+            continue
+
+        value, end = result[1], result[2]
+        lines.advance(pos)
+        _locate_nodes(value, lines)
+        yield _Match(value, pos, end, *lines.locate(pos))
+        pos = end if end > pos else pos + 1
+
+
+def dumps(tree):
+    chunks = []
+    _schema().dump(tree, chunks.append)
+    return b''.join(chunks)
+
+
+def dump(tree, file):
+    _schema().dump(tree, file.write)
+
+
+def loads(data):
+    return _schema().loads(data)
+
+
+def load(file):
+    return loads(file.read())
+
+
+# The schema numbers the classes of the module for "dumps" and "loads". It's
+# created the first time that one of them is called, after the classes exist.
+_tree_schema = None
+
+
+def _schema():
+    global _tree_schema
+    if _tree_schema is None:
+        _tree_schema = _TreeSchema(globals())
+    return _tree_schema
+
+matcher2 = _compile_re('[ \\t]+', flags=0).match
+_errors[2] = ('Space', '/[ \\\\t]+/', 'Expected to match the regular expression /[ \\t]+/')
+matcher4 = _compile_re('#[^\\r\\n]*', flags=0).match
+_errors[4] = ('Comment', '/#[^\\\\r\\\\n]*/', 'Expected to match the regular expression /#[^\\r\\n]*/')
+matcher6 = _compile_re('[\\r\\n][\\s]*', flags=0).match
+_errors[6] = ('Newline', '/[\\\\r\\\\n][\\\\s]*/', 'Expected to match the regular expression /[\\r\\n][\\s]*/')
+_errors[9] = ('Sep', "Newline | ';'", 'Unexpected input')
+_errors[11] = ('Sep', "';'", "Expected to match the string ';'")
+matcher13 = _compile_re('[_a-zA-Z][_a-zA-Z0-9]*', flags=0).match
+_errors[13] = ('Name', '/[_a-zA-Z][_a-zA-Z0-9]*/', 'Expected to match the regular expression /[_a-zA-Z][_a-zA-Z0-9]*/')
+_errors[17] = ('Comma', "','", "Expected to match the string ','")
+_errors[27] = ('kw', 'Name where `lambda x: x == word`', 'Expected to satisfy the predicate: `lambda x: x == word`')
+_errors[35] = ('Params', "'('", "Expected to match the string '('")
+_errors[41] = ('Params', "')'", "Expected to match the string ')'")
+_errors[43] = ('IgnoreKeyword', "kw('ignored') | kw('ignore')", 'Unexpected input')
+_errors[46] = ('IgnoreKeyword', "'ignored'", "Expected to match the string 'ignored'")
+_errors[49] = ('IgnoreKeyword', "'ignore'", "Expected to match the string 'ignore'")
+_errors[53] = ('StringLiteral', '/(?s)[bB]?("""([^\\\\\\\\]|\\\\\\\\.)*?""")[iI]?/ | /(?s)[bB]?(\'\'\'([^\\\\\\\\]|\\\\\\\\.)*?\'\'\')[iI]?/ | /[bB]?("([^"\\\\\\\\]|\\\\\\\\.)*")[iI]?/ | /[bB]?(\'([^\'\\\\\\\\]|\\\\\\\\.)*\')[iI]?/', 'Unexpected input')
+matcher54 = _compile_re('(?s)[bB]?("""([^\\\\]|\\\\.)*?""")[iI]?', flags=0).match
+_errors[54] = ('StringLiteral', '/(?s)[bB]?("""([^\\\\\\\\]|\\\\\\\\.)*?""")[iI]?/', 'Expected to match the regular expression /(?s)[bB]?("""([^\\\\]|\\\\.)*?""")[iI]?/')
+matcher55 = _compile_re("(?s)[bB]?('''([^\\\\]|\\\\.)*?''')[iI]?", flags=0).match
+_errors[55] = ('StringLiteral', "/(?s)[bB]?('''([^\\\\\\\\]|\\\\\\\\.)*?''')[iI]?/", "Expected to match the regular expression /(?s)[bB]?('''([^\\\\]|\\\\.)*?''')[iI]?/")
+matcher56 = _compile_re('[bB]?("([^"\\\\]|\\\\.)*")[iI]?', flags=0).match
+_errors[56] = ('StringLiteral', '/[bB]?("([^"\\\\\\\\]|\\\\\\\\.)*")[iI]?/', 'Expected to match the regular expression /[bB]?("([^"\\\\]|\\\\.)*")[iI]?/')
+matcher57 = _compile_re("[bB]?('([^'\\\\]|\\\\.)*')[iI]?", flags=0).match
+_errors[57] = ('StringLiteral', "/[bB]?('([^'\\\\\\\\]|\\\\\\\\.)*')[iI]?/", "Expected to match the regular expression /[bB]?('([^'\\\\]|\\\\.)*')[iI]?/")
+matcher61 = _compile_re('[bB]?\\/([^\\/\\\\]|\\\\.)*\\/[iI]?', flags=0).match
+_errors[61] = ('RegexLiteral', '/[bB]?\\\\/([^\\\\/\\\\\\\\]|\\\\\\\\.)*\\\\/[iI]?/', 'Expected to match the regular expression /[bB]?\\/([^\\/\\\\]|\\\\.)*\\/[iI]?/')
+matcher66 = _compile_re('(?s)```.*?```', flags=0).match
+_errors[66] = ('PythonSection', '/(?s)```.*?```/', 'Expected to match the regular expression /(?s)```.*?```/')
+_errors[71] = ('PythonExpression', "/`.*?`/ |> `lambda x: x[1:-1]` | /\\\\d+/ | 'True' | 'False' | 'None'", 'Unexpected input')
+matcher73 = _compile_re('`.*?`', flags=0).match
+_errors[73] = ('PythonExpression', '/`.*?`/', 'Expected to match the regular expression /`.*?`/')
+matcher75 = _compile_re('\\d+', flags=0).match
+_errors[75] = ('PythonExpression', '/\\\\d+/', 'Expected to match the regular expression /\\d+/')
+_errors[76] = ('PythonExpression', "'True'", "Expected to match the string 'True'")
+_errors[77] = ('PythonExpression', "'False'", "Expected to match the string 'False'")
+_errors[78] = ('PythonExpression', "'None'", "Expected to match the string 'None'")
+_errors[94] = ('RuleDef', "'=>' | '=' | ':'", 'Unexpected input')
+_errors[95] = ('RuleDef', "'=>'", "Expected to match the string '=>'")
+_errors[96] = ('RuleDef', "'='", "Expected to match the string '='")
+_errors[97] = ('RuleDef', "':'", "Expected to match the string ':'")
+_errors[106] = ('ClassDef', "'class'", "Expected to match the string 'class'")
+_errors[116] = ('ClassDef', "'{'", "Expected to match the string '{'")
+_errors[120] = ('ClassDef', "'}'", "Expected to match the string '}'")
+_errors[128] = ('Stmt', 'ClassDef | RuleDef | IgnoreStmt | PythonSection | PythonExpression', 'Unexpected input')
+_errors[141] = ('LetExpression', "'let'", "Expected to match the string 'let'")
+_errors[145] = ('LetExpression', "'='", "Expected to match the string '='")
+_errors[153] = ('LetExpression', "'in'", "Expected to match the string 'in'")
+_errors[165] = ('ListLiteral', "'['", "Expected to match the string '['")
+_errors[171] = ('ListLiteral', "']'", "Expected to match the string ']'")
+_errors[173] = ('Atom', "('(' >> wrap(Expr)) << ')' | StringLiteral | RegexLiteral | LetExpression | ListLiteral | PythonExpression | Ref", 'Unexpected input')
+_errors[176] = ('Atom', "'('", "Expected to match the string '('")
+_errors[180] = ('Atom', "')'", "Expected to match the string ')'")
+_errors[192] = ('KeywordArg', "'=' | ':'", 'Unexpected input')
+_errors[193] = ('KeywordArg', "'='", "Expected to match the string '='")
+_errors[194] = ('KeywordArg', "':'", "Expected to match the string ':'")
+_errors[202] = ('ArgList', "'('", "Expected to match the string '('")
+_errors[206] = ('ArgList', 'KeywordArg | Expr', 'Unexpected input')
+_errors[210] = ('ArgList', "')'", "Expected to match the string ')'")
+_errors[217] = ('Expr', "'?' | '*' | '+' | Repeat", 'Unexpected input')
+_errors[218] = ('Expr', "'?'", "Expected to match the string '?'")
+_errors[219] = ('Expr', "'*'", "Expected to match the string '*'")
+_errors[220] = ('Expr', "'+'", "Expected to match the string '+'")
+_errors[225] = ('Expr', "'//' | '/?'", 'Unexpected input')
+_errors[226] = ('Expr', "'//'", "Expected to match the string '//'")
+_errors[227] = ('Expr', "'/?'", "Expected to match the string '/?'")
+_errors[231] = ('Expr', "'<<' | '>>'", 'Unexpected input')
+_errors[232] = ('Expr', "'<<'", "Expected to match the string '<<'")
+_errors[233] = ('Expr', "'>>'", "Expected to match the string '>>'")
+_errors[237] = ('Expr', "'<|' | '|>' | 'where'", 'Unexpected input')
+_errors[238] = ('Expr', "'<|'", "Expected to match the string '<|'")
+_errors[239] = ('Expr', "'|>'", "Expected to match the string '|>'")
+_errors[240] = ('Expr', "'where'", "Expected to match the string 'where'")
+_errors[244] = ('Expr', "'|'", "Expected to match the string '|'")
+_errors[248] = ('Repeat', "'{'", "Expected to match the string '{'")
+_errors[255] = ('Repeat', "','", "Expected to match the string ','")
+_errors[258] = ('Repeat', "','", "Expected to match the string ','")
+_errors[262] = ('Repeat', "'}'", "Expected to match the string '}'")
+_errors[264] = ('RepeatArg', 'PythonExpression | Ref', 'Unexpected input')
+_errors[282] = ('start', 'ManyStmts | SingleExpr', 'Unexpected input')
 
 def _try_Space(_text, _pos):
     # Rule 'Space'
     # Begin Regex
     # /[ \\t]+/
-    match1 = matcher1(_text, _pos)
+    match1 = matcher2(_text, _pos)
     if match1:
         _result = match1.group(0)
         _pos = (yield (3, _try__ignored, match1.end()))[2]
         _status = True
     else:
-        _result = _raise_error2
+        _result = 2
         _status = False
     # End Regex
     yield (_status, _result, _pos)
 
-def _parse_Space(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Space, fullparse)
+def _parse_Space(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Space, fullparse, **options)
+
+def _find_Space(text, pos=0):
+    return _finditer(text, pos, _try_Space, _compile_re('(?:[\\ \\\t])'))
 
 Space = Rule('Space', _parse_Space, """
     Space = /[ \\t]+/
-""")
-def _raise_error2(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Space' rule, at the expression:\n"
-    '    /[ \\\\t]+/\n\n'
-    'Expected to match the regular expression /[ \\t]+/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Space)
 def _try_Comment(_text, _pos):
     # Rule 'Comment'
     # Begin Regex
     # /#[^\\r\\n]*/
-    match2 = matcher2(_text, _pos)
+    match2 = matcher4(_text, _pos)
     if match2:
         _result = match2.group(0)
         _pos = (yield (3, _try__ignored, match2.end()))[2]
         _status = True
     else:
-        _result = _raise_error4
+        _result = 4
         _status = False
     # End Regex
     yield (_status, _result, _pos)
 
-def _parse_Comment(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Comment, fullparse)
+def _parse_Comment(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Comment, fullparse, **options)
+
+def _find_Comment(text, pos=0):
+    return _finditer(text, pos, _try_Comment, _compile_re('(?:\\#)'))
 
 Comment = Rule('Comment', _parse_Comment, """
     Comment = /#[^\\r\\n]*/
-""")
-def _raise_error4(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Comment' rule, at the expression:\n"
-    '    /#[^\\\\r\\\\n]*/\n\n'
-    'Expected to match the regular expression /#[^\\r\\n]*/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Comment)
 def _try_Newline(_text, _pos):
     # Rule 'Newline'
     # Begin Regex
     # /[\\r\\n][\\s]*/
-    match3 = matcher3(_text, _pos)
+    match3 = matcher6(_text, _pos)
     if match3:
         _result = match3.group(0)
         _pos = (yield (3, _try__ignored, match3.end()))[2]
         _status = True
     else:
-        _result = _raise_error6
+        _result = 6
         _status = False
     # End Regex
     yield (_status, _result, _pos)
 
-def _parse_Newline(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Newline, fullparse)
+def _parse_Newline(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Newline, fullparse, **options)
+
+def _find_Newline(text, pos=0):
+    return _finditer(text, pos, _try_Newline, _compile_re('(?:[\\\r\\\n])'))
 
 Newline = Rule('Newline', _parse_Newline, """
     Newline = /[\\r\\n][\\s]*/
-""")
-def _raise_error6(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Newline' rule, at the expression:\n"
-    '    /[\\\\r\\\\n][\\\\s]*/\n\n'
-    'Expected to match the regular expression /[\\r\\n][\\s]*/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Newline)
 def _try_Sep(_text, _pos):
     # Rule 'Sep'
     # Begin List
@@ -539,7 +1807,7 @@ def _try_Sep(_text, _pos):
     while True:
         checkpoint1 = _pos
         # Begin Choice
-        farthest_err1 = _raise_error9
+        farthest_err1 = 9
         backtrack1 = farthest_pos1 = _pos
         while True:
             # Option 1:
@@ -561,7 +1829,7 @@ def _try_Sep(_text, _pos):
                 _pos = (yield (3, _try__ignored, end1))[2]
                 _status = True
             else:
-                _result = _raise_error11
+                _result = 11
                 _status = False
             # End Str
             if _status:
@@ -580,81 +1848,39 @@ def _try_Sep(_text, _pos):
     # End List
     yield (_status, _result, _pos)
 
-def _parse_Sep(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Sep, fullparse)
+def _parse_Sep(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Sep, fullparse, **options)
+
+def _find_Sep(text, pos=0):
+    return _finditer(text, pos, _try_Sep, _compile_re('(?:[\\\r\\\n])|;'))
 
 Sep = Rule('Sep', _parse_Sep, """
     Sep = (Newline | ';')+
-""")
-def _raise_error9(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Sep' rule, at the expression:\n"
-    "    Newline | ';'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error11(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Sep' rule, at the expression:\n"
-    "    ';'\n\n"
-    "Expected to match the string ';'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Sep)
 def _try_Name(_text, _pos):
     # Rule 'Name'
     # Begin Regex
     # /[_a-zA-Z][_a-zA-Z0-9]*/
-    match4 = matcher4(_text, _pos)
+    match4 = matcher13(_text, _pos)
     if match4:
         _result = match4.group(0)
         _pos = (yield (3, _try__ignored, match4.end()))[2]
         _status = True
     else:
-        _result = _raise_error13
+        _result = 13
         _status = False
     # End Regex
     yield (_status, _result, _pos)
 
-def _parse_Name(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Name, fullparse)
+def _parse_Name(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Name, fullparse, **options)
+
+def _find_Name(text, pos=0):
+    return _finditer(text, pos, _try_Name, _compile_re('(?:[_a-zA-Z])'))
 
 Name = Rule('Name', _parse_Name, """
     Name = /[_a-zA-Z][_a-zA-Z0-9]*/
-""")
-def _raise_error13(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Name' rule, at the expression:\n"
-    '    /[_a-zA-Z][_a-zA-Z0-9]*/\n\n'
-    'Expected to match the regular expression /[_a-zA-Z][_a-zA-Z0-9]*/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Name)
 def _parse_function_17(_text, _pos):
     # Begin Str
     value2 = ','
@@ -664,7 +1890,7 @@ def _parse_function_17(_text, _pos):
         _pos = (yield (3, _try__ignored, end2))[2]
         _status = True
     else:
-        _result = _raise_error17
+        _result = 17
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -679,28 +1905,15 @@ def _try_Comma(_text, _pos):
     # End Call
     yield (_status, _result, _pos)
 
-def _parse_Comma(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Comma, fullparse)
+def _parse_Comma(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Comma, fullparse, **options)
+
+def _find_Comma(text, pos=0):
+    return _finditer(text, pos, _try_Comma, None)
 
 Comma = Rule('Comma', _parse_Comma, """
     Comma = wrap(',')
-""")
-def _raise_error17(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Comma' rule, at the expression:\n"
-    "    ','\n\n"
-    "Expected to match the string ','"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Comma)
 def _try_wrap(_text, _pos, x):
     # Rule 'wrap'
     # Begin Discard
@@ -752,12 +1965,15 @@ def _try_wrap(_text, _pos, x):
     # End Discard
     yield (_status, _result, _pos)
 
-def _parse_wrap(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_wrap, fullparse)
+def _parse_wrap(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_wrap, fullparse, **options)
+
+def _find_wrap(text, pos=0):
+    return _finditer(text, pos, _try_wrap, None)
 
 wrap = Rule('wrap', _parse_wrap, """
     wrap(x) = (Skip(Newline) >> x) << Skip(Newline)
-""")
+""", _find_wrap)
 def _try_kw(_text, _pos, word):
     # Rule 'kw'
     # Begin Where
@@ -772,33 +1988,20 @@ def _try_kw(_text, _pos, word):
         if _result(arg2):
             _result = arg2
         else:
-            _result = _raise_error27
+            _result = 27
             _status = False
     # End Where
     yield (_status, _result, _pos)
 
-def _parse_kw(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_kw, fullparse)
+def _parse_kw(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_kw, fullparse, **options)
+
+def _find_kw(text, pos=0):
+    return _finditer(text, pos, _try_kw, None)
 
 kw = Rule('kw', _parse_kw, """
     kw(word) = Name where `lambda x: x == word`
-""")
-def _raise_error27(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'kw' rule, at the expression:\n"
-    '    Name where `lambda x: x == word`\n\n'
-    'Expected to satisfy the predicate: `lambda x: x == word`'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_kw)
 def _parse_function_35(_text, _pos):
     # Begin Str
     value3 = '('
@@ -808,7 +2011,7 @@ def _parse_function_35(_text, _pos):
         _pos = (yield (3, _try__ignored, end3))[2]
         _status = True
     else:
-        _result = _raise_error35
+        _result = 35
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -866,7 +2069,7 @@ def _try_Params(_text, _pos):
             _pos = (yield (3, _try__ignored, end4))[2]
             _status = True
         else:
-            _result = _raise_error41
+            _result = 41
             _status = False
         # End Str
         if _status:
@@ -875,44 +2078,15 @@ def _try_Params(_text, _pos):
     # End Discard
     yield (_status, _result, _pos)
 
-def _parse_Params(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Params, fullparse)
+def _parse_Params(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Params, fullparse, **options)
+
+def _find_Params(text, pos=0):
+    return _finditer(text, pos, _try_Params, None)
 
 Params = Rule('Params', _parse_Params, """
     Params = (wrap('(') >> (wrap(Name) /? Comma)) << ')'
-""")
-def _raise_error35(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Params' rule, at the expression:\n"
-    "    '('\n\n"
-    "Expected to match the string '('"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error41(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Params' rule, at the expression:\n"
-    "    ')'\n\n"
-    "Expected to match the string ')'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Params)
 def _parse_function_46(_text, _pos):
     # Begin Str
     value5 = 'ignored'
@@ -922,7 +2096,7 @@ def _parse_function_46(_text, _pos):
         _pos = (yield (3, _try__ignored, end5))[2]
         _status = True
     else:
-        _result = _raise_error46
+        _result = 46
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -936,7 +2110,7 @@ def _parse_function_49(_text, _pos):
         _pos = (yield (3, _try__ignored, end6))[2]
         _status = True
     else:
-        _result = _raise_error49
+        _result = 49
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -944,7 +2118,7 @@ def _parse_function_49(_text, _pos):
 def _try_IgnoreKeyword(_text, _pos):
     # Rule 'IgnoreKeyword'
     # Begin Choice
-    farthest_err2 = _raise_error43
+    farthest_err2 = 43
     backtrack2 = farthest_pos2 = _pos
     while True:
         # Option 1:
@@ -978,60 +2152,15 @@ def _try_IgnoreKeyword(_text, _pos):
     # End Choice
     yield (_status, _result, _pos)
 
-def _parse_IgnoreKeyword(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_IgnoreKeyword, fullparse)
+def _parse_IgnoreKeyword(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_IgnoreKeyword, fullparse, **options)
+
+def _find_IgnoreKeyword(text, pos=0):
+    return _finditer(text, pos, _try_IgnoreKeyword, None)
 
 IgnoreKeyword = Rule('IgnoreKeyword', _parse_IgnoreKeyword, """
     IgnoreKeyword = kw('ignored') | kw('ignore')
-""")
-def _raise_error43(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'IgnoreKeyword' rule, at the expression:\n"
-    "    kw('ignored') | kw('ignore')\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error46(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'IgnoreKeyword' rule, at the expression:\n"
-    "    'ignored'\n\n"
-    "Expected to match the string 'ignored'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error49(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'IgnoreKeyword' rule, at the expression:\n"
-    "    'ignore'\n\n"
-    "Expected to match the string 'ignore'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_IgnoreKeyword)
 class StringLiteral(Node):
     """
     class StringLiteral {
@@ -1048,8 +2177,16 @@ class StringLiteral(Node):
         return f'StringLiteral(value={self.value!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_StringLiteral, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_StringLiteral, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_StringLiteral, _compile_re('(?s:[bB]|")|(?s:[bB]|\')|(?:[bB]|")|(?:[bB]|\')'))
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_StringLiteral, _compile_re('(?s:[bB]|")|(?s:[bB]|\')|(?:[bB]|")|(?:[bB]|\')')), None)
 
 
 def _try_StringLiteral(_text, _pos):
@@ -1057,19 +2194,19 @@ def _try_StringLiteral(_text, _pos):
     start_pos1 = _pos
     while True:
         # Begin Choice
-        farthest_err3 = _raise_error53
+        farthest_err3 = 53
         farthest_pos3 = _pos
         while True:
             # Option 1:
             # Begin Regex
             # /(?s)[bB]?("""([^\\\\]|\\\\.)*?""")[iI]?/
-            match5 = matcher5(_text, _pos)
+            match5 = matcher54(_text, _pos)
             if match5:
                 _result = match5.group(0)
                 _pos = (yield (3, _try__ignored, match5.end()))[2]
                 _status = True
             else:
-                _result = _raise_error54
+                _result = 54
                 _status = False
             # End Regex
             if _status:
@@ -1077,13 +2214,13 @@ def _try_StringLiteral(_text, _pos):
             # Option 2:
             # Begin Regex
             # /(?s)[bB]?('''([^\\\\]|\\\\.)*?''')[iI]?/
-            match6 = matcher6(_text, _pos)
+            match6 = matcher55(_text, _pos)
             if match6:
                 _result = match6.group(0)
                 _pos = (yield (3, _try__ignored, match6.end()))[2]
                 _status = True
             else:
-                _result = _raise_error55
+                _result = 55
                 _status = False
             # End Regex
             if _status:
@@ -1091,13 +2228,13 @@ def _try_StringLiteral(_text, _pos):
             # Option 3:
             # Begin Regex
             # /[bB]?("([^"\\\\]|\\\\.)*")[iI]?/
-            match7 = matcher7(_text, _pos)
+            match7 = matcher56(_text, _pos)
             if match7:
                 _result = match7.group(0)
                 _pos = (yield (3, _try__ignored, match7.end()))[2]
                 _status = True
             else:
-                _result = _raise_error56
+                _result = 56
                 _status = False
             # End Regex
             if _status:
@@ -1105,13 +2242,13 @@ def _try_StringLiteral(_text, _pos):
             # Option 4:
             # Begin Regex
             # /[bB]?('([^'\\\\]|\\\\.)*')[iI]?/
-            match8 = matcher8(_text, _pos)
+            match8 = matcher57(_text, _pos)
             if match8:
                 _result = match8.group(0)
                 _pos = (yield (3, _try__ignored, match8.end()))[2]
                 _status = True
             else:
-                _result = _raise_error57
+                _result = 57
                 _status = False
             # End Regex
             if _status:
@@ -1129,86 +2266,6 @@ def _try_StringLiteral(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error53(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'StringLiteral' rule, at the expression:\n"
-    '    /(?s)[bB]?("""([^\\\\\\\\]|\\\\\\\\.)*?""")[iI]?/ | /(?s)[bB]?(\'\'\'([^\\\\\\\\]|\\\\\\\\.)*?\'\'\')[iI]?/ | /[bB]?("([^"\\\\\\\\]|\\\\\\\\.)*")[iI]?/ | /[bB]?(\'([^\'\\\\\\\\]|\\\\\\\\.)*\')[iI]?/\n\n'
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error54(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'StringLiteral' rule, at the expression:\n"
-    '    /(?s)[bB]?("""([^\\\\\\\\]|\\\\\\\\.)*?""")[iI]?/\n\n'
-    'Expected to match the regular expression /(?s)[bB]?("""([^\\\\]|\\\\.)*?""")[iI]?/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error55(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'StringLiteral' rule, at the expression:\n"
-    "    /(?s)[bB]?('''([^\\\\\\\\]|\\\\\\\\.)*?''')[iI]?/\n\n"
-    "Expected to match the regular expression /(?s)[bB]?('''([^\\\\]|\\\\.)*?''')[iI]?/"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error56(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'StringLiteral' rule, at the expression:\n"
-    '    /[bB]?("([^"\\\\\\\\]|\\\\\\\\.)*")[iI]?/\n\n'
-    'Expected to match the regular expression /[bB]?("([^"\\\\]|\\\\.)*")[iI]?/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error57(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'StringLiteral' rule, at the expression:\n"
-    "    /[bB]?('([^'\\\\\\\\]|\\\\\\\\.)*')[iI]?/\n\n"
-    "Expected to match the regular expression /[bB]?('([^'\\\\]|\\\\.)*')[iI]?/"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class RegexLiteral(Node):
     """
     class RegexLiteral {
@@ -1225,8 +2282,16 @@ class RegexLiteral(Node):
         return f'RegexLiteral(value={self.value!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_RegexLiteral, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_RegexLiteral, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_RegexLiteral, _compile_re('(?:[bB]|/)'))
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_RegexLiteral, _compile_re('(?:[bB]|/)')), None)
 
 
 def _try_RegexLiteral(_text, _pos):
@@ -1235,13 +2300,13 @@ def _try_RegexLiteral(_text, _pos):
     while True:
         # Begin Regex
         # /[bB]?\\/([^\\/\\\\]|\\\\.)*\\/[iI]?/
-        match9 = matcher9(_text, _pos)
+        match9 = matcher61(_text, _pos)
         if match9:
             _result = match9.group(0)
             _pos = (yield (3, _try__ignored, match9.end()))[2]
             _status = True
         else:
-            _result = _raise_error61
+            _result = 61
             _status = False
         # End Regex
         if not (_status):
@@ -1253,22 +2318,6 @@ def _try_RegexLiteral(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error61(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'RegexLiteral' rule, at the expression:\n"
-    '    /[bB]?\\\\/([^\\\\/\\\\\\\\]|\\\\\\\\.)*\\\\/[iI]?/\n\n'
-    'Expected to match the regular expression /[bB]?\\/([^\\/\\\\]|\\\\.)*\\/[iI]?/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class PythonSection(Node):
     """
     class PythonSection {
@@ -1285,8 +2334,16 @@ class PythonSection(Node):
         return f'PythonSection(value={self.value!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_PythonSection, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_PythonSection, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_PythonSection, _compile_re('(?s:`)'))
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_PythonSection, _compile_re('(?s:`)')), None)
 
 
 def _try_PythonSection(_text, _pos):
@@ -1297,13 +2354,13 @@ def _try_PythonSection(_text, _pos):
         # /(?s)```.*?```/ |> `lambda x: textwrap.dedent(x[3:-3])`
         # Begin Regex
         # /(?s)```.*?```/
-        match10 = matcher10(_text, _pos)
+        match10 = matcher66(_text, _pos)
         if match10:
             _result = match10.group(0)
             _pos = (yield (3, _try__ignored, match10.end()))[2]
             _status = True
         else:
-            _result = _raise_error66
+            _result = 66
             _status = False
         # End Regex
         if _status:
@@ -1321,22 +2378,6 @@ def _try_PythonSection(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error66(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonSection' rule, at the expression:\n"
-    '    /(?s)```.*?```/\n\n'
-    'Expected to match the regular expression /(?s)```.*?```/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class PythonExpression(Node):
     """
     class PythonExpression {
@@ -1353,8 +2394,16 @@ class PythonExpression(Node):
         return f'PythonExpression(value={self.value!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_PythonExpression, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_PythonExpression, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_PythonExpression, _compile_re('(?:`)|(?:[\\d])|True|False|None'))
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_PythonExpression, _compile_re('(?:`)|(?:[\\d])|True|False|None')), None)
 
 
 def _try_PythonExpression(_text, _pos):
@@ -1362,7 +2411,7 @@ def _try_PythonExpression(_text, _pos):
     start_pos4 = _pos
     while True:
         # Begin Choice
-        farthest_err4 = _raise_error71
+        farthest_err4 = 71
         backtrack3 = farthest_pos4 = _pos
         while True:
             # Option 1:
@@ -1370,13 +2419,13 @@ def _try_PythonExpression(_text, _pos):
             # /`.*?`/ |> `lambda x: x[1:-1]`
             # Begin Regex
             # /`.*?`/
-            match11 = matcher11(_text, _pos)
+            match11 = matcher73(_text, _pos)
             if match11:
                 _result = match11.group(0)
                 _pos = (yield (3, _try__ignored, match11.end()))[2]
                 _status = True
             else:
-                _result = _raise_error73
+                _result = 73
                 _status = False
             # End Regex
             if _status:
@@ -1394,13 +2443,13 @@ def _try_PythonExpression(_text, _pos):
             # Option 2:
             # Begin Regex
             # /\\d+/
-            match12 = matcher12(_text, _pos)
+            match12 = matcher75(_text, _pos)
             if match12:
                 _result = match12.group(0)
                 _pos = (yield (3, _try__ignored, match12.end()))[2]
                 _status = True
             else:
-                _result = _raise_error75
+                _result = 75
                 _status = False
             # End Regex
             if _status:
@@ -1414,7 +2463,7 @@ def _try_PythonExpression(_text, _pos):
                 _pos = (yield (3, _try__ignored, end7))[2]
                 _status = True
             else:
-                _result = _raise_error76
+                _result = 76
                 _status = False
             # End Str
             if _status:
@@ -1428,7 +2477,7 @@ def _try_PythonExpression(_text, _pos):
                 _pos = (yield (3, _try__ignored, end8))[2]
                 _status = True
             else:
-                _result = _raise_error77
+                _result = 77
                 _status = False
             # End Str
             if _status:
@@ -1442,7 +2491,7 @@ def _try_PythonExpression(_text, _pos):
                 _pos = (yield (3, _try__ignored, end9))[2]
                 _status = True
             else:
-                _result = _raise_error78
+                _result = 78
                 _status = False
             # End Str
             if _status:
@@ -1460,102 +2509,6 @@ def _try_PythonExpression(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error71(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonExpression' rule, at the expression:\n"
-    "    /`.*?`/ |> `lambda x: x[1:-1]` | /\\\\d+/ | 'True' | 'False' | 'None'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error73(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonExpression' rule, at the expression:\n"
-    '    /`.*?`/\n\n'
-    'Expected to match the regular expression /`.*?`/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error75(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonExpression' rule, at the expression:\n"
-    '    /\\\\d+/\n\n'
-    'Expected to match the regular expression /\\d+/'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error76(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonExpression' rule, at the expression:\n"
-    "    'True'\n\n"
-    "Expected to match the string 'True'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error77(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonExpression' rule, at the expression:\n"
-    "    'False'\n\n"
-    "Expected to match the string 'False'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error78(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'PythonExpression' rule, at the expression:\n"
-    "    'None'\n\n"
-    "Expected to match the string 'None'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class RuleDef(Node):
     """
     class RuleDef {
@@ -1578,13 +2531,21 @@ class RuleDef(Node):
         return f'RuleDef(is_ignored={self.is_ignored!r}, name={self.name!r}, params={self.params!r}, expr={self.expr!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_RuleDef, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_RuleDef, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_RuleDef, None)
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_RuleDef, None), None)
 
 
 def _parse_function_94(_text, _pos):
     # Begin Choice
-    farthest_err5 = _raise_error94
+    farthest_err5 = 94
     farthest_pos5 = _pos
     while True:
         # Option 1:
@@ -1596,7 +2557,7 @@ def _parse_function_94(_text, _pos):
             _pos = (yield (3, _try__ignored, end10))[2]
             _status = True
         else:
-            _result = _raise_error95
+            _result = 95
             _status = False
         # End Str
         if _status:
@@ -1610,7 +2571,7 @@ def _parse_function_94(_text, _pos):
             _pos = (yield (3, _try__ignored, end11))[2]
             _status = True
         else:
-            _result = _raise_error96
+            _result = 96
             _status = False
         # End Str
         if _status:
@@ -1624,7 +2585,7 @@ def _parse_function_94(_text, _pos):
             _pos = (yield (3, _try__ignored, end12))[2]
             _status = True
         else:
-            _result = _raise_error97
+            _result = 97
             _status = False
         # End Str
         if _status:
@@ -1703,70 +2664,6 @@ def _try_RuleDef(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error94(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'RuleDef' rule, at the expression:\n"
-    "    '=>' | '=' | ':'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error95(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'RuleDef' rule, at the expression:\n"
-    "    '=>'\n\n"
-    "Expected to match the string '=>'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error96(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'RuleDef' rule, at the expression:\n"
-    "    '='\n\n"
-    "Expected to match the string '='"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error97(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'RuleDef' rule, at the expression:\n"
-    "    ':'\n\n"
-    "Expected to match the string ':'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class ClassDef(Node):
     """
     class ClassDef {
@@ -1787,8 +2684,16 @@ class ClassDef(Node):
         return f'ClassDef(name={self.name!r}, params={self.params!r}, fields={self.fields!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_ClassDef, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_ClassDef, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_ClassDef, None)
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_ClassDef, None), None)
 
 
 def _parse_function_106(_text, _pos):
@@ -1800,7 +2705,7 @@ def _parse_function_106(_text, _pos):
         _pos = (yield (3, _try__ignored, end13))[2]
         _status = True
     else:
-        _result = _raise_error106
+        _result = 106
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -1814,7 +2719,7 @@ def _parse_function_116(_text, _pos):
         _pos = (yield (3, _try__ignored, end14))[2]
         _status = True
     else:
-        _result = _raise_error116
+        _result = 116
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -1903,7 +2808,7 @@ def _try_ClassDef(_text, _pos):
                 _pos = (yield (3, _try__ignored, end15))[2]
                 _status = True
             else:
-                _result = _raise_error120
+                _result = 120
                 _status = False
             # End Str
             if _status:
@@ -1914,58 +2819,10 @@ def _try_ClassDef(_text, _pos):
             break
         fields = _result
         _result = ClassDef(name, params, fields)
-        _result._position_info = (start_pos6, _pos)
-        break
-    # End Seq
-    yield (_status, _result, _pos)
-
-def _raise_error106(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ClassDef' rule, at the expression:\n"
-    "    'class'\n\n"
-    "Expected to match the string 'class'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error116(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ClassDef' rule, at the expression:\n"
-    "    '{'\n\n"
-    "Expected to match the string '{'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error120(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ClassDef' rule, at the expression:\n"
-    "    '}'\n\n"
-    "Expected to match the string '}'"
-    )
-    raise ParseError((title + details), _pos, line, col)
+        _result._position_info = (start_pos6, _pos)
+        break
+    # End Seq
+    yield (_status, _result, _pos)
 
 class IgnoreStmt(Node):
     """
@@ -1983,8 +2840,16 @@ class IgnoreStmt(Node):
         return f'IgnoreStmt(expr={self.expr!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_IgnoreStmt, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_IgnoreStmt, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_IgnoreStmt, None)
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_IgnoreStmt, None), None)
 
 
 def _try_IgnoreStmt(_text, _pos):
@@ -2016,7 +2881,7 @@ def _try_IgnoreStmt(_text, _pos):
 def _try_Stmt(_text, _pos):
     # Rule 'Stmt'
     # Begin Choice
-    farthest_err6 = _raise_error128
+    farthest_err6 = 128
     backtrack7 = farthest_pos6 = _pos
     while True:
         # Option 1:
@@ -2074,28 +2939,15 @@ def _try_Stmt(_text, _pos):
     # End Choice
     yield (_status, _result, _pos)
 
-def _parse_Stmt(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Stmt, fullparse)
+def _parse_Stmt(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Stmt, fullparse, **options)
+
+def _find_Stmt(text, pos=0):
+    return _finditer(text, pos, _try_Stmt, None)
 
 Stmt = Rule('Stmt', _parse_Stmt, """
     Stmt = ClassDef | RuleDef | IgnoreStmt | PythonSection | PythonExpression
-""")
-def _raise_error128(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Stmt' rule, at the expression:\n"
-    '    ClassDef | RuleDef | IgnoreStmt | PythonSection | PythonExpression\n\n'
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Stmt)
 class LetExpression(Node):
     """
     class LetExpression {
@@ -2116,8 +2968,16 @@ class LetExpression(Node):
         return f'LetExpression(name={self.name!r}, expr={self.expr!r}, body={self.body!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_LetExpression, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_LetExpression, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_LetExpression, None)
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_LetExpression, None), None)
 
 
 def _parse_function_141(_text, _pos):
@@ -2129,7 +2989,7 @@ def _parse_function_141(_text, _pos):
         _pos = (yield (3, _try__ignored, end16))[2]
         _status = True
     else:
-        _result = _raise_error141
+        _result = 141
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -2143,7 +3003,7 @@ def _parse_function_145(_text, _pos):
         _pos = (yield (3, _try__ignored, end17))[2]
         _status = True
     else:
-        _result = _raise_error145
+        _result = 145
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -2157,7 +3017,7 @@ def _parse_function_153(_text, _pos):
         _pos = (yield (3, _try__ignored, end18))[2]
         _status = True
     else:
-        _result = _raise_error153
+        _result = 153
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -2243,54 +3103,6 @@ def _try_LetExpression(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error141(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'LetExpression' rule, at the expression:\n"
-    "    'let'\n\n"
-    "Expected to match the string 'let'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error145(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'LetExpression' rule, at the expression:\n"
-    "    '='\n\n"
-    "Expected to match the string '='"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error153(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'LetExpression' rule, at the expression:\n"
-    "    'in'\n\n"
-    "Expected to match the string 'in'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class Ref(Node):
     """
     class Ref {
@@ -2307,8 +3119,16 @@ class Ref(Node):
         return f'Ref(value={self.value!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_Ref, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_Ref, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_Ref, _compile_re('(?:[_a-zA-Z])'))
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_Ref, _compile_re('(?:[_a-zA-Z])')), None)
 
 
 def _try_Ref(_text, _pos):
@@ -2343,8 +3163,16 @@ class ListLiteral(Node):
         return f'ListLiteral(elements={self.elements!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_ListLiteral, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_ListLiteral, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_ListLiteral, '[')
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_ListLiteral, '['), None)
 
 
 def _try_ListLiteral(_text, _pos):
@@ -2365,7 +3193,7 @@ def _try_ListLiteral(_text, _pos):
                     _pos = (yield (3, _try__ignored, end19))[2]
                     _status = True
                 else:
-                    _result = _raise_error165
+                    _result = 165
                     _status = False
                 # End Str
                 if not (_status):
@@ -2407,7 +3235,7 @@ def _try_ListLiteral(_text, _pos):
                 _pos = (yield (3, _try__ignored, end20))[2]
                 _status = True
             else:
-                _result = _raise_error171
+                _result = 171
                 _status = False
             # End Str
             if _status:
@@ -2423,42 +3251,10 @@ def _try_ListLiteral(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error165(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ListLiteral' rule, at the expression:\n"
-    "    '['\n\n"
-    "Expected to match the string '['"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error171(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ListLiteral' rule, at the expression:\n"
-    "    ']'\n\n"
-    "Expected to match the string ']'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 def _try_Atom(_text, _pos):
     # Rule 'Atom'
     # Begin Choice
-    farthest_err7 = _raise_error173
+    farthest_err7 = 173
     backtrack8 = farthest_pos7 = _pos
     while True:
         # Option 1:
@@ -2476,7 +3272,7 @@ def _try_Atom(_text, _pos):
                     _pos = (yield (3, _try__ignored, end21))[2]
                     _status = True
                 else:
-                    _result = _raise_error176
+                    _result = 176
                     _status = False
                 # End Str
                 if not (_status):
@@ -2499,7 +3295,7 @@ def _try_Atom(_text, _pos):
                 _pos = (yield (3, _try__ignored, end22))[2]
                 _status = True
             else:
-                _result = _raise_error180
+                _result = 180
                 _status = False
             # End Str
             if _status:
@@ -2577,60 +3373,15 @@ def _try_Atom(_text, _pos):
     # End Choice
     yield (_status, _result, _pos)
 
-def _parse_Atom(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Atom, fullparse)
+def _parse_Atom(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Atom, fullparse, **options)
+
+def _find_Atom(text, pos=0):
+    return _finditer(text, pos, _try_Atom, None)
 
 Atom = Rule('Atom', _parse_Atom, """
     Atom = ('(' >> wrap(Expr)) << ')' | StringLiteral | RegexLiteral | LetExpression | ListLiteral | PythonExpression | Ref
-""")
-def _raise_error173(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Atom' rule, at the expression:\n"
-    "    ('(' >> wrap(Expr)) << ')' | StringLiteral | RegexLiteral | LetExpression | ListLiteral | PythonExpression | Ref\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error176(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Atom' rule, at the expression:\n"
-    "    '('\n\n"
-    "Expected to match the string '('"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error180(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Atom' rule, at the expression:\n"
-    "    ')'\n\n"
-    "Expected to match the string ')'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Atom)
 class KeywordArg(Node):
     """
     class KeywordArg {
@@ -2649,8 +3400,16 @@ class KeywordArg(Node):
         return f'KeywordArg(name={self.name!r}, expr={self.expr!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_KeywordArg, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_KeywordArg, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_KeywordArg, _compile_re('(?:[_a-zA-Z])'))
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_KeywordArg, _compile_re('(?:[_a-zA-Z])')), None)
 
 
 def _try_KeywordArg(_text, _pos):
@@ -2667,7 +3426,7 @@ def _try_KeywordArg(_text, _pos):
                 break
             staging13 = _result
             # Begin Choice
-            farthest_err8 = _raise_error192
+            farthest_err8 = 192
             farthest_pos8 = _pos
             while True:
                 # Option 1:
@@ -2679,7 +3438,7 @@ def _try_KeywordArg(_text, _pos):
                     _pos = (yield (3, _try__ignored, end23))[2]
                     _status = True
                 else:
-                    _result = _raise_error193
+                    _result = 193
                     _status = False
                 # End Str
                 if _status:
@@ -2693,7 +3452,7 @@ def _try_KeywordArg(_text, _pos):
                     _pos = (yield (3, _try__ignored, end24))[2]
                     _status = True
                 else:
-                    _result = _raise_error194
+                    _result = 194
                     _status = False
                 # End Str
                 if _status:
@@ -2721,54 +3480,6 @@ def _try_KeywordArg(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error192(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'KeywordArg' rule, at the expression:\n"
-    "    '=' | ':'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error193(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'KeywordArg' rule, at the expression:\n"
-    "    '='\n\n"
-    "Expected to match the string '='"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error194(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'KeywordArg' rule, at the expression:\n"
-    "    ':'\n\n"
-    "Expected to match the string ':'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 class ArgList(Node):
     """
     class ArgList {
@@ -2785,13 +3496,21 @@ class ArgList(Node):
         return f'ArgList(args={self.args!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_ArgList, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_ArgList, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_ArgList, '(')
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_ArgList, '('), None)
 
 
 def _parse_function_206(_text, _pos):
     # Begin Choice
-    farthest_err9 = _raise_error206
+    farthest_err9 = 206
     backtrack9 = farthest_pos9 = _pos
     while True:
         # Option 1:
@@ -2837,7 +3556,7 @@ def _try_ArgList(_text, _pos):
                     _pos = (yield (3, _try__ignored, end25))[2]
                     _status = True
                 else:
-                    _result = _raise_error202
+                    _result = 202
                     _status = False
                 # End Str
                 if not (_status):
@@ -2879,7 +3598,7 @@ def _try_ArgList(_text, _pos):
                 _pos = (yield (3, _try__ignored, end26))[2]
                 _status = True
             else:
-                _result = _raise_error210
+                _result = 210
                 _status = False
             # End Str
             if _status:
@@ -2895,57 +3614,9 @@ def _try_ArgList(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error202(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ArgList' rule, at the expression:\n"
-    "    '('\n\n"
-    "Expected to match the string '('"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error206(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ArgList' rule, at the expression:\n"
-    '    KeywordArg | Expr\n\n'
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error210(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'ArgList' rule, at the expression:\n"
-    "    ')'\n\n"
-    "Expected to match the string ')'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 def _parse_function_225(_text, _pos):
     # Begin Choice
-    farthest_err11 = _raise_error225
+    farthest_err11 = 225
     farthest_pos11 = _pos
     while True:
         # Option 1:
@@ -2957,7 +3628,7 @@ def _parse_function_225(_text, _pos):
             _pos = (yield (3, _try__ignored, end30))[2]
             _status = True
         else:
-            _result = _raise_error226
+            _result = 226
             _status = False
         # End Str
         if _status:
@@ -2971,7 +3642,7 @@ def _parse_function_225(_text, _pos):
             _pos = (yield (3, _try__ignored, end31))[2]
             _status = True
         else:
-            _result = _raise_error227
+            _result = 227
             _status = False
         # End Str
         if _status:
@@ -2984,7 +3655,7 @@ def _parse_function_225(_text, _pos):
 
 def _parse_function_231(_text, _pos):
     # Begin Choice
-    farthest_err12 = _raise_error231
+    farthest_err12 = 231
     farthest_pos12 = _pos
     while True:
         # Option 1:
@@ -2996,7 +3667,7 @@ def _parse_function_231(_text, _pos):
             _pos = (yield (3, _try__ignored, end32))[2]
             _status = True
         else:
-            _result = _raise_error232
+            _result = 232
             _status = False
         # End Str
         if _status:
@@ -3010,7 +3681,7 @@ def _parse_function_231(_text, _pos):
             _pos = (yield (3, _try__ignored, end33))[2]
             _status = True
         else:
-            _result = _raise_error233
+            _result = 233
             _status = False
         # End Str
         if _status:
@@ -3023,7 +3694,7 @@ def _parse_function_231(_text, _pos):
 
 def _parse_function_237(_text, _pos):
     # Begin Choice
-    farthest_err13 = _raise_error237
+    farthest_err13 = 237
     farthest_pos13 = _pos
     while True:
         # Option 1:
@@ -3035,7 +3706,7 @@ def _parse_function_237(_text, _pos):
             _pos = (yield (3, _try__ignored, end34))[2]
             _status = True
         else:
-            _result = _raise_error238
+            _result = 238
             _status = False
         # End Str
         if _status:
@@ -3049,7 +3720,7 @@ def _parse_function_237(_text, _pos):
             _pos = (yield (3, _try__ignored, end35))[2]
             _status = True
         else:
-            _result = _raise_error239
+            _result = 239
             _status = False
         # End Str
         if _status:
@@ -3063,7 +3734,7 @@ def _parse_function_237(_text, _pos):
             _pos = (yield (3, _try__ignored, end36))[2]
             _status = True
         else:
-            _result = _raise_error240
+            _result = 240
             _status = False
         # End Str
         if _status:
@@ -3083,7 +3754,7 @@ def _parse_function_244(_text, _pos):
         _pos = (yield (3, _try__ignored, end37))[2]
         _status = True
     else:
-        _result = _raise_error244
+        _result = 244
         _status = False
     # End Str
     yield (_status, _result, _pos)
@@ -3148,7 +3819,7 @@ def _try_Expr(_text, _pos):
                         checkpoint9 = _pos
                         while True:
                             # Begin Choice
-                            farthest_err10 = _raise_error217
+                            farthest_err10 = 217
                             backtrack10 = farthest_pos10 = _pos
                             while True:
                                 # Option 1:
@@ -3160,7 +3831,7 @@ def _try_Expr(_text, _pos):
                                     _pos = (yield (3, _try__ignored, end27))[2]
                                     _status = True
                                 else:
-                                    _result = _raise_error218
+                                    _result = 218
                                     _status = False
                                 # End Str
                                 if _status:
@@ -3174,7 +3845,7 @@ def _try_Expr(_text, _pos):
                                     _pos = (yield (3, _try__ignored, end28))[2]
                                     _status = True
                                 else:
-                                    _result = _raise_error219
+                                    _result = 219
                                     _status = False
                                 # End Str
                                 if _status:
@@ -3188,7 +3859,7 @@ def _try_Expr(_text, _pos):
                                     _pos = (yield (3, _try__ignored, end29))[2]
                                     _status = True
                                 else:
-                                    _result = _raise_error220
+                                    _result = 220
                                     _status = False
                                 # End Str
                                 if _status:
@@ -3303,8 +3974,11 @@ def _try_Expr(_text, _pos):
     # End OperatorPrecedence
     yield (_status, _result, _pos)
 
-def _parse_Expr(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_Expr, fullparse)
+def _parse_Expr(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_Expr, fullparse, **options)
+
+def _find_Expr(text, pos=0):
+    return _finditer(text, pos, _try_Expr, None)
 
 Expr = Rule('Expr', _parse_Expr, """
     Expr = OperatorPrecedence(
@@ -3316,247 +3990,7 @@ Expr = Rule('Expr', _parse_Expr, """
         LeftAssoc(wrap('<|' | '|>' | 'where')),
         LeftAssoc(wrap('|'))
     )
-""")
-def _raise_error217(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '?' | '*' | '+' | Repeat\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error218(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '?'\n\n"
-    "Expected to match the string '?'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error219(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '*'\n\n"
-    "Expected to match the string '*'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error220(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '+'\n\n"
-    "Expected to match the string '+'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error225(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '//' | '/?'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error226(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '//'\n\n"
-    "Expected to match the string '//'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error227(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '/?'\n\n"
-    "Expected to match the string '/?'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error231(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '<<' | '>>'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error232(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '<<'\n\n"
-    "Expected to match the string '<<'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error233(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '>>'\n\n"
-    "Expected to match the string '>>'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error237(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '<|' | '|>' | 'where'\n\n"
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error238(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '<|'\n\n"
-    "Expected to match the string '<|'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error239(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '|>'\n\n"
-    "Expected to match the string '|>'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error240(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    'where'\n\n"
-    "Expected to match the string 'where'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error244(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Expr' rule, at the expression:\n"
-    "    '|'\n\n"
-    "Expected to match the string '|'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_Expr)
 class Repeat(Node):
     """
     class Repeat {
@@ -3579,8 +4013,16 @@ class Repeat(Node):
         return f'Repeat(open={self.open!r}, start={self.start!r}, stop={self.stop!r}, close={self.close!r})'
 
     @staticmethod
-    def parse(text, pos=0, fullparse=True):
-        return _run(text, pos, _try_Repeat, fullparse)
+    def parse(text, pos=0, fullparse=True, **options):
+        return _run(text, pos, _try_Repeat, fullparse, **options)
+
+    @staticmethod
+    def finditer(text, pos=0):
+        return _finditer(text, pos, _try_Repeat, '{')
+
+    @staticmethod
+    def search(text, pos=0):
+        return next(_finditer(text, pos, _try_Repeat, '{'), None)
 
 
 def _try_Repeat(_text, _pos):
@@ -3595,7 +4037,7 @@ def _try_Repeat(_text, _pos):
             _pos = (yield (3, _try__ignored, end38))[2]
             _status = True
         else:
-            _result = _raise_error248
+            _result = 248
             _status = False
         # End Str
         if not (_status):
@@ -3628,7 +4070,7 @@ def _try_Repeat(_text, _pos):
                     _pos = (yield (3, _try__ignored, end39))[2]
                     _status = True
                 else:
-                    _result = _raise_error255
+                    _result = 255
                     _status = False
                 # End Str
                 if not (_status):
@@ -3653,7 +4095,7 @@ def _try_Repeat(_text, _pos):
                     _pos = (yield (3, _try__ignored, end40))[2]
                     _status = True
                 else:
-                    _result = _raise_error258
+                    _result = 258
                     _status = False
                 # End Str
                 if not (_status):
@@ -3679,7 +4121,7 @@ def _try_Repeat(_text, _pos):
             _pos = (yield (3, _try__ignored, end41))[2]
             _status = True
         else:
-            _result = _raise_error262
+            _result = 262
             _status = False
         # End Str
         if not (_status):
@@ -3691,74 +4133,10 @@ def _try_Repeat(_text, _pos):
     # End Seq
     yield (_status, _result, _pos)
 
-def _raise_error248(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Repeat' rule, at the expression:\n"
-    "    '{'\n\n"
-    "Expected to match the string '{'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error255(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Repeat' rule, at the expression:\n"
-    "    ','\n\n"
-    "Expected to match the string ','"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error258(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Repeat' rule, at the expression:\n"
-    "    ','\n\n"
-    "Expected to match the string ','"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
-def _raise_error262(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'Repeat' rule, at the expression:\n"
-    "    '}'\n\n"
-    "Expected to match the string '}'"
-    )
-    raise ParseError((title + details), _pos, line, col)
-
 def _try_RepeatArg(_text, _pos):
     # Rule 'RepeatArg'
     # Begin Choice
-    farthest_err14 = _raise_error264
+    farthest_err14 = 264
     backtrack13 = farthest_pos14 = _pos
     while True:
         # Option 1:
@@ -3786,28 +4164,15 @@ def _try_RepeatArg(_text, _pos):
     # End Choice
     yield (_status, _result, _pos)
 
-def _parse_RepeatArg(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_RepeatArg, fullparse)
+def _parse_RepeatArg(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_RepeatArg, fullparse, **options)
+
+def _find_RepeatArg(text, pos=0):
+    return _finditer(text, pos, _try_RepeatArg, _compile_re('(?:`)|(?:[\\d])|True|False|None|(?:[_a-zA-Z])'))
 
 RepeatArg = Rule('RepeatArg', _parse_RepeatArg, """
     RepeatArg = PythonExpression | Ref
-""")
-def _raise_error264(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'RepeatArg' rule, at the expression:\n"
-    '    PythonExpression | Ref\n\n'
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_RepeatArg)
 def _try_ManyStmts(_text, _pos):
     # Rule 'ManyStmts'
     # Begin Sep
@@ -3835,12 +4200,15 @@ def _try_ManyStmts(_text, _pos):
     # End Sep
     yield (_status, _result, _pos)
 
-def _parse_ManyStmts(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_ManyStmts, fullparse)
+def _parse_ManyStmts(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_ManyStmts, fullparse, **options)
+
+def _find_ManyStmts(text, pos=0):
+    return _finditer(text, pos, _try_ManyStmts, None)
 
 ManyStmts = Rule('ManyStmts', _parse_ManyStmts, """
     ManyStmts = Stmt /? Sep
-""")
+""", _find_ManyStmts)
 def _try_SingleExpr(_text, _pos):
     # Rule 'SingleExpr'
     # Begin Discard
@@ -3868,12 +4236,15 @@ def _try_SingleExpr(_text, _pos):
     # End Discard
     yield (_status, _result, _pos)
 
-def _parse_SingleExpr(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_SingleExpr, fullparse)
+def _parse_SingleExpr(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_SingleExpr, fullparse, **options)
+
+def _find_SingleExpr(text, pos=0):
+    return _finditer(text, pos, _try_SingleExpr, None)
 
 SingleExpr = Rule('SingleExpr', _parse_SingleExpr, """
     SingleExpr = Expr << Opt(Sep)
-""")
+""", _find_SingleExpr)
 def _try_start(_text, _pos):
     # Rule 'start'
     # Begin Discard
@@ -3903,7 +4274,7 @@ def _try_start(_text, _pos):
             _status = True
             # End Skip
             # Begin Choice
-            farthest_err15 = _raise_error282
+            farthest_err15 = 282
             backtrack15 = farthest_pos15 = _pos
             while True:
                 # Option 1:
@@ -3935,28 +4306,15 @@ def _try_start(_text, _pos):
     # End Discard
     yield (_status, _result, _pos)
 
-def _parse_start(text, pos=0, fullparse=True):
-    return _run(text, pos, _try_start, fullparse)
+def _parse_start(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try_start, fullparse, **options)
+
+def _find_start(text, pos=0):
+    return _finditer(text, pos, _try_start, None)
 
 start = Rule('start', _parse_start, """
     start = _try__ignored >> (Skip(Newline) >> (ManyStmts | SingleExpr))
-""")
-def _raise_error282(_text, _pos):
-    if (len(_text) <= _pos):
-        title = 'Unexpected end of input.'
-        line = None
-        col = None
-    else:
-        (line, col) = _get_line_and_column(_text, _pos)
-        excerpt = _extract_excerpt(_text, _pos, col)
-        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
-    details = (
-    "Failed to parse the 'start' rule, at the expression:\n"
-    '    ManyStmts | SingleExpr\n\n'
-    'Unexpected input'
-    )
-    raise ParseError((title + details), _pos, line, col)
-
+""", _find_start)
 def _try__ignored(_text, _pos):
     # Rule '_ignored'
     # Begin Skip
@@ -3983,9 +4341,12 @@ def _try__ignored(_text, _pos):
     # End Skip
     yield (_status, _result, _pos)
 
-def _parse__ignored(text, pos=0, fullparse=True):
-    return _run(text, pos, _try__ignored, fullparse)
+def _parse__ignored(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, _try__ignored, fullparse, **options)
+
+def _find__ignored(text, pos=0):
+    return _finditer(text, pos, _try__ignored, None)
 
 _ignored = Rule('_ignored', _parse__ignored, """
     _ignored = Skip(Space, Comment)
-""")
+""", _find__ignored)
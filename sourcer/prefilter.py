@@ -0,0 +1,239 @@
+"""Finds the strings that can start a match of a rule.
+
+The "search" and "finditer" methods use this to skip ahead to positions where
+a match might begin, instead of trying the rule at every position. For each
+rule, the prefilter is one of:
+
+- None, if any position might begin a match,
+- a pair of (True, string), if every match begins with that string,
+- or a pair of (False, source), where source is a regular expression that
+  matches wherever a match might begin.
+"""
+
+import re
+
+from . import expressions as ex
+
+
+def first_patterns(rules):
+    """Returns a dict that maps each rule's name to its prefilter, as described
+    above.
+    """
+    analysis = _Analysis(rules)
+
+    # Rules tend to refer to the rules after them, so start at the end. This way
+    # the analysis usually finds the subrules' results in its cache, instead of
+    # recursing through them.
+    result = {}
+    for rule in reversed(rules):
+        result[rule.name] = _prefilter(analysis, rule)
+    return result
+
+
+def _prefilter(analysis, rule):
+    try:
+        items, nullable = analysis.first(rule)
+    except (_Unknown, RecursionError):
+        analysis.pending.clear()
+        return None
+
+    if nullable or not items:
+        return None
+
+    kinds = {type(value) for is_literal, value in items}
+    if len(kinds) != 1:
+        return None
+
+    is_binary = kinds == {bytes}
+    literals = {value for is_literal, value in items if is_literal}
+    if len(items) == len(literals) == 1:
+        return items[0]
+
+    sources = []
+    for is_literal, value in items:
+        if is_binary:
+            value = value.decode('latin-1')
+        source = re.escape(value) if is_literal else value
+        if source not in sources:
+            sources.append(source)
+
+    source = '|'.join(sources)
+    return False, source.encode('latin-1') if is_binary else source
+
+
+class _Unknown(Exception):
+    """Raised when the analysis runs into an expression that it can't handle."""
+
+
+# The most strings and character patterns that a prefilter may combine.
+_MAX_ITEMS = 64
+
+# The inline flags that can appear in a regex's first-character pattern.
+_inline_flags = [
+    (re.ASCII, 'a'),
+    (re.IGNORECASE, 'i'),
+    (re.MULTILINE, 'm'),
+    (re.DOTALL, 's'),
+]
+
+
+class _Analysis:
+    def __init__(self, rules):
+        # References to the "_ignored" rule use its implementation name.
+        self.rules_by_name = {}
+        for rule in rules:
+            self.rules_by_name[rule.name] = rule
+            self.rules_by_name[ex.implementation_name(rule.name)] = rule
+        self.results = {}
+        self.pending = set()
+
+    def first(self, expr):
+        """Returns a tuple of (items, nullable). Each item is a pair of
+        (is_literal, value), where value is a literal string or the source of a
+        regex that matches one character. Raises _Unknown if the expression
+        can't be analyzed.
+        """
+        if isinstance(expr, ex.Str):
+            return ([(True, expr.value)], False) if expr.value else ([], True)
+
+        if isinstance(expr, ex.Regex):
+            return [(False, _regex_first(expr))], False
+
+        if isinstance(expr, (ex.Choice, ex.Skip)):
+            items, nullable = [], isinstance(expr, ex.Skip)
+            for option in expr.exprs:
+                option_items, option_nullable = self.first(option)
+                items = _merge(items, option_items)
+                nullable = nullable or option_nullable
+            return items, nullable
+
+        if isinstance(expr, ex.Seq):
+            return self._sequence(expr.exprs)
+
+        if isinstance(expr, (ex.Discard, ex.Apply)):
+            return self._sequence([expr.expr1, expr.expr2])
+
+        if isinstance(expr, ex.Let):
+            return self._sequence([expr.expr, expr.body])
+
+        if isinstance(expr, (ex.Opt, ex.Expect, ex.ExpectNot)):
+            # Lookaheads don't consume anything, so whatever comes next can
+            # begin the match.
+            items = self.first(expr.expr)[0] if isinstance(expr, ex.Opt) else []
+            return items, True
+
+        if isinstance(expr, (ex.List, ex.Sep)):
+            items, nullable = self.first(expr.expr)
+            if isinstance(expr, ex.Sep):
+                return items, nullable or expr.allow_empty
+            min_len = expr.min_len
+            is_positive = isinstance(min_len, int) and min_len > 0
+            return items, nullable or not is_positive
+
+        if isinstance(expr, ex.Where):
+            return self.first(expr.expr)
+
+        if isinstance(expr, ex.OperatorPrecedence):
+            items, nullable = self.first(expr.atom)
+            for rule in expr.rules:
+                if isinstance(rule, ex.Prefix):
+                    prefix_items, prefix_nullable = self.first(rule.operators)
+                    items = _merge(items, prefix_items)
+                    nullable = nullable or prefix_nullable
+            return items, nullable
+
+        if isinstance(expr, ex.PythonExpression):
+            return [], True
+
+        if isinstance(expr, ex.Fail):
+            return [], False
+
+        if isinstance(expr, ex.Rule) and not expr.params:
+            return self.first(expr.expr)
+
+        if isinstance(expr, ex.Class) and not expr.params:
+            return self._sequence([x.expr for x in expr.fields])
+
+        if isinstance(expr, ex.Ref) and not expr.is_local:
+            return self._rule(expr.name)
+
+        raise _Unknown
+
+    def _sequence(self, exprs):
+        items = []
+        for expr in exprs:
+            expr_items, nullable = self.first(expr)
+            items = _merge(items, expr_items)
+            if not nullable:
+                return items, False
+        return items, True
+
+    def _rule(self, name):
+        rule = self.rules_by_name.get(name)
+        if rule is None:
+            raise _Unknown
+
+        if rule.name in self.results:
+            result = self.results[rule.name]
+            if result is None:
+                raise _Unknown
+            return result
+
+        # Give up on rules that begin with themselves.
+        if rule.name in self.pending:
+            raise _Unknown
+
+        self.pending.add(rule.name)
+        try:
+            result = self.first(rule)
+        except _Unknown:
+            self.results[rule.name] = None
+            raise
+        finally:
+            self.pending.discard(rule.name)
+
+        self.results[rule.name] = result
+        return result
+
+
+def _merge(items, other_items):
+    # Rules can share the same subrules many times over, so drop duplicates as
+    # we go. If there are too many ways to begin a match, then the prefilter
+    # won't skip much, so give up.
+    result = list(items)
+    for item in other_items:
+        if item not in result:
+            result.append(item)
+
+    if len(result) > _MAX_ITEMS:
+        raise _Unknown
+
+    return result
+
+
+def _regex_first(regex):
+    info = regex.analysis()
+    if info.first is None:
+        raise _Unknown
+
+    source = info.first
+    is_binary = isinstance(source, bytes)
+    if is_binary:
+        source = source.decode('latin-1')
+
+    flags = info.flags & ~re.UNICODE
+    letters = ''
+    for flag, letter in _inline_flags:
+        if flags & flag:
+            letters += letter
+            flags &= ~flag
+
+    if flags:
+        raise _Unknown
+
+    if letters:
+        source = f'(?{letters}:{source})'
+    else:
+        source = f'(?:{source})'
+
+    return source.encode('latin-1') if is_binary else source
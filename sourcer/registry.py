@@ -0,0 +1,203 @@
+"""Keeps compiled grammar modules in a bounded cache.
+
+A service that compiles grammars on demand can use a GrammarRegistry instead of
+calling ``Grammar`` directly. The registry compiles each distinct grammar once,
+and evicts the least recently used modules when it holds too many of them, or
+when they take up too much memory. It also keeps track of named grammars, so
+that a service can replace a grammar while other threads are still parsing with
+the old one.
+"""
+
+import hashlib
+import sys
+import threading
+import types
+from collections import OrderedDict
+
+from . import runtime
+from .grammar import Grammar
+
+
+class GrammarRegistry:
+    """Compiles grammars on demand, and keeps the most recently used ones.
+
+    - max_grammars: The maximum number of modules to keep. If None, then there
+      is no limit.
+    - max_bytes: The maximum number of bytes that the modules may use, as
+      estimated by "estimate_size". If None, then there is no limit.
+
+    The other keyword arguments are passed to the "Grammar" function for each
+    grammar. The registry always keeps the module that it compiled last, even if
+    it's over the limits.
+    """
+
+    def __init__(self, max_grammars=None, max_bytes=None, **options):
+        if max_grammars is not None and max_grammars < 1:
+            raise ValueError(
+                f'Expected max_grammars to be at least 1.'
+                f' Received: {max_grammars!r}.'
+            )
+        self.max_grammars = max_grammars
+        self.max_bytes = max_bytes
+        self.options = options
+        self.total_bytes = 0
+        self.compilations = 0
+        self.evictions = 0
+        self._modules = OrderedDict()
+        self._names = {}
+        self._lock = threading.Lock()
+
+    def compile(self, description, **options):
+        """Returns the module for the grammar. Compiles the grammar if the
+        registry doesn't have it yet.
+        """
+        options = dict(self.options, **options)
+        key = grammar_key(description, options)
+        return self._get(key, description, options)
+
+    def register(self, name, description, **options):
+        """Compiles the grammar and binds the name to it, replacing any grammar
+        that the name had before. Returns the module.
+
+        The replacement is atomic. Parses that already have the old module keep
+        using it. If the grammar hasn't changed, then it isn't recompiled.
+        """
+        options = dict(self.options, **options)
+        key = grammar_key(description, options)
+        module = self._get(key, description, options)
+        with self._lock:
+            self._names[name] = (key, description, options)
+        return module
+
+    def remove(self, name):
+        """Removes the name from the registry. Raises KeyError if the registry
+        doesn't have the name.
+        """
+        with self._lock:
+            del self._names[name]
+
+    def __getitem__(self, name):
+        # Each name keeps the key of its grammar, so looking up a name doesn't
+        # hash the grammar again. If the module was evicted, then this compiles
+        # the grammar again.
+        with self._lock:
+            key, description, options = self._names[name]
+        return self._get(key, description, options)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def __len__(self):
+        return len(self._modules)
+
+    def __repr__(self):
+        return (f'GrammarRegistry(grammars={len(self)},'
+            f' total_bytes={self.total_bytes}, compilations={self.compilations},'
+            f' evictions={self.evictions})')
+
+    def _get(self, key, description, options):
+        with self._lock:
+            entry = self._modules.get(key)
+            if entry is not None:
+                self._modules.move_to_end(key)
+                return entry[0]
+
+        # Compile outside of the lock, so that other threads can keep using the
+        # registry in the meantime.
+        module = Grammar(description, **options)
+        size = estimate_size(module)
+
+        with self._lock:
+            # If another thread compiled the same grammar first, use its module.
+            entry = self._modules.get(key)
+            if entry is not None:
+                self._modules.move_to_end(key)
+                return entry[0]
+
+            # Keep the options with the module. Some of them are keyed by their
+            # ids, so they must stay alive while the key is in use.
+            self._modules[key] = (module, size, options)
+            self.total_bytes += size
+            self.compilations += 1
+            self._evict()
+            return module
+
+    def _evict(self):
+        modules = self._modules
+        while len(modules) > 1 and (
+            (self.max_grammars is not None and len(modules) > self.max_grammars)
+            or (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            _, (_, size, _) = modules.popitem(last=False)
+            self.total_bytes -= size
+            self.evictions += 1
+
+
+def grammar_key(description, options):
+    """Returns a hash of the grammar description and the options.
+
+    Options with plain values, like strings, numbers, and tuples of them, are
+    keyed by their values. Other options, like a ResultCache or a function,
+    are keyed by their identities, since their reprs can change.
+    """
+    items = [(k, _option_key(v)) for k, v in sorted(options.items())]
+    content = repr((description, items))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _option_key(value):
+    if value is None or isinstance(value, _plain_types):
+        return value
+    if isinstance(value, (tuple, list)):
+        return (type(value).__name__, [_option_key(x) for x in value])
+    return ('id', type(value).__qualname__, id(value))
+
+
+_plain_types = (bool, int, float, str, bytes)
+
+
+def estimate_size(module):
+    """Returns a rough estimate of the number of bytes that a grammar module
+    uses. This counts the module's functions, code objects, classes, and data,
+    but not the objects that it shares with other modules, like the runtime.
+    """
+    seen = {id(x) for x in vars(runtime).values()}
+    stack = [v for k, v in vars(module).items() if k != '__builtins__']
+    total = 0
+
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _skipped_types):
+            continue
+
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+
+        if isinstance(obj, types.FunctionType):
+            stack.append(obj.__code__)
+            stack.extend(obj.__defaults__ or ())
+        elif isinstance(obj, types.CodeType):
+            stack.extend((obj.co_code, obj.co_names, obj.co_varnames))
+            stack.extend(obj.co_consts)
+        elif isinstance(obj, (staticmethod, classmethod)):
+            stack.append(obj.__func__)
+        elif isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif isinstance(obj, type):
+            stack.extend(vars(obj).values())
+        elif hasattr(obj, '__dict__'):
+            stack.append(vars(obj))
+
+    return total
+
+
+# Don't count other modules or anything that comes from Python itself.
+_skipped_types = (
+    types.ModuleType,
+    types.BuiltinFunctionType,
+    types.GetSetDescriptorType,
+    types.MemberDescriptorType,
+)
@@ -0,0 +1,1329 @@
+"""The runtime that grammar modules share.
+
+Each grammar module imports everything in ``__all__`` -- the base classes, the
+error classes, the memo policies, and the helper functions that its generated
+code calls -- so a process only loads the runtime once, no matter how many
+grammars it uses. The parts that depend on the grammar, like the table of error
+messages and the trampoline, stay in each grammar module.
+
+Modules that have to run without sourcer, like the ones that ``build`` writes,
+include a copy of this file instead.
+"""
+
+from collections import namedtuple as _nt, OrderedDict as _OrderedDict
+from copy import deepcopy as _deepcopy
+from hashlib import sha256 as _sha256
+from itertools import islice as _islice
+from operator import attrgetter as _attrgetter
+from re import compile as _compile_re, IGNORECASE as _IGNORECASE
+from struct import Struct as _Struct, error as _StructError
+from sys import getsizeof as _getsizeof
+from threading import Lock as _Lock
+from time import monotonic as _monotonic
+
+
+class Node:
+    _fields = ()
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, self.__class__):
+            return False
+        for field in self._fields:
+            if getattr(self, field) != getattr(other, field):
+                return False
+        return True
+
+    def _asdict(self):
+        return {k: getattr(self, k) for k in self._fields}
+
+    def _replace(self, **kw):
+        for field in self._fields:
+            if field not in kw:
+                kw[field] = getattr(self, field)
+        return self.__class__(**kw)
+
+
+class Rule:
+    def __init__(self, name, parse, definition, find=None):
+        self.name = name
+        self.parse = parse
+        self.definition = definition
+        self._find = find
+
+    def finditer(self, text, pos=0):
+        """Returns an iterator over the matches of the rule in the text, from
+        left to right. The matches don't overlap.
+        """
+        return self._find(text, pos)
+
+    def search(self, text, pos=0):
+        """Returns the first match of the rule in the text, or None."""
+        return next(self._find(text, pos), None)
+
+    def __repr__(self):
+        return (f'Rule(name={self.name!r}, parse={self.parse.__name__},'
+            f' definition={self.definition!r})')
+
+
+class SourcerError(Exception):
+    """Common superclass for ParseError and PartialParseError."""
+
+
+class ParseError(SourcerError):
+    """Raised when the text doesn't match the grammar.
+
+    When a parse fails, the error keeps a reference to the text. It works out
+    the line and column of its position, and its message, the first time you
+    ask for them. So code that only checks whether a text parses doesn't pay
+    for them. (The "args" field holds the message, too, so it's formatted the
+    first time you read "args".)
+    """
+    def __init__(self, message, index, line, column):
+        super().__init__(message)
+        self.text = None
+        self.index = index
+        self._error = None
+        self._position = _Position(index, line, column)
+        self._message = message
+
+    @classmethod
+    def _on_demand(cls, text, index, error):
+        # Creates an error that formats its message when someone asks for it.
+        # The "error" argument is the entry from the module's "_errors" table.
+        self = cls.__new__(cls)
+        self.text = text
+        self.index = index
+        self._error = error
+        self._position = None
+        self._message = None
+        return self
+
+    def __reduce__(self):
+        if self.text is None:
+            return (self.__class__, (self._message, self.index, *self.position[1:]))
+        return (self.__class__._on_demand, (self.text, self.index, self._error))
+
+    def __str__(self):
+        if self._message is None:
+            self._message = _format_error(self.text, self.position, self._error)
+        return self._message
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({str(self)!r})'
+
+    @property
+    def args(self):
+        return (str(self),)
+
+    @args.setter
+    def args(self, value):
+        self._message = str(value[0]) if value else ''
+
+    @property
+    def position(self):
+        if self._position is None:
+            if len(self.text) <= self.index:
+                line = col = None
+            else:
+                line, col = _get_line_and_column(self.text, self.index)
+            self._position = _Position(self.index, line, col)
+        return self._position
+
+    @property
+    def excerpt(self):
+        col = self.position.column
+        if self.text is None or col is None:
+            return None
+        return _extract_excerpt(self.text, self.index, col)
+
+
+class PartialParseError(SourcerError):
+    def __init__(self, partial_result, last_position, excerpt):
+        super().__init__('Incomplete parse. Unexpected input on line'
+            f' {last_position.line}, column {last_position.column}:\n{excerpt}')
+        self.partial_result = partial_result
+        self.last_position = last_position
+
+
+class ParseBudgetExceeded(SourcerError):
+    """Raised when a parse takes more steps than "max_steps", or runs past its
+    "deadline". The "stats" field has the counts up to that point.
+    """
+    def __init__(self, message, index, stats):
+        super().__init__(message)
+        self.index = index
+        self.stats = stats
+
+
+class Infix(Node):
+    _fields = ('left', 'operator', 'right')
+
+    def __init__(self, left, operator, right):
+        self.left = left
+        self.operator = operator
+        self.right = right
+
+    def __repr__(self):
+        return f'Infix({self.left!r}, {self.operator!r}, {self.right!r})'
+
+
+class Postfix(Node):
+    _fields = ('left', 'operator')
+
+    def __init__(self, left, operator):
+        self.left = left
+        self.operator = operator
+
+    def __repr__(self):
+        return f'Postfix({self.left!r}, {self.operator!r})'
+
+
+class Prefix(Node):
+    _fields = ('operator', 'right')
+
+    def __init__(self, operator, right):
+        self.operator = operator
+        self.right = right
+
+    def __repr__(self):
+        return f'Prefix({self.operator!r}, {self.right!r})'
+
+
+class Span:
+    """A range of the text. In grammars with the "spans" option, string literals
+    and regular expressions return a Span instead of a copy of the text that
+    they matched. The span only copies the text when you ask for it.
+    """
+
+    __slots__ = ('text', 'start', 'end')
+
+    def __init__(self, text, start, end):
+        self.text = text
+        self.start = start
+        self.end = end
+
+    @property
+    def value(self):
+        """The text of the span, as a str or a bytes object."""
+        return self.text[self.start : self.end]
+
+    def __str__(self):
+        value = self.value
+        return value if isinstance(value, str) else str(value, 'utf-8', 'replace')
+
+    def __bytes__(self):
+        value = self.value
+        return value.encode('utf-8') if isinstance(value, str) else bytes(value)
+
+    def __len__(self):
+        return self.end - self.start
+
+    # Spans compare and hash like their text, so that they work as dict keys,
+    # and so that a span equals the string that it covers.
+    def __eq__(self, other):
+        if isinstance(other, Span):
+            other = other.value
+        return self.value == other
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return f'Span({self.start}, {self.end}, {self.value!r})'
+
+
+_PositionInfo = _nt('_PositionInfo', 'start, end')
+
+_Position = _nt('_Position', 'index, line, column')
+
+
+class _ParseFunction(_nt('_ParseFunction', 'func, args, kwargs')):
+    def __call__(self, _text, _pos):
+        return self.func(_text, _pos, *self.args, **dict(self.kwargs))
+
+
+class _StringLiteral(str):
+    def __call__(self, _text, _pos):
+        return self._parse_function(_text, _pos)
+
+
+def _wrap_string_literal(string_value, parse_function):
+    result = _StringLiteral(string_value)
+    result._parse_function = parse_function
+    return result
+
+
+def _format_error(text, position, error):
+    rule_name, expression, complaint = error
+    pos, line, col = position
+
+    if line is None:
+        title = 'Unexpected end of input.'
+    else:
+        excerpt = _extract_excerpt(text, pos, col)
+        title = f'Error on line {line}, column {col}:\n{excerpt}\n'
+
+    details = (
+        f'Failed to parse the {rule_name!r} rule, at the expression:\n'
+        f'    {expression}\n\n{complaint}'
+    )
+    return title + details
+
+
+class ParseStats:
+    """Counts memo table activity. Pass an instance to "parse" with the
+    "stats" keyword argument. The counts accumulate across parses.
+    """
+
+    def __init__(self):
+        self.memo_policy = None
+        self.calls = 0
+        self.memo_hits = 0
+        self.memo_entries = 0
+        self.evictions = 0
+        self.memo_sheds = 0
+
+    @property
+    def memo_misses(self):
+        return self.calls - self.memo_hits
+
+    @property
+    def hit_rate(self):
+        return self.memo_hits / self.calls if self.calls else 0.0
+
+    def _record(self, memo, calls, hits):
+        self.memo_policy = memo.name
+        self.calls += calls
+        self.memo_hits += hits
+        self.memo_entries = max(self.memo_entries, memo.peak_size)
+        self.evictions += memo.evictions
+        self.memo_sheds += memo.sheds
+
+    def __repr__(self):
+        return (f'ParseStats(memo_policy={self.memo_policy!r},'
+            f' calls={self.calls}, memo_hits={self.memo_hits},'
+            f' hit_rate={self.hit_rate:.3f}, memo_entries={self.memo_entries},'
+            f' evictions={self.evictions}, memo_sheds={self.memo_sheds})')
+
+
+class _Budget:
+    # How many steps to take between checks of the clock.
+    clock_interval = 1024
+
+    def __init__(self, max_steps, deadline):
+        self.max_steps = max_steps
+        self.deadline = deadline
+
+    def check(self, steps, pos, stats):
+        """Raises ParseBudgetExceeded if the parse is over its budget.
+        Otherwise, returns the step count for the next check.
+        """
+        if self.max_steps is not None and steps > self.max_steps:
+            raise ParseBudgetExceeded(
+                f'Exceeded the maximum number of steps ({self.max_steps})'
+                f' at index {pos}.', pos, stats,
+            )
+
+        if self.deadline is not None and _monotonic() > self.deadline:
+            raise ParseBudgetExceeded(
+                f'Exceeded the deadline at index {pos}.', pos, stats,
+            )
+
+        result = float('inf')
+        if self.max_steps is not None:
+            result = self.max_steps + 1
+        if self.deadline is not None:
+            result = min(result, steps + self.clock_interval)
+        return result
+
+
+def _create_memo(policy, size, max_entries):
+    if policy not in _memo_policies:
+        raise ValueError(
+            f'Unknown memo_policy: {policy!r}. Expected one of:'
+            f' {", ".join(repr(x) for x in _memo_policies)}.'
+        )
+
+    memo = _memo_policies[policy](size)
+
+    if max_entries is None:
+        return memo
+
+    if max_entries < 1:
+        raise ValueError(
+            f'Expected max_memo_entries to be at least 1.'
+            f' Received: {max_entries!r}.'
+        )
+
+    return _BoundedMemo(memo, max_entries)
+
+
+class _FullMemo(dict):
+    """Keeps every entry. (This is what "parse" does by default.)"""
+    name = 'full'
+    evictions = 0
+    sheds = 0
+
+    def __init__(self, size):
+        dict.__init__(self)
+
+    put = dict.__setitem__
+
+    @property
+    def peak_size(self):
+        return len(self)
+
+
+class _WindowMemo(dict):
+    """Keeps the entries within "size" characters of the farthest position."""
+    name = 'window'
+
+    def __init__(self, size):
+        dict.__init__(self)
+        self.window = 1024 if size is None else size
+        self.evictions = 0
+        self.sheds = 0
+        self.peak_size = 0
+        self._buckets = {}
+        self._farthest = self._horizon = 0
+
+    def put(self, key, value):
+        pos = key[2]
+        if pos < self._horizon:
+            return
+
+        self[key] = value
+        bucket = self._buckets.get(pos)
+        if bucket is None:
+            self._buckets[pos] = [key]
+        else:
+            bucket.append(key)
+
+        if len(self) > self.peak_size:
+            self.peak_size = len(self)
+
+        if pos <= self._farthest:
+            return
+
+        self._farthest = pos
+        horizon = pos - self.window
+        for old_pos in range(self._horizon, horizon):
+            for old_key in self._buckets.pop(old_pos, ()):
+                if self.pop(old_key, None) is not None:
+                    self.evictions += 1
+        self._horizon = max(self._horizon, horizon)
+
+
+class _LRUMemo(_OrderedDict):
+    """Keeps the "size" most recently used entries."""
+    name = 'lru'
+
+    def __init__(self, size):
+        _OrderedDict.__init__(self)
+        self.max_entries = 65536 if size is None else size
+        self.evictions = 0
+        self.sheds = 0
+
+    def get(self, key):
+        value = _OrderedDict.get(self, key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self[key] = value
+        if len(self) > self.max_entries:
+            self.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def peak_size(self):
+        return len(self)
+
+
+class _NoMemo:
+    """Doesn't keep any entries."""
+    name = 'none'
+    evictions = 0
+    sheds = 0
+    peak_size = 0
+
+    def __init__(self, size):
+        pass
+
+    def __len__(self):
+        return 0
+
+    def get(self, key):
+        return None
+
+    def put(self, key, value):
+        pass
+
+
+class _BoundedMemo:
+    """Wraps a memo policy. When the memo table grows past "max_entries", it
+    sheds the oldest half of its entries.
+    """
+
+    def __init__(self, memo, max_entries):
+        self.memo = memo
+        self.max_entries = max_entries
+        self.name = memo.name
+        self.get = memo.get
+        self.sheds = 0
+        self._shed_entries = 0
+        self._peak = 0
+
+    @property
+    def evictions(self):
+        return self.memo.evictions + self._shed_entries
+
+    @property
+    def peak_size(self):
+        return max(self._peak, self.memo.peak_size)
+
+    def put(self, key, value):
+        memo = self.memo
+        memo.put(key, value)
+
+        size = len(memo)
+        if size <= self.max_entries:
+            return
+
+        # The entries come out in insertion order, so the oldest go first.
+        # (For the LRU policy, they come out least recently used first.)
+        self._peak = max(self._peak, size)
+        self.sheds += 1
+        count = size - self.max_entries // 2
+        for old_key in list(_islice(memo.keys(), count)):
+            del memo[old_key]
+        self._shed_entries += count
+
+
+_memo_policies = {
+    'full': _FullMemo,
+    'window': _WindowMemo,
+    'lru': _LRUMemo,
+    'none': _NoMemo,
+}
+
+
+class ResultCache:
+    """Keeps the results of whole parses, so that parsing the same text again
+    returns the earlier result. Pass an instance to the "Grammar" function with
+    the "result_cache" keyword argument.
+
+    - max_entries: The maximum number of results to keep.
+    - max_bytes: The maximum number of bytes that the texts and the results may
+      use, as estimated by "sys.getsizeof". If None, then there is no limit.
+    - copy: If True, then each parse returns a deep copy of the cached result,
+      so that callers may change it. Otherwise, the callers share the result,
+      and must treat it as immutable.
+
+    The cache only keeps successful parses, and it skips parses that use any
+    options, like "memo_policy" or "max_steps". When it's full, it evicts the
+    least recently used result.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=None, copy=False):
+        if max_entries < 1:
+            raise ValueError(
+                f'Expected max_entries to be at least 1.'
+                f' Received: {max_entries!r}.'
+            )
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.copy = copy
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.total_bytes = 0
+        self._entries = _OrderedDict()
+        self._lock = _Lock()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def run(self, run, text, pos, start, fullparse):
+        # The "run" argument is the module's "_run" function. This passes it an
+        # empty memo table, so that it doesn't look in the cache again.
+        key = (start, text, pos, fullparse)
+        try:
+            hash(key)
+        except TypeError:
+            return run(text, pos, start, fullparse, {})
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            return _deepcopy(entry[0]) if self.copy else entry[0]
+
+        result = run(text, pos, start, fullparse, {})
+        size = _getsizeof(text) + _sizeof(result)
+        if self.max_bytes is None or size <= self.max_bytes:
+            self._put(key, result, size)
+        return _deepcopy(result) if self.copy else result
+
+    def _put(self, key, result, size):
+        with self._lock:
+            entries = self._entries
+            if key in entries:
+                return
+
+            entries[key] = (result, size)
+            self.total_bytes += size
+
+            while len(entries) > self.max_entries or (
+                self.max_bytes is not None and self.total_bytes > self.max_bytes
+            ):
+                _, (_, old_size) = entries.popitem(last=False)
+                self.total_bytes -= old_size
+                self.evictions += 1
+
+    def __repr__(self):
+        return (f'ResultCache(entries={len(self)}, hits={self.hits},'
+            f' misses={self.misses}, hit_rate={self.hit_rate:.3f},'
+            f' total_bytes={self.total_bytes}, evictions={self.evictions})')
+
+
+def _sizeof(value):
+    # Estimates the size of a parse result, counting each object once.
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        total += _getsizeof(value)
+
+        if isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, Node):
+            stack.append(vars(value))
+    return total
+
+
+def visit(node):
+    visited = set()
+    stack = [node]
+    while stack:
+        node = stack.pop()
+
+        if isinstance(node, (list, tuple)):
+            stack.extend(node)
+
+        elif isinstance(node, dict):
+            stack.extend(node.values())
+
+        elif isinstance(node, Node):
+            node_id = id(node)
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+
+            yield node
+
+            if hasattr(node, '_fields'):
+                stack.extend(getattr(node, x) for x in node._fields)
+
+
+def transform(node, *callbacks, in_place=False):
+    if not callbacks:
+        return node
+
+    if len(callbacks) == 1:
+        callback = callbacks[0]
+    else:
+        def callback(node):
+            for f in callbacks:
+                node = f(node)
+            return node
+
+    return _transform(node, callback, in_place)
+
+
+def _transform(tree, callback, in_place):
+    # Transforms the tree from the bottom up, with an explicit stack. Each entry
+    # on the stack is a value, along with the list and the index where its
+    # result goes. When a node or a list comes off the stack the first time, it
+    # goes back on with a list for the results of its children, and then its
+    # children go on top of it. The second time, the results are ready.
+    getters = {}
+    root = [tree]
+    stack = [(tree, root, 0, None)]
+
+    # When nodes are updated in place, a node that appears in more than one
+    # place must only be transformed once.
+    done = {} if in_place else None
+
+    while stack:
+        value, target, index, children = stack.pop()
+
+        if children is None:
+            if isinstance(value, Node):
+                if in_place and id(value) in done:
+                    target[index] = done[id(value)]
+                    continue
+
+                cls = type(value)
+                getter = getters.get(cls)
+                if getter is None:
+                    getter = getters[cls] = _compile_field_getter(cls._fields)
+                children = getter(value)
+
+                # Transform a node right away if it doesn't have any nodes or
+                # lists inside of it.
+                for child in children:
+                    if isinstance(child, (Node, list)):
+                        children = list(children)
+                        break
+                else:
+                    result = callback(value)
+                    if in_place:
+                        done[id(value)] = result
+                    target[index] = result
+                    continue
+
+            elif isinstance(value, list):
+                children = value if in_place else value[:]
+
+            else:
+                continue
+
+            stack.append((value, target, index, children))
+            for i in range(len(children) - 1, -1, -1):
+                child = children[i]
+                if isinstance(child, (Node, list)):
+                    stack.append((child, children, i, None))
+
+        elif isinstance(value, list):
+            target[index] = children
+
+        else:
+            node, cls = value, type(value)
+            for field, was, now in zip(cls._fields, getters[cls](value), children):
+                if was is not now:
+                    if not in_place:
+                        node = cls(*children)
+                        break
+                    setattr(node, field, now)
+
+            result = callback(node)
+            if in_place:
+                done[id(value)] = result
+            target[index] = result
+
+    return root[0]
+
+
+def _compile_field_getter(fields):
+    # Returns a function that returns a tuple of a node's field values.
+    if not fields:
+        return lambda node: ()
+    if len(fields) == 1:
+        getter = _attrgetter(fields[0])
+        return lambda node: (getter(node),)
+    return _attrgetter(*fields)
+
+
+def _share(tree, index=None):
+    # Replaces equal strings, numbers, and immutable subtrees with one shared
+    # object. A node or a tuple is immutable if all of its fields are. Lists and
+    # dicts are updated in place, but never shared. Floats are compared by their
+    # exact values, so that 0.0 and -0.0 stay apart.
+    #
+    # A shared node stands for more than one place in the text, so its
+    # "_position_info" becomes None. (A node that only appears once keeps its
+    # position.) If there's an index, its lists get the shared nodes, too.
+    table = {}
+    shared = set()
+    replaced = {}
+    results = []
+    stack = [(False, tree)]
+
+    while stack:
+        is_ready, value = stack.pop()
+
+        if not is_ready:
+            if isinstance(value, Node):
+                children = [getattr(value, x) for x in value._fields]
+            elif isinstance(value, list) or type(value) is tuple:
+                children = value
+            elif isinstance(value, dict):
+                children = list(value.values())
+            else:
+                if isinstance(value, _shared_types):
+                    key = value.hex() if isinstance(value, float) else value
+                    value = table.setdefault((type(value), key), value)
+                    shared.add(id(value))
+                results.append(value)
+                continue
+
+            stack.append((True, value))
+            stack.extend((False, x) for x in reversed(children))
+            continue
+
+        count = len(value._fields) if isinstance(value, Node) else len(value)
+        children = results[len(results) - count:]
+        del results[len(results) - count:]
+        is_shared = all(id(x) in shared for x in children)
+
+        if isinstance(value, list):
+            value[:] = children
+        elif isinstance(value, dict):
+            value.update(zip(value.keys(), children))
+        elif isinstance(value, tuple):
+            if is_shared:
+                value = table.setdefault((tuple, *map(id, children)), tuple(children))
+                shared.add(id(value))
+        else:
+            for field, child in zip(value._fields, children):
+                setattr(value, field, child)
+            if is_shared:
+                original = value
+                value = table.setdefault((type(value), *map(id, children)), value)
+                shared.add(id(value))
+                if value is not original:
+                    replaced[id(original)] = value
+                    if hasattr(value, '_position_info'):
+                        value._position_info = None
+
+        results.append(value)
+
+    if index is not None and replaced:
+        for found in index.values():
+            found[:] = [replaced.get(id(x), x) for x in found]
+
+    return results[0]
+
+
+_shared_types = (str, bytes, int, float, type(None))
+
+
+def _finalize_parse_info(text, nodes, pos, fullparse, tokens=None, index=None):
+    line_numbers, column_numbers = _map_index_to_line_and_column(text)
+
+    for node in visit(nodes):
+        pos_info = getattr(node, '_position_info', None)
+
+        # Since "visit" yields each node once, a memoized subtree that appears
+        # in more than one place is only indexed once.
+        if index is not None:
+            found = index.get(type(node).__name__)
+            if found is not None:
+                found.append(node)
+
+        # Skip nodes that already have their line and column numbers. (This
+        # happens when a reparse reuses nodes from a previous parse.)
+        if pos_info and type(pos_info) is tuple:
+            start, end = pos_info
+            if tokens is not None:
+                start, end = tokens.span(start, end)
+            end -= 1
+            node._position_info = _PositionInfo(
+                start=_Position(start, line_numbers[start], column_numbers[start]),
+                end=_Position(end, line_numbers[end], column_numbers[end]),
+            )
+
+    if index is not None:
+        # Put the nodes in the order of their positions. (The sort is stable,
+        # and "visit" yields a node before the nodes inside of it.)
+        for found in index.values():
+            if all(getattr(x, '_position_info', None) for x in found):
+                found.sort(key=lambda x: x._position_info.start.index)
+
+    if fullparse and pos < len(text):
+        line, col = line_numbers[pos], column_numbers[pos]
+        position = _Position(pos, line, col)
+        excerpt = _extract_excerpt(text, pos, col)
+        raise PartialParseError(nodes, position, excerpt)
+
+    return nodes
+
+
+def _create_index(names, namespace):
+    # Returns a dict that maps each class name to an empty list. The
+    # "_finalize_parse_info" function fills in the lists.
+    if isinstance(names, str):
+        names = [names]
+
+    index = {}
+    for name in names:
+        cls = namespace.get(name)
+        if not (isinstance(cls, type) and issubclass(cls, Node)):
+            raise ValueError(
+                f'Expected the name of a class in the grammar. Received: {name!r}.'
+            )
+        index[name] = []
+    return index
+
+
+def _extract_excerpt(text, pos, col):
+    if not isinstance(text, str):
+        return repr(text[max(0, pos - 1) : pos + 2])
+
+    start = pos - (col - 1)
+    match = _compile_re('\n').search(text, pos + 1)
+    end = len(text) if match is None else match.start()
+
+    if end - start < 96:
+        return text[start : end] + _caret_at(col - 1)
+
+    if col < 60:
+        # Chop the line off at the end.
+        return text[start : start + 90] + ' ...' + _caret_at(col - 1)
+
+    elif end - pos < 40:
+        # Chop the line off at the start.
+        return '... ' + text[end - 90 : end] + _caret_at(pos - (end - 90) + 4)
+
+    else:
+        # Chop the line off at both ends.
+        return '... ' + text[pos - 42 : pos + 42] + ' ...' + _caret_at(42 + 4)
+
+
+def _caret_at(index):
+    return '\n' + (' ' * index) + '^'
+
+
+class _SingleLine:
+    def __getitem__(self, index):
+        return 1
+
+
+def _get_line_and_column(text, pos):
+    # This gives the same answer as "_map_index_to_line_and_column", without
+    # building the whole map. (Byte strings and token sequences are all on one
+    # line.)
+    if not isinstance(text, str):
+        return 1, pos + 1
+
+    if text[pos] == '\n':
+        return text.count('\n', 0, pos) + 2, 0
+
+    return text.count('\n', 0, pos) + 1, pos - text.rfind('\n', 0, pos)
+
+
+def _map_index_to_line_and_column(text):
+    # Byte strings and token sequences are all on one line, so their maps don't
+    # need a list entry for each position.
+    if not isinstance(text, str):
+        return _SingleLine(), range(1, len(text) + 1)
+
+    line_numbers = []
+    column_numbers = []
+
+    current_line = 1
+    current_column = 0
+
+    for c in text:
+        if c == '\n':
+            current_line += 1
+            current_column = 0
+        else:
+            current_column += 1
+        line_numbers.append(current_line)
+        column_numbers.append(current_column)
+
+    return line_numbers, column_numbers
+
+
+# Each match from "search" or "finditer" has the rule's result, the start and
+# end of the match, and the line and column where it starts. The end includes
+# any ignored text after the match.
+_Match = _nt('Match', 'value, start, end, line, column')
+
+# When a search moves this far ahead, it drops the memo entries behind it.
+_PRUNE_DISTANCE = 4096
+
+
+def _locate_nodes(nodes, lines):
+    for node in visit(nodes):
+        pos_info = getattr(node, '_position_info', None)
+        if pos_info and type(pos_info) is tuple:
+            start, end = pos_info
+            end -= 1
+            node._position_info = _PositionInfo(
+                start=_Position(start, *lines.locate(start)),
+                end=_Position(end, *lines.locate(end)),
+            )
+
+
+class _LineCounter:
+    """Works out line and column numbers for positions that move forward
+    through the text, without rescanning the text from the start.
+
+    Unlike the positions of a parse, the positions of a search count the lines
+    of byte strings and memory maps, too. (Token sequences are all on one
+    line.)
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.line = 1
+        self.line_start = 0
+
+        if isinstance(text, str):
+            self.newline = '\n'
+        elif hasattr(text, 'rfind'):
+            self.newline = b'\n'
+        else:
+            self.newline = None
+
+    def advance(self, pos):
+        if pos <= self.pos or self.newline is None:
+            return
+        count = self._count(self.pos, pos)
+        if count:
+            self.line += count
+            self.line_start = self.text.rfind(self.newline, self.pos, pos) + 1
+        self.pos = pos
+
+    def locate(self, pos):
+        # For strings, this gives the same answer as "_get_line_and_column".
+        text = self.text
+        if pos >= len(text):
+            return None, None
+
+        if self.newline is None:
+            return _get_line_and_column(text, pos)
+
+        if pos < self.pos:
+            start, line, line_start = 0, 1, 0
+        else:
+            start, line, line_start = self.pos, self.line, self.line_start
+
+        count = self._count(start, pos)
+        line += count
+        if text[pos : pos + 1] == self.newline:
+            return line + 1, 0
+
+        if count:
+            line_start = text.rfind(self.newline, start, pos) + 1
+        return line, pos - line_start + 1
+
+    def _count(self, start, end):
+        text = self.text
+        if hasattr(text, 'count'):
+            return text.count(self.newline, start, end)
+
+        # Memory maps don't have a "count" method, so count their lines one
+        # slice at a time, instead of copying the whole range.
+        return sum(
+            text[i : min(i + _CHUNK_SIZE, end)].count(self.newline)
+            for i in range(start, end, _CHUNK_SIZE)
+        )
+
+
+# The binary format of "dumps" starts with this header, followed by a hash of
+# the grammar's classes and their fields. The tree follows in prefix order. Each
+# value starts with one of these tags.
+_TREE_MAGIC = b'SRCT\x01'
+(
+    _T_NONE, _T_TRUE, _T_FALSE, _T_INT, _T_FLOAT, _T_STR, _T_STR_REF, _T_BYTES,
+    _T_LIST, _T_TUPLE, _T_DICT, _T_NODE,
+) = range(12)
+
+_DOUBLE = _Struct('<d')
+
+# The size of each chunk that "dump" writes.
+_CHUNK_SIZE = 65536
+
+
+class _TreeSchema:
+    """Numbers the Node classes of a grammar module, and reads and writes parse
+    trees in the binary format of "dumps" and "loads".
+    """
+
+    def __init__(self, namespace):
+        classes = {}
+        for value in namespace.values():
+            if isinstance(value, type) and issubclass(value, Node):
+                classes[value.__name__] = value
+
+        self.classes = [classes[x] for x in sorted(classes)]
+        self.indexes = {x: i for i, x in enumerate(self.classes)}
+        fields = [(x.__name__, tuple(x._fields)) for x in self.classes]
+        self.header = _TREE_MAGIC + _sha256(repr(fields).encode('utf-8')).digest()[:8]
+
+    def dump(self, tree, write):
+        # Walk the tree with a stack, so that deep trees don't overflow the
+        # Python stack.
+        out = bytearray(self.header)
+        strings = {}
+        indexes = self.indexes
+        prev_start = prev_line = 0
+        stack = [tree]
+
+        while stack:
+            value = stack.pop()
+
+            if value is None:
+                out.append(_T_NONE)
+            elif value is True:
+                out.append(_T_TRUE)
+            elif value is False:
+                out.append(_T_FALSE)
+            elif isinstance(value, int):
+                out.append(_T_INT)
+                _put_varint(out, _zigzag(value))
+            elif isinstance(value, str):
+                index = strings.get(value)
+                if index is None:
+                    strings[value] = len(strings)
+                    data = value.encode('utf-8')
+                    out.append(_T_STR)
+                    _put_varint(out, len(data))
+                    out += data
+                else:
+                    out.append(_T_STR_REF)
+                    _put_varint(out, index)
+            elif isinstance(value, (list, tuple)):
+                out.append(_T_LIST if isinstance(value, list) else _T_TUPLE)
+                _put_varint(out, len(value))
+                stack.extend(reversed(value))
+            elif isinstance(value, Node):
+                index = indexes.get(type(value))
+                if index is None:
+                    raise TypeError(
+                        f'The grammar does not have the class'
+                        f' {type(value).__name__!r}.'
+                    )
+                out.append(_T_NODE)
+                _put_varint(out, index)
+                stack.extend(getattr(value, x) for x in reversed(value._fields))
+
+                info = getattr(value, '_position_info', None)
+                if info is None:
+                    out.append(0)
+                elif type(info) is _PositionInfo and None not in info.start + info.end:
+                    # Store each position as the difference from the previous
+                    # one, so that most of the numbers fit in one byte.
+                    (start, line, col), (end, end_line, end_col) = info
+                    out.append(1)
+                    _put_varint(out, _zigzag(start - prev_start))
+                    _put_varint(out, _zigzag(line - prev_line))
+                    _put_varint(out, col)
+                    _put_varint(out, _zigzag(end - start))
+                    _put_varint(out, _zigzag(end_line - line))
+                    _put_varint(out, end_col)
+                    prev_start, prev_line = start, line
+                elif type(info) is _PositionInfo:
+                    out.append(2)
+                    stack.append((tuple(info.start), tuple(info.end)))
+                else:
+                    out.append(3)
+                    stack.append(info)
+            elif isinstance(value, Span):
+                # Save the text of the span, since the data doesn't have the
+                # whole input.
+                stack.append(value.value)
+                continue
+            elif isinstance(value, float):
+                out.append(_T_FLOAT)
+                out += _DOUBLE.pack(value)
+            elif isinstance(value, bytes):
+                out.append(_T_BYTES)
+                _put_varint(out, len(value))
+                out += value
+            elif isinstance(value, dict):
+                out.append(_T_DICT)
+                _put_varint(out, len(value))
+                for key, item in reversed(list(value.items())):
+                    stack.append(item)
+                    stack.append(key)
+            else:
+                raise TypeError(
+                    f'Cannot serialize a value of type {type(value).__name__!r}.'
+                )
+
+            if len(out) >= _CHUNK_SIZE:
+                write(bytes(out))
+                out.clear()
+
+        write(bytes(out))
+
+    def loads(self, data):
+        header = self.header
+        if data[:len(_TREE_MAGIC)] != _TREE_MAGIC:
+            raise ValueError('The data is not a parse tree from "dumps".')
+        if data[:len(header)] != header:
+            raise ValueError(
+                'The parse tree is from a grammar with different classes.'
+            )
+
+        try:
+            return self._read(data, len(header))
+        except (IndexError, UnicodeDecodeError, _StructError):
+            raise ValueError('The parse tree data is truncated.') from None
+
+    def _read(self, data, pos):
+        strings = []
+        classes = self.classes
+        prev_start = prev_line = 0
+
+        # Each entry on the stack is a list of [tag, count, items, extra],
+        # for a container that is waiting for "count" more items.
+        stack = []
+
+        while True:
+            tag = data[pos]
+            pos += 1
+
+            if tag == _T_NONE:
+                value = None
+            elif tag == _T_TRUE:
+                value = True
+            elif tag == _T_FALSE:
+                value = False
+            elif tag == _T_INT:
+                value, pos = _get_varint(data, pos)
+                value = _unzigzag(value)
+            elif tag == _T_STR:
+                size, pos = _get_varint(data, pos)
+                value = str(data[pos : pos + size], 'utf-8')
+                pos += size
+                strings.append(value)
+            elif tag == _T_STR_REF:
+                index, pos = _get_varint(data, pos)
+                value = strings[index]
+            elif tag == _T_NODE:
+                index, pos = _get_varint(data, pos)
+                cls = classes[index]
+                flag = data[pos]
+                pos += 1
+                info = None
+                if flag == 1:
+                    numbers = []
+                    for _ in range(6):
+                        number, pos = _get_varint(data, pos)
+                        numbers.append(number)
+                    start = prev_start + _unzigzag(numbers[0])
+                    line = prev_line + _unzigzag(numbers[1])
+                    info = _PositionInfo(
+                        start=_Position(start, line, numbers[2]),
+                        end=_Position(
+                            start + _unzigzag(numbers[3]),
+                            line + _unzigzag(numbers[4]),
+                            numbers[5],
+                        ),
+                    )
+                    prev_start, prev_line = start, line
+
+                # If the position isn't in the compact form, then it's the
+                # node's first item.
+                count = len(cls._fields) + (flag >= 2)
+                frame = [tag, count, [], (cls, flag, info)]
+                if count:
+                    stack.append(frame)
+                    continue
+                value = _finish_node(frame)
+            elif tag in (_T_LIST, _T_TUPLE, _T_DICT):
+                count, pos = _get_varint(data, pos)
+                frame = [tag, count * 2 if tag == _T_DICT else count, [], None]
+                if count:
+                    stack.append(frame)
+                    continue
+                value = _finish_container(frame)
+            elif tag == _T_FLOAT:
+                value, = _DOUBLE.unpack_from(data, pos)
+                pos += _DOUBLE.size
+            elif tag == _T_BYTES:
+                size, pos = _get_varint(data, pos)
+                value = bytes(data[pos : pos + size])
+                pos += size
+            else:
+                raise ValueError(f'Unexpected tag in parse tree data: {tag}.')
+
+            # Add the value to the container that's waiting for it. If that
+            # fills the container, then add the container to its parent, and
+            # so on.
+            while stack:
+                frame = stack[-1]
+                frame[2].append(value)
+                if len(frame[2]) < frame[1]:
+                    break
+                stack.pop()
+                value = _finish_node(frame) if frame[0] == _T_NODE else _finish_container(frame)
+            else:
+                if pos != len(data):
+                    raise ValueError('Unexpected data after the parse tree.')
+                return value
+
+
+def _finish_container(frame):
+    tag, _, items, _ = frame
+    if tag == _T_LIST:
+        return items
+    if tag == _T_TUPLE:
+        return tuple(items)
+    return dict(zip(items[::2], items[1::2]))
+
+
+def _finish_node(frame):
+    items = frame[2]
+    cls, flag, info = frame[3]
+    if flag >= 2:
+        info = items.pop(0)
+        if flag == 2:
+            info = _PositionInfo(_Position(*info[0]), _Position(*info[1]))
+
+    node = cls.__new__(cls)
+    for name, item in zip(cls._fields, items):
+        setattr(node, name, item)
+    node._position_info = info
+    return node
+
+
+def _zigzag(number):
+    return number * 2 if number >= 0 else -number * 2 - 1
+
+
+def _unzigzag(number):
+    return (number >> 1) ^ -(number & 1)
+
+
+def _put_varint(out, number):
+    while number > 0x7f:
+        out.append((number & 0x7f) | 0x80)
+        number >>= 7
+    out.append(number)
+
+
+def _get_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+__all__ = [x for x in dir() if not x.startswith('__')]
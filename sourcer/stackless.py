@@ -0,0 +1,666 @@
+"""Converts the generated parsing functions into resumable state machines.
+
+Normally, each parsing function is a generator. When it needs to call another
+rule, it yields a tuple like ``(CALL, func, pos)`` and the trampoline sends the
+result back in. The stackless backend rewrites each generator into two plain
+functions:
+
+- The first function has the same signature as the generator, and runs from
+  the beginning. When it needs to call another rule, it returns the tuple
+  ``(CALL, func, pos, frame)``. The frame is a list that holds the resume
+  function, a state number, and the local variables that are still needed.
+- The resume function takes the text, the frame, and the result of the call.
+  It restores the local variables and jumps back to the point where the first
+  function left off.
+
+Neither function creates a generator object, and the trampoline keeps the
+frames in a list, so the recursion depth is still unbounded.
+
+Some functions never need to suspend, so their callers call them directly.
+These calls skip the trampoline, so the trampoline can't count them. For the
+parses that count calls or enforce a budget, each function that makes direct
+calls gets a second version, which suspends for every call. The module's
+"_counted_functions" table maps each function to this version.
+
+The generated parsing functions only use a small part of Python: assignments,
+"if" statements, "while" loops, "break", "continue", and expression
+statements. A call to another rule is always the right-hand side (or a part of
+the right-hand side) of an assignment.
+"""
+
+import ast
+import io
+import tokenize
+
+from .expressions.constants import CALL
+
+
+_NESTED_SCOPES = (
+    ast.Lambda,
+    ast.GeneratorExp,
+    ast.ListComp,
+    ast.SetComp,
+    ast.DictComp,
+)
+
+
+# The prefixes of the generated parsing functions. (The runtime has other
+# generators, like "visit", which stay the same.)
+_PREFIXES = ('_try_', '_parse_function_')
+
+
+def lower_generators(source_code):
+    """Returns the source code with each parsing function replaced by a pair of
+    resumable functions.
+    """
+    lines = source_code.splitlines()
+    tree = ast.parse(source_code)
+    layout = _Layout(source_code, lines)
+
+    body = tree.body
+    funcs = {}
+    for node in body:
+        if isinstance(node, ast.FunctionDef) and node.name.startswith(_PREFIXES):
+            yields = _find_yields(node)
+            if yields:
+                funcs[node] = yields
+
+    leaves = _find_leaves(funcs)
+
+    output = []
+    counted = []
+    next_line = 1
+
+    for index, node in enumerate(body):
+        if node not in funcs:
+            continue
+
+        # Copy everything up to the function definition.
+        output.extend(lines[next_line - 1:node.lineno - 1])
+
+        # Skip to the next statement (or to the end of the module).
+        if index + 1 < len(body):
+            end_line = layout.first_line(body[index + 1])
+        else:
+            end_line = len(lines) + 1
+
+        output.extend(_Function(node, layout, funcs[node], leaves).lower())
+        output.append('')
+
+        if _makes_direct_calls(funcs[node], leaves):
+            name = counted_name(node.name)
+            output.extend(_Function(node, layout, funcs[node], (), name).lower())
+            output.append('')
+            counted.append(node.name)
+
+        next_line = end_line
+
+    output.extend(lines[next_line - 1:])
+    output.append('')
+    output.append('# The versions of the functions that suspend for every call.')
+    output.append('_counted_functions = {')
+    output.extend(f'    {x}: {counted_name(x)},' for x in counted)
+    output.append('}')
+    return '\n'.join(output) + '\n'
+
+
+def resume_name(func_name):
+    return f'{func_name}_resume'
+
+
+def counted_name(func_name):
+    return f'{func_name}_counted'
+
+
+def _find_yields(func):
+    """Returns a dict that maps each statement in the function to the list of
+    yield expressions that it contains. (Only the innermost statement counts.)
+    """
+    result = {}
+    stack = [(x, x) for x in func.body]
+    while stack:
+        node, stmt = stack.pop()
+        if isinstance(node, ast.Yield):
+            result.setdefault(stmt, []).append(node)
+        if isinstance(node, _NESTED_SCOPES + (ast.FunctionDef,)):
+            continue
+        for child in ast.iter_child_nodes(node):
+            stack.append((child, child if isinstance(child, ast.stmt) else stmt))
+    return result
+
+
+def _find_leaves(funcs):
+    """Returns the names of the parsing functions that never need to suspend.
+
+    These functions only call other leaves (if they call anything at all), so
+    they can call them directly. Their callers can call them directly, too.
+    Calling a leaf directly skips the memo table, but leaves tend to be small
+    rules, like tokens, which are cheap to run again. (The counted versions of
+    the functions don't call leaves directly, so the memo policies, the stats,
+    and the budgets see the same calls as with the generator backend.)
+    """
+    targets = {}
+    for func, yields in funcs.items():
+        targets[func.name] = [_call_target(x, yields)
+            for x in yields if _is_call_statement(x, yields)]
+
+    leaves = set()
+    while True:
+        found = {name for name, calls in targets.items()
+            if name not in leaves and all(x in leaves for x in calls)}
+        if not found:
+            return leaves
+        leaves |= found
+
+
+def _makes_direct_calls(yields, leaves):
+    return any(
+        _is_call_statement(x, yields) and _call_target(x, yields) in leaves
+        for x in yields
+    )
+
+
+def _walk_scope(nodes):
+    # Walks the nodes, skipping over nested scopes.
+    stack = list(reversed(nodes))
+    while stack:
+        node = stack.pop()
+        yield node
+        if isinstance(node, _NESTED_SCOPES + (ast.FunctionDef,)):
+            continue
+        stack.extend(reversed(list(ast.iter_child_nodes(node))))
+
+
+class _Layout:
+    """Maps each logical line of the source code to its text."""
+
+    def __init__(self, source_code, lines):
+        self.lines = lines
+        self._end_lines = {}
+        self._comments = set()
+
+        tokens = tokenize.generate_tokens(io.StringIO(source_code).readline)
+        start = None
+        for tok in tokens:
+            if tok.type in (tokenize.INDENT, tokenize.DEDENT):
+                continue
+            if tok.type == tokenize.COMMENT and start is None:
+                self._comments.add(tok.start[0])
+                continue
+            if tok.type == tokenize.NL and start is None:
+                continue
+            if start is None:
+                start = tok.start[0]
+            if tok.type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                self._end_lines[start] = tok.start[0]
+                start = None
+
+    def first_line(self, node):
+        # Include any comments that come right before the statement.
+        line = node.lineno
+        while line - 1 in self._comments:
+            line -= 1
+        return line
+
+    def comments(self, node):
+        return [self.lines[i - 1].strip()
+            for i in range(self.first_line(node), node.lineno)]
+
+    def text(self, node):
+        """Returns the text of a simple statement, or the header of a compound
+        statement, as a list of lines.
+        """
+        end = self._end_lines[node.lineno]
+        result = self.lines[node.lineno - 1:end]
+        result[0] = result[0].strip()
+        return result
+
+
+class _Function:
+    def __init__(self, node, layout, yields, leaves, name=None):
+        self.node = node
+        self.layout = layout
+        self.yields = yields
+        self.leaves = leaves
+        self.name = name or node.name
+        self.resume_name = resume_name(self.name)
+
+        # The text is an argument of the resume function, so it's not one of
+        # the variables that the frame needs to save.
+        self.params = [x.arg for x in node.args.args]
+        self.locals = set(self.params) - {'_text'}
+        for child in _walk_scope(node.body):
+            if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                self.locals.add(child.id)
+
+        # Map each call site to a state number, and find the points within
+        # each statement.
+        self.states = {}
+        self.points = {}
+        self._number_states(node.body)
+
+        # For each state, find the local variables that are live when the
+        # function is resumed.
+        self.saved = {}
+        self._use_cache, self._def_cache = {}, {}
+        self._live_list(node.body, set(), None, None)
+
+        # A variable may be live at a call site without being assigned on
+        # every path to it. The first function sets these variables to None,
+        # so that it can always save them.
+        self.unassigned = set()
+        self._assigned_list(node.body, set(self.params), [])
+
+    def lower(self):
+        args = ', '.join(self.params)
+        result = [f'def {self.name}({args}):']
+        if self.unassigned:
+            names = ' = '.join(sorted(self.unassigned))
+            result.append(f'    {names} = None')
+        self._emit_plain(result, self.node.body, 1)
+        result.append('')
+
+        if not self.states:
+            return result
+
+        result.append(f'def {self.resume_name}(_text, _frame, _sent):')
+        result.append('    _state = _frame[1]')
+        keyword = 'if'
+        for stmt, state in sorted(self.states.items(), key=lambda x: x[1]):
+            saved = self.saved[state]
+            if saved:
+                names = ', '.join(['_', '_'] + saved)
+                result.append(f'    {keyword} _state == {state}:')
+                result.append(f'        {names} = _frame')
+                keyword = 'elif'
+
+        self._emit_resume(result, self.node.body, 1)
+        return result
+
+    def _number_states(self, stmts):
+        for stmt in stmts:
+            points = set()
+            if isinstance(stmt, (ast.If, ast.While)):
+                if getattr(stmt, 'orelse', None) and isinstance(stmt, ast.While):
+                    raise _unsupported(stmt, 'a "while" loop with an "else"')
+                self._check_no_yield(stmt)
+                self._number_states(stmt.body)
+                self._number_states(stmt.orelse)
+                for child in stmt.body + stmt.orelse:
+                    points |= self.points[child]
+            elif self._is_call_site(stmt):
+                state = len(self.states) + 1
+                self.states[stmt] = state
+                points.add(state)
+            elif not _is_final_yield(stmt):
+                if not _is_call_statement(stmt, self.yields):
+                    self._check_no_yield(stmt)
+            self.points[stmt] = points
+
+    def _is_call_site(self, stmt):
+        # Returns True if the statement is a call that suspends the function.
+        return (
+            _is_call_statement(stmt, self.yields)
+            and _call_target(stmt, self.yields) not in self.leaves
+        )
+
+    def _check_no_yield(self, stmt):
+        if stmt in self.yields:
+            raise _unsupported(stmt, 'a yield in an unexpected place')
+
+    def _uses(self, node, skip=None):
+        # The liveness analysis visits statements many times, so cache the
+        # variables that each node uses.
+        key = (node, skip)
+        if key not in self._use_cache:
+            self._use_cache[key] = self._find_uses(node, skip)
+        return self._use_cache[key]
+
+    def _find_uses(self, node, skip):
+        result = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is skip:
+                continue
+            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+                if node.id in self.locals:
+                    result.add(node.id)
+            stack.extend(ast.iter_child_nodes(node))
+        return result
+
+    def _defs(self, node):
+        if node not in self._def_cache:
+            self._def_cache[node] = {x.id for x in _walk_scope([node])
+                if isinstance(x, ast.Name) and isinstance(x.ctx, ast.Store)}
+        return self._def_cache[node]
+
+    def _live_list(self, stmts, live, loop_exit, loop_head):
+        for stmt in reversed(stmts):
+            live = self._live_stmt(stmt, live, loop_exit, loop_head)
+        return live
+
+    def _live_stmt(self, stmt, live, loop_exit, loop_head):
+        if isinstance(stmt, ast.Break):
+            return set(loop_exit)
+
+        if isinstance(stmt, ast.Continue):
+            return set(loop_head)
+
+        if isinstance(stmt, ast.If):
+            body = self._live_list(stmt.body, live, loop_exit, loop_head)
+            orelse = self._live_list(stmt.orelse, live, loop_exit, loop_head)
+            return self._uses(stmt.test) | body | orelse
+
+        if isinstance(stmt, ast.While):
+            # Iterate until the set of live variables at the top of the loop
+            # stops changing.
+            head = self._uses(stmt.test) | live
+            while True:
+                body = self._live_list(stmt.body, head, live, head)
+                new_head = head | body
+                if new_head == head:
+                    return head
+                head = new_head
+
+        if _is_final_yield(stmt):
+            return self._uses(stmt)
+
+        if stmt in self.states:
+            # When the function resumes, it needs the variables that are live
+            # after the assignment, along with the variables that the
+            # assignment itself uses.
+            call = self.yields[stmt][0]
+            after = (live - self._defs(stmt)) | self._uses(stmt, skip=call)
+            self.saved[self.states[stmt]] = sorted(after)
+            return after | self._uses(call.value)
+
+        return (live - self._defs(stmt)) | self._uses(stmt)
+
+    def _assigned_list(self, stmts, assigned, breaks):
+        # Returns the set of variables that are definitely assigned after the
+        # statements, or None if the end of the statements is unreachable.
+        for stmt in stmts:
+            if assigned is None:
+                break
+            assigned = self._assigned_stmt(stmt, assigned, breaks)
+        return assigned
+
+    def _assigned_stmt(self, stmt, assigned, breaks):
+        if isinstance(stmt, ast.Break):
+            breaks.append(assigned)
+            return None
+
+        if isinstance(stmt, ast.Continue) or _is_final_yield(stmt):
+            return None
+
+        if isinstance(stmt, ast.If):
+            body = self._assigned_list(stmt.body, assigned, breaks)
+            orelse = self._assigned_list(stmt.orelse, assigned, breaks)
+            if body is None or orelse is None:
+                return orelse if body is None else body
+            return body & orelse
+
+        if isinstance(stmt, ast.While):
+            # Assignments only add to the set, so the variables that are
+            # assigned at the top of the loop are the ones assigned before it.
+            exits = []
+            self._assigned_list(stmt.body, assigned, exits)
+            if not _is_constant_true(stmt.test):
+                exits.append(assigned)
+            if not exits:
+                return None
+            return set.intersection(*exits)
+
+        if stmt in self.states:
+            self.unassigned.update(
+                x for x in self.saved[self.states[stmt]] if x not in assigned
+            )
+
+        return assigned | self._defs(stmt)
+
+    def _emit_plain(self, out, stmts, depth):
+        for stmt in stmts:
+            self._emit_comments(out, stmt, depth)
+
+            if isinstance(stmt, ast.If):
+                self._emit_chain(out, stmt, depth, resume=False)
+            elif isinstance(stmt, ast.While):
+                self._emit_header(out, stmt, depth, 'while', self._test(stmt))
+                self._emit_plain(out, stmt.body, depth + 1)
+            elif stmt in self.states:
+                # The rest of the statements are unreachable, since this
+                # function returns here. The resume function runs them.
+                self._emit_suspend(out, stmt, depth)
+                return
+            elif _is_final_yield(stmt):
+                text = self.layout.text(stmt)
+                text[0] = 'return ' + text[0][len('yield'):].lstrip()
+                self._emit_text(out, text, depth)
+            else:
+                text = self.layout.text(stmt)
+                if _is_call_statement(stmt, self.yields):
+                    text[0] = self._direct_call(stmt, text[0])
+                self._emit_text(out, text, depth)
+
+    def _emit_resume(self, out, stmts, depth):
+        # Find the last statement that contains a call site. Every statement
+        # before it only runs when the function is not resuming.
+        last = max(
+            (i for i, x in enumerate(stmts) if self.points[x]),
+            default=-1,
+        )
+
+        index = 0
+        while index <= last:
+            stmt = stmts[index]
+            points = self.points[stmt]
+
+            if not points:
+                # Guard a run of statements that don't contain call sites.
+                end = index
+                while not self.points[stmts[end]]:
+                    end += 1
+                out.append(_indent(depth, 'if not _state:'))
+                self._emit_plain(out, stmts[index:end], depth + 1)
+                index = end
+                continue
+
+            self._emit_comments(out, stmt, depth)
+            if isinstance(stmt, ast.If):
+                self._emit_chain(out, stmt, depth, resume=True)
+            elif isinstance(stmt, ast.While):
+                if _is_constant_true(stmt.test):
+                    test = f'not _state or {_state_test(points)}'
+                else:
+                    test = f'({_state_test(points)}) if _state else ({self._test(stmt)})'
+                self._emit_header(out, stmt, depth, 'while', test)
+                self._emit_resume(out, stmt.body, depth + 1)
+            else:
+                out.append(_indent(depth, 'if not _state:'))
+                self._emit_suspend(out, stmt, depth + 1)
+                out.append(_indent(depth, f'elif _state == {self.states[stmt]}:'))
+                out.append(_indent(depth + 1, '_state = 0'))
+                text = self.layout.text(stmt)
+                node = self.yields[stmt][0]
+                text[0] = _replace_yield_text(stmt, node, text[0], '_sent')
+                self._emit_text(out, text, depth + 1)
+            index += 1
+
+        self._emit_plain(out, stmts[last + 1:], depth)
+
+    def _emit_chain(self, out, stmt, depth, resume):
+        keyword = 'if'
+        while True:
+            test = self._test(stmt)
+            points = set()
+            for child in stmt.body:
+                points |= self.points[child]
+
+            if resume and points:
+                test = f'({_state_test(points)}) if _state else ({test})'
+            elif resume:
+                test = f'not _state and ({test})'
+
+            self._emit_header(out, stmt, depth, keyword, test)
+            emit = self._emit_resume if resume else self._emit_plain
+            emit(out, stmt.body, depth + 1)
+
+            orelse = stmt.orelse
+            if len(orelse) == 1 and isinstance(orelse[0], ast.If):
+                stmt, keyword = orelse[0], 'elif'
+                self._emit_comments(out, stmt, depth + 1)
+                continue
+
+            if not orelse:
+                return
+
+            points = set()
+            for child in orelse:
+                points |= self.points[child]
+
+            if not resume:
+                out.append(_indent(depth, 'else:'))
+            elif points:
+                out.append(_indent(
+                    depth, f'elif not _state or {_state_test(points)}:'))
+            else:
+                out.append(_indent(depth, 'elif not _state:'))
+
+            emit(out, orelse, depth + 1)
+            return
+
+    def _emit_suspend(self, out, stmt, depth):
+        state = self.states[stmt]
+        call = self.yields[stmt][0].value
+        if not isinstance(call, ast.Tuple) or len(call.elts) != 3:
+            raise _unsupported(stmt, 'a call that is not a tuple')
+
+        text = self.layout.text(stmt)
+        if len(text) != 1:
+            raise _unsupported(stmt, 'a call that spans multiple lines')
+
+        operand = _yield_operand_text(stmt, self.yields[stmt][0], text[0])
+        frame = ', '.join([self.resume_name, str(state)] + self.saved[state])
+        out.append(_indent(depth, f'return {operand[:-1]}, [{frame}])'))
+
+    def _direct_call(self, stmt, text):
+        # Replace the yield with a call to the leaf function.
+        target = _call_target(stmt, self.yields)
+        node = self.yields[stmt][0]
+        operand = _yield_operand_text(stmt, node, text)
+        prefix = f'({CALL}, {target}, '
+        if not operand.startswith(prefix):
+            raise _unsupported(stmt, 'a call that is not a simple tuple')
+        pos = operand[len(prefix):-1]
+        return _replace_yield_text(stmt, node, text, f'{target}(_text, {pos})')
+
+    def _emit_comments(self, out, stmt, depth):
+        for comment in self.layout.comments(stmt):
+            out.append(_indent(depth, comment))
+
+    def _emit_header(self, out, stmt, depth, keyword, test):
+        out.append(_indent(depth, f'{keyword} {test}:'))
+
+    def _emit_text(self, out, text, depth):
+        # Only indent the first line. The other lines are continuation lines,
+        # and may be inside of a string.
+        out.append(_indent(depth, text[0]))
+        out.extend(text[1:])
+
+    def _test(self, stmt):
+        text = self.layout.text(stmt)
+        header = '\n'.join(text)
+        keyword = 'elif' if header.startswith('elif') else header.split()[0]
+        return header[len(keyword):].rstrip()[:-1].strip()
+
+
+def _indent(depth, text):
+    return '    ' * depth + text
+
+
+def _state_test(points):
+    if len(points) == 1:
+        return f'_state == {next(iter(points))}'
+    else:
+        return f'_state in {tuple(sorted(points))!r}'
+
+
+def _is_constant_true(node):
+    # Older versions of Python use NameConstant instead of Constant, but both
+    # have a "value" field.
+    return getattr(node, 'value', None) is True
+
+
+def _is_call_statement(stmt, yields):
+    return isinstance(stmt, ast.Assign) and len(yields.get(stmt, ())) == 1
+
+
+def _call_target(stmt, yields):
+    # Returns the name of the function that the statement calls, or None if
+    # the function is in a local variable.
+    call = yields[stmt][0].value
+    if isinstance(call, ast.Tuple) and len(call.elts) == 3:
+        func = call.elts[1]
+        if isinstance(func, ast.Name) and func.id.startswith(_PREFIXES):
+            return func.id
+    return None
+
+
+def _is_final_yield(stmt):
+    return isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Yield)
+
+
+def _find_yield(stmt, node, text):
+    """Returns the start and the end of the yield expression, along with its
+    parentheses, in the text of the statement's first line. (The text doesn't
+    have the statement's indentation.)
+    """
+    if node.lineno != stmt.lineno:
+        raise _unsupported(stmt, 'a yield that is not on the first line')
+
+    # The AST counts the UTF-8 bytes of the whole line, and the yield's offsets
+    # don't include its parentheses.
+    data = (' ' * stmt.col_offset + text).encode('utf-8')
+    start = data.rindex(b'(', 0, node.col_offset)
+    end = getattr(node, 'end_col_offset', None)
+    if end is None or getattr(node, 'end_lineno', None) != node.lineno:
+        end = _closing_paren(data, start)
+    else:
+        end = data.index(b')', end) + 1
+
+    prefix = len(data[:start].decode('utf-8'))
+    length = len(data[start:end].decode('utf-8'))
+    return prefix - stmt.col_offset, prefix - stmt.col_offset + length
+
+
+def _closing_paren(data, start):
+    # Older versions of Python don't have "end_col_offset", so match the
+    # parentheses with the tokenizer, which skips over strings.
+    depth = 0
+    line = data[start:].decode('utf-8')
+    for tok in tokenize.generate_tokens(io.StringIO(line).readline):
+        if tok.type == tokenize.OP and tok.string in '([{':
+            depth += 1
+        elif tok.type == tokenize.OP and tok.string in ')]}':
+            depth -= 1
+            if depth == 0:
+                return start + len(line[:tok.end[1]].encode('utf-8'))
+    raise Exception(f'Unbalanced parentheses: {line!r}')
+
+
+def _yield_operand_text(stmt, node, text):
+    start, end = _find_yield(stmt, node, text)
+    return text[start + 1:end - 1].strip()[len('yield'):].strip()
+
+
+def _replace_yield_text(stmt, node, text, replacement):
+    start, end = _find_yield(stmt, node, text)
+    return text[:start] + replacement + text[end:]
+
+
+def _unsupported(node, description):
+    return Exception(
+        f'The stackless backend does not support {description}'
+        f' (on line {node.lineno} of the generated code).'
+    )
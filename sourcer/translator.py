@@ -1,26 +1,196 @@
+import inspect
+import tokenize
 from string import Template
 
-from outsourcer import CodeBuilder, Code, Val
+from outsourcer import CodeBuilder, Code
 
 from . import expressions as ex
+from . import prefilter
+from . import runtime
+from . import stackless
 from .expressions import (
-    TEXT, POS, Choice, Class, Ref, Right, Rule, Skip, visit
+    Choice, Class, Ref, Right, Rule, Skip, visit
 )
+from .lexer import Lexer
 
 
-def generate_source_code(docstring, nodes):
+_backends = ('generator', 'stackless')
+
+
+def generate_source_code(docstring, nodes, incremental=False, backend='generator',
+        lexer=False, tokens=False, release=False, standalone=False, spans=False):
+    if backend not in _backends:
+        raise ValueError(
+            f'Unknown backend: {backend!r}. Expected one of:'
+            f' {", ".join(repr(x) for x in _backends)}.'
+        )
+
+    sections, rules, default_rule, has_ignored = collect_rules(nodes)
+    out = begin_module(
+        None if release else docstring,
+        sections,
+        ex.implementation_name(default_rule.name),
+        incremental=incremental,
+        backend=backend,
+        standalone=standalone,
+    )
+
+    out.state['release'] = release
+    out.state['spans'] = spans
+
+    if tokens:
+        out.state['tokens'] = True
+        out += Code(_token_template)
+
+    # In lexer mode, the rules parse a list of tokens, so they don't need to
+    # skip ignored text. The lexer drops it.
+    token_lexer = None
+    if lexer:
+        token_lexer = out.state['lexer'] = Lexer()
+
+    def prepare(rule, expr, error_delegate):
+        if token_lexer is not None:
+            token_lexer.add(rule, expr)
+        expr.precompile(out)
+        _compile_error_message(out, rule, expr, error_delegate)
+
+    prepare_rules(rules, has_ignored and not lexer, prepare)
+
+    if not lexer and not tokens:
+        add_prefilters(out, rules)
+
+    if token_lexer is not None:
+        rules_by_name = {x.name: x for x in rules}
+        for rule in rules:
+            if rule.is_ignored and rule.name != '_ignored':
+                token_lexer.add_ignored(rule, rules_by_name)
+
+        token_lexer.check()
+        pattern, kinds = token_lexer.token_pattern()
+        out += Code(Template(_lexer_template).substitute(
+            pattern=repr(pattern),
+            kinds=repr(kinds),
+        ))
+
+    out.add_newline()
+
+    for rule in rules:
+        rule.compile(out)
+
+    if backend == 'stackless':
+        # Rewrite the generators as resumable functions.
+        lowered = CodeBuilder()
+        lowered += Code(stackless.lower_generators(out.source_code()))
+        out = lowered
+
+    if release:
+        stripped = CodeBuilder()
+        stripped += Code(strip_comments(out.source_code()))
+        out = stripped
+
+    return out
+
+
+def strip_comments(source_code):
+    """Removes the comments from Python source code. Lines that only have a
+    comment are removed entirely.
+    """
+    lines = source_code.splitlines(keepends=True)
+    readline = iter(lines).__next__
+    comments = {}
+
+    for token in tokenize.generate_tokens(readline):
+        if token.type == tokenize.COMMENT:
+            row, col = token.start
+            comments[row - 1] = col
+
+    result = []
+    for index, line in enumerate(lines):
+        if index not in comments:
+            result.append(line)
+            continue
+
+        code = line[:comments[index]].rstrip()
+        if code:
+            result.append(code + '\n')
+
+    return ''.join(result)
+
+
+def begin_module(docstring, sections, start, incremental=False, backend='generator',
+        standalone=False):
+    """Returns a CodeBuilder with everything that comes before the rules: the
+    docstring, the runtime, and the Python sections. The "start" argument is the
+    code for the default parse function.
+
+    If "standalone" is True, then the module includes its own copy of the shared
+    runtime, instead of importing it from sourcer.runtime.
+    """
     out = CodeBuilder()
-    out.add_docstring(docstring)
-    out += Code(_program_setup)
+    if docstring is not None:
+        out.add_docstring(docstring)
+
+    if standalone:
+        out += Code(standalone_runtime_source())
+    else:
+        out += Code('from sourcer.runtime import *')
+
+    # Incremental grammars keep track of how far each rule looks ahead, so that
+    # "reparse" knows which memo entries an edit invalidates.
+    out.state['track_examined'] = incremental
+
+    # Just add Python sections directly to the program.
+    for section in sections:
+        out += Code(section.source_code)
+
+    out += Code(runtime_source(start, backend))
+
+    if incremental:
+        out += Code(Template(_incremental_template).substitute(start=start))
+
+    return out
 
-    # Collect all the rules and stuff.
-    rules, ignored = [], []
+
+def runtime_source(start, backend='generator'):
+    """Returns the source code of the part of the runtime that each grammar
+    module defines for itself. The "start" argument is the code for the default
+    parse function.
+    """
+    trampoline = _stackless_trampoline if backend == 'stackless' else _generator_trampoline
+    return Template(_module_template).substitute(
+        start=start,
+        trampoline=Template(trampoline).substitute(CALL=ex.CALL).strip(),
+    )
+
+
+_standalone_runtime = None
+
+
+def standalone_runtime_source():
+    """Returns the source code of the sourcer.runtime module, without its
+    docstring and its "__all__" list.
+    """
+    global _standalone_runtime
+    if _standalone_runtime is None:
+        source = inspect.getsource(runtime)
+        body = source.split('"""', 2)[2]
+        _standalone_runtime = body[:body.index('\n__all__ = ')].strip()
+    return _standalone_runtime
+
+
+def collect_rules(nodes):
+    """Separates the Python sections from the rules, and checks the rules.
+
+    Returns a tuple of (sections, rules, default_rule, has_ignored). If the
+    grammar has ignored rules, then the list of rules ends with a rule called
+    "_ignored" that skips them.
+    """
+    sections, rules, ignored = [], [], []
     start_rule = None
 
     for node in nodes:
-        # Just add Python sections directly to the program.
         if isinstance(node, (ex.PythonExpression, ex.PythonSection)):
-            out += Code(node.source_code)
+            sections.append(node)
             continue
 
         rules.append(node)
@@ -74,95 +244,35 @@ def generate_source_code(docstring, nodes):
             impl_name = ex.implementation_name('_ignored')
             first_rule.expr = Right(Ref(impl_name), first_rule.expr)
 
-        # Update the "skip_ignored" flag of each StringLiteral and RegexLiteral.
-        def _set_skip_ignored(expr):
-            if hasattr(expr, 'skip_ignored'):
-                expr.skip_ignored = True
-
-        for rule in rules:
-            if not rule.is_ignored:
-                visit(rules, _set_skip_ignored)
-
-    _assign_ids(rules)
-    _update_local_references(rules)
-    _update_rule_references(rules)
+    return sections, rules, start_rule or rules[0], bool(ignored)
 
-    default_rule = start_rule or rules[0]
 
-    out += Code(Template(_main_template).substitute(
-        CALL=ex.CALL,
-        start=ex.implementation_name(default_rule.name),
-    ))
-
-    error_delegates = {}
-    def set_error_delegate(expr):
-        if not isinstance(expr, Choice):
-            return
-        real, fail = [], []
-        for option in expr.exprs:
-            if isinstance(option, ex.Fail):
-                fail.append(option)
-            else:
-                real.append(option)
-        if not real or not fail:
-            return
-        delegate = Choice(*real)
-        error_delegates[fail[-1].program_id] = Choice(*real)
-
-    for rule in rules:
-        visit(rule, set_error_delegate)
-
-    visited = set()
-    def maybe_compile_error_message(out, rule, expr):
-        if not hasattr(expr, 'complain') or expr.program_id in visited:
-            return
-
-        visited.add(expr.program_id)
-        if expr.always_succeeds():
-            return
-
-        with out.global_section():
-            TITLE, LINE, COL = Code('title'), Code('line'), Code('col')
-
-            with out.DEF(str(expr.error_func()), [str(TEXT), str(POS)]):
-                with out.IF(Code('len')(TEXT) <= POS):
-                    out += TITLE << 'Unexpected end of input.'
-                    out += LINE << None
-                    out += COL << None
-
-                with out.ELSE():
-                    out += (LINE, COL) << Code('_get_line_and_column')(TEXT, POS)
-                    out += Code('excerpt') << Code('_extract_excerpt')(TEXT, POS, COL)
-                    out += TITLE << Code(
-                        r"f'Error on line {line}, column {col}:\n{excerpt}\n'"
-                    )
-
-                delegate = error_delegates.get(expr.program_id, expr)
-                out.extend([
-                    Code('details = ('),
-                    Val(f'Failed to parse the {rule.name!r} rule, at the expression:\n'),
-                    Val(f'    {str(delegate)}\n\n'),
-                    Val(expr.complain()),
-                    Code(')'),
-                    Code('raise ParseError', (TITLE + Code('details'), POS, LINE, COL)),
-                ])
-
-    for rule in rules:
-        visit(rule, lambda x: x.precompile(out))
-
-    out.add_newline()
+def prepare_rules(rules, skip_ignored, callback):
+    """Prepares every expression for compilation in a single pass over the
+    rules. For each expression, this pass:
 
+    - assigns a program_id,
+    - marks local references, and resolves references to other rules,
+    - sets the "skip_ignored" flag of string and regex literals,
+    - records the free variables,
+    - and calls "callback" with the rule, the expression, and the expression
+      that its error message describes.
+    """
+    rule_names = set()
     for rule in rules:
-        rule.compile(out)
-        visit(rule, lambda x: maybe_compile_error_message(out, rule, x))
-
-    return out
+        if isinstance(rule, (Class, Rule)):
+            rule_names.add(rule.name)
 
+    # If the grammar has any rules that aren't ignored, then every literal skips
+    # the ignored input after it, even the literals in the ignored rules.
+    skip_ignored = skip_ignored and any(not x.is_ignored for x in rules)
 
-def _assign_ids(rules):
+    counter = ex.SymbolCounter()
+    error_delegates = {}
+    freevars = []
     next_id = 1
 
-    def assign_id(node):
+    def previsit(node):
         nonlocal next_id
         node.program_id = next_id
         next_id += 1
@@ -170,307 +280,607 @@ def _assign_ids(rules):
             node.extra_id = next_id
             next_id += 1
 
-    visit(rules, assign_id)
-
-
-def _update_local_references(rules):
-    counter = ex.SymbolCounter()
-
-    def previsit(node):
         counter.previsit(node)
         if node.is_reference and counter.is_bound(node.name):
             node.is_local = True
 
-    visit(rules, previsit, counter.postvisit)
+        if isinstance(node, Ref) and node.name in rule_names and not node.is_local:
+            node._resolved = ex.implementation_name(node.name)
 
+        if skip_ignored and hasattr(node, 'skip_ignored'):
+            node.skip_ignored = True
 
-def _update_rule_references(rules):
-    rule_names = set()
-    for rule in rules:
-        if isinstance(rule, (Class, Rule)):
-            rule_names.add(rule.name)
+        if isinstance(node, Choice):
+            _set_error_delegate(node, error_delegates)
 
-    def check_refs(node):
-        if isinstance(node, Ref) and node.name in rule_names and not node.is_local:
-            node._resolved = ex.implementation_name(node.name)
+        callback(current_rule, node, error_delegates.get(id(node), node))
+        freevars.append(set())
 
-    visit(rules, check_refs)
+    def postvisit(node):
+        counter.postvisit(node)
 
+        names = freevars.pop()
+        if node.is_reference and node.is_local:
+            names.add(node.name)
+        if node.defines_local:
+            names.discard(node.name)
+        if node.has_params and node.params:
+            names.difference_update(node.params)
 
-_program_setup = r'''
-from collections import namedtuple as _nt
-from re import compile as _compile_re, IGNORECASE as _IGNORECASE
+        node._freevars = frozenset(names)
+        if freevars:
+            freevars[-1].update(names)
 
-class Node:
-    _fields = ()
+    for current_rule in rules:
+        visit(current_rule, previsit, postvisit)
 
-    def __eq__(self, other):
-        if not isinstance(other, self.__class__):
-            return False
-        for field in self._fields:
-            if getattr(self, field) != getattr(other, field):
-                return False
-        return True
 
-    def _asdict(self):
-        return {k: getattr(self, k) for k in self._fields}
+def add_prefilters(out, rules):
+    """Records the prefilter that "search" and "finditer" use for each rule."""
+    out.state['prefilters'] = prefilter.first_patterns(rules)
 
-    def _replace(self, **kw):
-        for field in self._fields:
-            if field not in kw:
-                kw[field] = getattr(self, field)
-        return self.__class__(**kw)
 
+def _set_error_delegate(choice, error_delegates):
+    # When a choice ends with a Fail expression, report the error in terms of
+    # the other options.
+    real, fail = [], []
+    for option in choice.exprs:
+        if isinstance(option, ex.Fail):
+            fail.append(option)
+        else:
+            real.append(option)
+    if real and fail:
+        error_delegates[id(fail[-1])] = Choice(*real)
 
-class Rule:
-    def __init__(self, name, parse, definition):
-        self.name = name
-        self.parse = parse
-        self.definition = definition
 
-    def __repr__(self):
-        return (f'Rule(name={self.name!r}, parse={self.parse.__name__},'
-            f' definition={self.definition!r})')
-'''
+def _compile_error_message(out, rule, expr, delegate):
+    if not hasattr(expr, 'complain') or expr.always_succeeds():
+        return
 
+    # Record the parts of the error message in the table. The runtime's
+    # "_raise_error" function formats the message when a parse fails.
+    entry = (rule.name, str(delegate), expr.complain())
+    with out.global_section():
+        out += Code('_errors')[expr.error_id()] << entry
 
-_main_template = r'''
-class SourcerError(Exception):
-    """Common superclass for ParseError and PartialParseError."""
 
+_module_template = r'''
+def parse(text, pos=0, fullparse=True, **options):
+    return _run(text, pos, $start, fullparse, **options)
 
-class ParseError(SourcerError):
-    def __init__(self, message, index, line, column):
-        super().__init__(message)
-        self.position = _Position(index, line, column)
 
+def _run(text, pos, start, fullparse, memo=None, share=False, index=None,
+        **options):
+    if (_result_cache is not None and memo is None and not options and not share
+            and index is None):
+        return _result_cache.run(_run, text, pos, start, fullparse)
 
-class PartialParseError(SourcerError):
-    def __init__(self, partial_result, last_position, excerpt):
-        super().__init__('Incomplete parse. Unexpected input on line'
-            f' {last_position.line}, column {last_position.column}:\n{excerpt}')
-        self.partial_result = partial_result
-        self.last_position = last_position
+    if options:
+        result = _run_with_options(text, pos, start, **options)
+    else:
+        result = _trampoline(text, pos, start, {} if memo is None else memo)
 
+    if result[0]:
+        nodes = None if index is None else _create_index(index, globals())
+        value = _finalize_parse_info(text, result[1], result[2], fullparse,
+            index=nodes)
+        if share:
+            value = _share(value, nodes)
+        return value if index is None else (value, nodes)
+    else:
+        _raise_error(text, result[2], result[1])
 
-class Infix(Node):
-    _fields = ('left', 'operator', 'right')
 
-    def __init__(self, left, operator, right):
-        self.left = left
-        self.operator = operator
-        self.right = right
+# Each expression that can fail has an entry in this table. The entry is a tuple
+# of the rule's name, the expression, and the complaint. Failed parses return
+# the expression's id instead of a message, and the ParseError formats the
+# message from the entry when someone asks for it.
+_errors = {}
 
-    def __repr__(self):
-        return f'Infix({self.left!r}, {self.operator!r}, {self.right!r})'
 
+def _raise_error(text, pos, error_id):
+    raise ParseError._on_demand(text, pos, _errors[error_id])
 
-class Postfix(Node):
-    _fields = ('left', 'operator')
 
-    def __init__(self, left, operator):
-        self.left = left
-        self.operator = operator
+# The "Grammar" function sets this to a ResultCache when it has one.
+_result_cache = None
 
-    def __repr__(self):
-        return f'Postfix({self.left!r}, {self.operator!r})'
 
+$trampoline
 
-class Prefix(Node):
-    _fields = ('operator', 'right')
 
-    def __init__(self, operator, right):
-        self.operator = operator
-        self.right = right
+def _finditer(text, pos, start, prefilter):
+    # The prefilter is a string or a compiled regex that finds the positions
+    # where a match might begin. Without one, try every position. (The text may
+    # also be a bytes-like object, like an mmap, or a sequence of tokens.)
+    is_str = isinstance(getattr(prefilter, 'pattern', prefilter), str)
+    if is_str != isinstance(text, str) or not hasattr(text, 'find'):
+        prefilter = None
 
-    def __repr__(self):
-        return f'Prefix({self.operator!r}, {self.right!r})'
+    memo = {}
+    lines = _LineCounter(text)
+    pruned = pos
+    length = len(text)
+
+    while pos <= length:
+        if isinstance(prefilter, (str, bytes)):
+            pos = text.find(prefilter, pos)
+            if pos < 0:
+                return
+        elif prefilter is not None:
+            found = prefilter.search(text, pos)
+            if found is None:
+                return
+            pos = found.start()
+
+        # Every attempt shares the memo table. No attempt looks behind its
+        # starting position, so the entries behind it are dead.
+        if pos - pruned >= _PRUNE_DISTANCE:
+            for func, table in memo.items():
+                memo[func] = {k: v for k, v in table.items() if k >= pos}
+            pruned = pos
+
+        result = _trampoline(text, pos, start, memo)
+        if not result[0]:
+            pos += 1
+            continue
 
+        value, end = result[1], result[2]
+        lines.advance(pos)
+        _locate_nodes(value, lines)
+        yield _Match(value, pos, end, *lines.locate(pos))
+        pos = end if end > pos else pos + 1
 
-def parse(text, pos=0, fullparse=True):
-    return _run(text, pos, $start, fullparse)
 
+def dumps(tree):
+    chunks = []
+    _schema().dump(tree, chunks.append)
+    return b''.join(chunks)
 
-_PositionInfo = _nt('_PositionInfo', 'start, end')
 
-_Position = _nt('_Position', 'index, line, column')
+def dump(tree, file):
+    _schema().dump(tree, file.write)
 
 
-class _ParseFunction(_nt('_ParseFunction', 'func, args, kwargs')):
-    def __call__(self, _text, _pos):
-        return self.func(_text, _pos, *self.args, **dict(self.kwargs))
+def loads(data):
+    return _schema().loads(data)
 
 
-class _StringLiteral(str):
-    def __call__(self, _text, _pos):
-        return self._parse_function(_text, _pos)
+def load(file):
+    return loads(file.read())
 
 
-def _wrap_string_literal(string_value, parse_function):
-    result = _StringLiteral(string_value)
-    result._parse_function = parse_function
-    return result
+# The schema numbers the classes of the module for "dumps" and "loads". It's
+# created the first time that one of them is called, after the classes exist.
+_tree_schema = None
 
 
-def _run(text, pos, start, fullparse):
-    memo = {}
+def _schema():
+    global _tree_schema
+    if _tree_schema is None:
+        _tree_schema = _TreeSchema(globals())
+    return _tree_schema
+'''
+
+
+_generator_trampoline = r'''
+def _trampoline(text, pos, start, memo):
+    # The memo table maps each parse function to its own table, which maps
+    # positions to results. This way, each lookup hashes the function and an
+    # int, rather than a new (CALL, function, position) tuple.
     result = None
 
-    key = ($CALL, start, pos)
+    table = memo.get(start)
+    if table is None:
+        table = memo[start] = {}
+
     gtor = start(text, pos)
-    stack = [(key, gtor)]
+    stack = [(table, pos, gtor)]
 
     while stack:
-        key, gtor = stack[-1]
+        table, pos, gtor = stack[-1]
         result = gtor.send(result)
 
         if result[0] != $CALL:
             stack.pop()
-            memo[key] = result
-        elif result in memo:
-            result = memo[result]
+            table[pos] = result
+            continue
+
+        func, pos = result[1], result[2]
+        table = memo.get(func)
+        if table is None:
+            table = memo[func] = {}
+
+        if pos in table:
+            result = table[pos]
         else:
-            gtor = result[1](text, result[2])
-            stack.append((result, gtor))
+            stack.append((table, pos, func(text, pos)))
             result = None
 
-    if result[0]:
-        return _finalize_parse_info(text, result[1], result[2], fullparse)
-    else:
-        pos = result[2]
-        message = result[1](text, pos)
-        raise ParseError(message, pos)
+    return result
 
 
-def visit(node):
-    visited = set()
-    stack = [node]
-    while stack:
-        node = stack.pop()
+def _run_with_options(text, pos, start, memo_policy='full', memo_size=None,
+        max_memo_entries=None, stats=None, max_steps=None, deadline=None):
+    # This is the same loop as "_trampoline", only it uses a memo policy, it
+    # counts calls and memo hits, and it enforces the budget.
+    memo = _create_memo(memo_policy, memo_size, max_memo_entries)
+    get, put = memo.get, memo.put
+    budget = _Budget(max_steps, deadline)
+
+    if stats is None:
+        stats = ParseStats()
+
+    # Count the call to the start rule as the first memo miss.
+    calls, hits = 1, 0
+    check_at = budget.check(calls, pos, stats)
+    result = None
 
-        if isinstance(node, (list, tuple)):
-            stack.extend(node)
+    key = ($CALL, start, pos)
+    gtor = start(text, pos)
+    stack = [(key, gtor)]
 
-        elif isinstance(node, dict):
-            stack.extend(node.values())
+    try:
+        while stack:
+            key, gtor = stack[-1]
+            result = gtor.send(result)
 
-        elif isinstance(node, Node):
-            node_id = id(node)
-            if node_id in visited:
+            if result[0] != $CALL:
+                stack.pop()
+                put(key, result)
                 continue
-            visited.add(node_id)
 
-            yield node
+            calls += 1
+            if calls >= check_at:
+                check_at = budget.check(calls, result[2], stats)
 
-            if hasattr(node, '_fields'):
-                stack.extend(getattr(node, x) for x in node._fields)
+            cached = get(result)
 
+            if cached is None:
+                gtor = result[1](text, result[2])
+                stack.append((result, gtor))
+                result = None
+            else:
+                hits += 1
+                result = cached
+    finally:
+        stats._record(memo, calls, hits)
 
-def transform(node, *callbacks):
-    if not callbacks:
-        return node
+    return result
+'''
 
-    if len(callbacks) == 1:
-        callback = callbacks[0]
-    else:
-        def callback(node):
-            for f in callbacks:
-                node = f(node)
-            return node
 
-    return _transform(node, callback)
+_stackless_trampoline = r'''
+def _trampoline(text, pos, start, memo):
+    # The stackless version of the trampoline. Each parsing function returns
+    # either its result, or a tuple (CALL, func, pos, frame). The frame holds
+    # the function that resumes the caller when the call is done.
+    table = memo.get(start)
+    if table is None:
+        table = memo[start] = {}
+
+    result = start(text, pos)
+    stack = []
+
+    while True:
+        if result[0] == $CALL:
+            stack.append((table, pos, result[3]))
+            func, pos = result[1], result[2]
+            table = memo.get(func)
+            if table is None:
+                table = memo[func] = {}
+
+            if pos not in table:
+                result = func(text, pos)
+                continue
 
+            result = table[pos]
+        else:
+            table[pos] = result
 
-def _transform(node, callback):
-    if isinstance(node, list):
-        return [_transform(x, callback) for x in node]
+        if not stack:
+            return result
 
-    if not isinstance(node, Node):
-        return node
+        table, pos, frame = stack.pop()
+        result = frame[0](text, frame, result)
 
-    updates = {}
-    for field in node._fields:
-        was = getattr(node, field)
-        now = _transform(was, callback)
-        if was is not now:
-            updates[field] = now
 
-    if updates:
-        node = node._replace(**updates)
+def _run_with_options(text, pos, start, memo_policy='full', memo_size=None,
+        max_memo_entries=None, stats=None, max_steps=None, deadline=None):
+    # This is the same loop as "_trampoline", only it uses a memo policy, it
+    # counts calls and memo hits, and it enforces the budget.
+    memo = _create_memo(memo_policy, memo_size, max_memo_entries)
+    get, put = memo.get, memo.put
+    budget = _Budget(max_steps, deadline)
 
-    return callback(node)
+    if stats is None:
+        stats = ParseStats()
 
+    # Count the call to the start rule as the first memo miss.
+    calls, hits = 1, 0
+    check_at = budget.check(calls, pos, stats)
 
-def _finalize_parse_info(text, nodes, pos, fullparse):
-    line_numbers, column_numbers = _map_index_to_line_and_column(text)
+    # Run the versions of the functions that don't call any rules directly, so
+    # that each call goes through the memo table and counts as a step.
+    counted = _counted_functions.get
 
-    for node in visit(nodes):
-        pos_info = getattr(node, '_position_info', None)
-        if pos_info:
-            start, end = pos_info
-            end -= 1
-            node._position_info = _PositionInfo(
-                start=_Position(start, line_numbers[start], column_numbers[start]),
-                end=_Position(end, line_numbers[end], column_numbers[end]),
+    key = ($CALL, start, pos)
+    result = counted(start, start)(text, pos)
+    stack = []
+
+    try:
+        while True:
+            if result[0] == $CALL:
+                calls += 1
+                if calls >= check_at:
+                    check_at = budget.check(calls, result[2], stats)
+
+                stack.append((key, result[3]))
+                key = result[:3]
+                cached = get(key)
+
+                if cached is None:
+                    func = key[1]
+                    result = counted(func, func)(text, key[2])
+                    continue
+
+                hits += 1
+                result = cached
+            else:
+                put(key, result)
+
+            if not stack:
+                break
+
+            key, frame = stack.pop()
+            result = frame[0](text, frame, result)
+    finally:
+        stats._record(memo, calls, hits)
+
+    return result
+'''
+
+
+_incremental_template = r'''
+_UNBOUNDED = float('inf')
+
+
+class ParseHandle:
+    """The outcome of an incremental parse, along with its memo table.
+
+    Pass the handle to "reparse" to parse an edited version of the text. The
+    "result" property returns the parse result, or raises the parse error.
+    """
+
+    def __init__(self, text, pos, start, fullparse, memo):
+        self.text = text
+        self.pos = pos
+        self.fullparse = fullparse
+        self.error = None
+        self._start = start
+        self._memo = memo
+        self._result = None
+
+        try:
+            self._result = _run(text, pos, start, fullparse, memo)
+        except SourcerError as exc:
+            self.error = exc
+
+    @property
+    def result(self):
+        if self.error is not None:
+            raise self.error
+        return self._result
+
+
+def parse_incremental(text, pos=0, fullparse=True):
+    return ParseHandle(text, pos, $start, fullparse, {})
+
+
+def reparse(handle, text, edits):
+    """Parses the edited text, reusing what it can from the previous parse.
+
+    Each edit is a tuple of (start, old_end, new_end), where the text from
+    "start" to "old_end" was replaced with the text from "start" to "new_end".
+    The edits are applied in order, each one relative to the text that results
+    from the edits before it.
+
+    The old handle gives its memo table to the new handle, so it can't be used
+    again. (Nodes from the old result may also be shared by the new result.)
+    """
+    if handle._memo is None:
+        raise ValueError('The parse handle has already been reparsed.')
+
+    edits = list(edits)
+    pos, length = handle.pos, len(handle.text)
+
+    for start, old_end, new_end in edits:
+        if not (0 <= start <= old_end <= length and start <= new_end):
+            raise ValueError(
+                f'Invalid edit: {(start, old_end, new_end)!r} (The text has'
+                f' length {length} at this point.)'
             )
+        length += new_end - old_end
 
-    if fullparse and pos < len(text):
-        line, col = line_numbers[pos], column_numbers[pos]
-        position = _Position(pos, line, col)
-        excerpt = _extract_excerpt(text, pos, col)
-        raise PartialParseError(nodes, position, excerpt)
+        if pos > old_end:
+            pos += new_end - old_end
+        elif pos > start:
+            pos = start
 
-    return nodes
+    if length != len(text):
+        raise ValueError(
+            f'The edits produce text with length {length}, but the new text'
+            f' has length {len(text)}.'
+        )
 
+    memo, handle._memo = handle._memo, None
+    for start, old_end, new_end in edits:
+        memo = _apply_edit(memo, start, old_end, new_end)
 
-def _extract_excerpt(text, pos, col):
-    if isinstance(text, bytes):
-        return repr(text[max(0, pos - 1) : pos + 2])
+    return ParseHandle(text, pos, handle._start, handle.fullparse, memo)
 
-    start = pos - (col - 1)
-    match = _compile_re('\n').search(text, pos + 1)
-    end = len(text) if match is None else match.start()
 
-    if end - start < 96:
-        return text[start : end] + _caret_at(col - 1)
+def _apply_edit(memo, start, old_end, new_end):
+    # Keep the entries that stopped looking before the edit. Shift the entries
+    # that start after the edit, as long as they don't look behind them into
+    # the edit. Drop the rest.
+    delta = new_end - old_end
+    result = {}
+    moved = set()
 
-    if col < 60:
-        # Chop the line off at the end.
-        return text[start : start + 90] + ' ...' + _caret_at(col - 1)
+    for func, table in memo.items():
+        new_table = result[func] = {}
 
-    elif end - pos < 40:
-        # Chop the line off at the start.
-        return '... ' + text[end - 90 : end] + _caret_at(pos - (end - 90) + 4)
+        for key, value in table.items():
+            if value[3] <= start:
+                new_table[key] = value
 
-    else:
-        # Chop the line off at both ends.
-        return '... ' + text[pos - 42 : pos + 42] + ' ...' + _caret_at(42 + 4)
+            elif key > old_end and value[4] > old_end:
+                status, value, pos, examined, earliest = value
+                if delta:
+                    _shift_position_info(value, delta, moved)
+                new_table[key + delta] = (
+                    status, value, pos + delta, examined + delta, earliest + delta
+                )
 
+    return result
 
-def _caret_at(index):
-    return '\n' + (' ' * index) + '^'
 
+def _shift_position_info(value, delta, moved):
+    # Memo entries share most of their values, so keep track of the containers
+    # that we've already seen, too, and not just the nodes.
+    stack = [value]
+    while stack:
+        value = stack.pop()
+        if not isinstance(value, (list, tuple, dict, Node)):
+            continue
 
-def _get_line_and_column(text, pos):
-    line_numbers, column_numbers = _map_index_to_line_and_column(text)
-    return line_numbers[pos], column_numbers[pos]
+        value_id = id(value)
+        if value_id in moved:
+            continue
+        moved.add(value_id)
 
+        if isinstance(value, dict):
+            stack.extend(value.values())
+            continue
 
-def _map_index_to_line_and_column(text):
-    line_numbers = []
-    column_numbers = []
+        if not isinstance(value, Node):
+            stack.extend(value)
+            continue
 
-    current_line = 1
-    current_column = 0
+        stack.extend(getattr(value, x) for x in value._fields)
+        pos_info = getattr(value, '_position_info', None)
+        if not pos_info:
+            continue
 
-    for c in text:
-        if c == '\n':
-            current_line += 1
-            current_column = 0
+        if type(pos_info) is tuple:
+            start, end = pos_info
         else:
-            current_column += 1
-        line_numbers.append(current_line)
-        column_numbers.append(current_column)
+            start, end = pos_info.start.index, pos_info.end.index + 1
+
+        value._position_info = (start + delta, end + delta)
+'''
+
+
+_token_template = r'''
+def _match_token(token, expected):
+    """Returns True if the token matches a string literal or a compiled regular
+    expression from the grammar.
+
+    A token may be a string, or an object with "kind" and "value" attributes.
+    A string literal matches a token with that kind or that value. A regular
+    expression matches a token whose value it matches in full.
+    """
+    if isinstance(token, (str, bytes)):
+        kind = value = token
+    else:
+        kind = getattr(token, 'kind', None)
+        value = getattr(token, 'value', None)
+
+    if isinstance(expected, (str, bytes)):
+        return expected == kind or expected == value
+
+    return type(value) is type(expected.pattern) and bool(expected.fullmatch(value))
+'''
+
+
+_lexer_template = r'''
+from array import array as _array
 
-    return line_numbers, column_numbers
+_token_pattern = _compile_re($pattern)
+_token_kinds = $kinds
+
+
+class _Tokens:
+    """The tokens of a text, as parallel arrays of kinds and offsets. The rules
+    parse the token indexes instead of the characters.
+    """
+
+    __slots__ = ('text', 'kinds', 'starts', 'ends')
+
+    def __init__(self, text):
+        self.text = text
+        self.kinds = _array('i')
+        self.starts = _array('l')
+        self.ends = _array('l')
+
+    def span(self, start, end):
+        # Converts a range of token indexes into a range of character offsets.
+        if start >= end:
+            return (self.starts[start], self.starts[start])
+        return (self.starts[start], self.ends[end - 1])
+
+
+def _tokenize(text, pos):
+    tokens = _Tokens(text)
+    kinds, starts, ends = tokens.kinds, tokens.starts, tokens.ends
+
+    for match in _token_pattern.finditer(text, pos):
+        start, end = match.span()
+        if start != pos or start == end:
+            break
+
+        pos = end
+        kind = _token_kinds[match.lastgroup]
+        if kind >= 0:
+            kinds.append(kind)
+            starts.append(start)
+            ends.append(end)
+
+    # End with a token that no expression matches. It starts where the lexer
+    # stopped, so that errors point at the text that it couldn't split.
+    kinds.append(-1)
+    starts.append(pos)
+    ends.append(pos)
+    return tokens
+
+
+def _finditer(text, pos, start, prefilter):
+    raise ValueError('Grammars in lexer mode do not support searching.')
+
+
+def _run(text, pos, start, fullparse, memo=None, share=False, index=None,
+        **options):
+    if (_result_cache is not None and memo is None and not options and not share
+            and index is None):
+        return _result_cache.run(_run, text, pos, start, fullparse)
+
+    tokens = _tokenize(text, pos)
+
+    if options:
+        result = _run_with_options(tokens, 0, start, **options)
+    else:
+        result = _trampoline(tokens, 0, start, {} if memo is None else memo)
+
+    pos = tokens.starts[result[2]]
+
+    if result[0]:
+        nodes = None if index is None else _create_index(index, globals())
+        value = _finalize_parse_info(text, result[1], pos, fullparse, tokens,
+            index=nodes)
+        if share:
+            value = _share(value, nodes)
+        return value if index is None else (value, nodes)
+    else:
+        _raise_error(text, pos, result[1])
 '''
@@ -0,0 +1,131 @@
+import pytest
+from sourcer import Grammar
+
+
+json_grammar = r'''
+    start = Value
+    Value = Object | Array | String | Number | Keyword
+    Object = "{" >> (Member // ",") << "}" |> `dict`
+    Member = [String << ":", Value]
+    Array = "[" >> (Value // ",") << "]"
+    String = /"(?:[^\\"]|\\.)*"/
+    Number = /-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?/ |> `float`
+    Keyword = "true" >> `True` | "false" >> `False` | "null" >> `None`
+    ignored Space = /\s+/
+'''
+
+
+json_texts = [
+    '[1, 2, {"a": [true, false, null]}, "xyz", 3]',
+    '{"a": {"b": {"c": [[], {}, [1.5e3]]}}}',
+    '  [ 1 , @ ]',
+    '[1, 2,',
+    '{"a" 1}',
+    '[1] 2',
+    '',
+]
+
+
+operator_grammar = r'''
+    start = Expr
+    Expr = OperatorPrecedence(
+        Int | Call | "(" >> Expr << ")",
+        Prefix("-"),
+        Postfix("!"),
+        RightAssoc("^"),
+        LeftAssoc("*" | "/"),
+        NonAssoc("<" | ">"),
+        LeftAssoc("+" | "-"),
+    )
+    class Call {
+        name: /[a-z]+/
+        args: "(" >> (Expr /? ",") << ")"
+    }
+    Int = /\d+/ |> `int`
+    ignore /\s+/
+'''
+
+
+operator_texts = [
+    '1 + 2 * 3',
+    '-f(1, g(2)!, 3^2^1) - 4',
+    '--1 < 2',
+    '1 < 2 < 3',
+    '((1)',
+    'f(1,,2)',
+    '1 +',
+]
+
+
+parameterized_grammar = r'''
+    start = Wrap("<", Wrap("[", Letter, "]"), ">") // ","
+    Wrap(open, item, close) => open >> item << close
+    Letter = /[a-z]/
+    ignore /\s+/
+'''
+
+
+parameterized_texts = ['<[a]>, <[b]>', '<[a>', '<[a]>,', '']
+
+
+indentation_grammar = r'''
+    ignore /[ \t]+/
+    Indent = /\n[ \t]*/
+    MatchIndent(i) => Indent where `lambda x: x == i`
+    IncreaseIndent(i) => Indent where `lambda x: len(x) > len(i)`
+    Body(current_indent) =>
+        let i = IncreaseIndent(current_indent) in
+        Statement(i) // MatchIndent(i)
+    Statement(current_indent) => If(current_indent) | Print
+    class If(current_indent) {
+        test: "if" >> Name
+        body: Body(current_indent)
+    }
+    class Print {
+        name: "print" >> Name
+    }
+    Name = /[a-zA-Z]+/
+    Newline = /[\r\n]+/
+    Start = Opt(Newline) >> (Statement('') /? Newline)
+'''
+
+
+indentation_texts = [
+    '\nif foo\n  print bar\n  if baz\n    print fiz\nprint buz\n',
+    'if foo\nprint bar',
+    'if foo\n  print bar\n    print baz',
+    'print',
+]
+
+
+def _outcome(func):
+    try:
+        return ('ok', repr(func()))
+    except Exception as exc:
+        return ('error', type(exc).__name__, str(exc))
+
+
+@pytest.mark.parametrize('description, texts', [
+    (json_grammar, json_texts),
+    (operator_grammar, operator_texts),
+    (parameterized_grammar, parameterized_texts),
+    (indentation_grammar, indentation_texts),
+], ids=['json', 'operators', 'parameters', 'indentation'])
+@pytest.mark.parametrize('options', [
+    {'backend': 'stackless'},
+    {'backend': 'interpret'},
+    {'incremental': True},
+    {'lazy': True},
+    {'lexer': True},
+    {'lexer': True, 'backend': 'stackless'},
+])
+def test_options_match_generator_backend(description, texts, options):
+    # In lexer mode, terminals can't depend on their context.
+    if options.get('lexer') and description is indentation_grammar:
+        pytest.skip('The indentation grammar needs character mode.')
+
+    g1 = Grammar(description)
+    g2 = Grammar(description, **options)
+
+    for text in texts:
+        assert _outcome(lambda: g2.parse(text)) == _outcome(lambda: g1.parse(text))
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+from sourcer import Grammar
+from sourcer.bench import corpora, generate_grammar, generate_text, measure, measure_compile
+from sourcer.bench.__main__ import main
+
+
+@pytest.mark.parametrize('name', sorted(corpora))
+def test_generated_text_parses(name):
+    corpus = corpora[name]
+    g = Grammar(corpus.description)
+    for depth in range(4):
+        text = generate_text(corpus, 1000, depth, seed=depth)
+        assert len(text) >= 1000
+        g.parse(text)
+
+
+def test_generated_text_is_reproducible():
+    corpus = corpora['json']
+    assert generate_text(corpus, 500, 3, seed=1) == generate_text(corpus, 500, 3, seed=1)
+    assert generate_text(corpus, 500, 3, seed=1) != generate_text(corpus, 500, 3, seed=2)
+
+
+def test_measure():
+    result = measure(corpora['arithmetic'], size=500, depth=2, repeat=1)
+    assert result['corpus'] == 'arithmetic'
+    assert result['text_bytes'] >= 500
+    assert result['megabytes_per_second'] > 0
+    assert result['peak_memory_bytes'] > 0
+    assert result['memo_entries'] > 0
+
+
+def test_generated_grammar_compiles():
+    g = Grammar(generate_grammar(50))
+    assert g.parse('kw0 foo1') == ['kw0', 'foo1']
+
+    result = measure_compile(50)
+    assert result['rules'] == 50
+    assert result['compile_seconds'] > 0
+
+
+def test_main_writes_json(tmp_path):
+    path = tmp_path / 'results.json'
+    main([
+        '--corpus', 'json',
+        '--corpus', 'indentation',
+        '--backend', 'generator',
+        '--backend', 'stackless',
+        '--size', '200',
+        '--repeat', '1',
+        '--output', str(path),
+    ])
+    report = json.loads(path.read_text())
+    assert [(x['corpus'], x['backend']) for x in report['results']] == [
+        ('json', 'generator'),
+        ('json', 'stackless'),
+        ('indentation', 'generator'),
+        ('indentation', 'stackless'),
+    ]
+
+
+def test_main_skips_context_dependent_corpora_in_lexer_mode(tmp_path):
+    path = tmp_path / 'results.json'
+    main([
+        '--corpus', 'json',
+        '--corpus', 'excel',
+        '--backend', 'generator',
+        '--backend', 'interpret',
+        '--lexer',
+        '--size', '200',
+        '--repeat', '1',
+        '--output', str(path),
+    ])
+    report = json.loads(path.read_text())
+    assert [(x['corpus'], x['lexer']) for x in report['results']] == [('json', True)]
+
+
+def test_main_measures_the_interpreter(tmp_path):
+    path = tmp_path / 'results.json'
+    main([
+        '--corpus', 'json',
+        '--rules', '20',
+        '--backend', 'interpret',
+        '--size', '200',
+        '--repeat', '1',
+        '--output', str(path),
+    ])
+    report = json.loads(path.read_text())
+
+    [result] = report['results']
+    assert result['backend'] == 'interpret'
+    assert result['import_seconds'] is None
+    assert result['parse_seconds'] > 0
+
+    [result] = report['compile_results']
+    assert result['backend'] == 'interpret'
+    assert result['source_bytes'] is None
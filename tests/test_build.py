@@ -0,0 +1,79 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+from sourcer.__main__ import main
+from sourcer.build import build
+
+
+_grammar = r'''
+class Formula {
+    name: "=" >> /[A-Z]+/
+    args: "(" >> (Arg // ",") << ")"
+}
+Arg = Formula | Int
+Int = /\d+/ |> `int`
+ignore /\s+/
+'''
+
+
+def _run_module(directory, module_name, code, flags=()):
+    # Run the module in a new process, where sourcer can't be imported.
+    script = (
+        'import sys\n'
+        'sys.modules["sourcer"] = sys.modules["outsourcer"] = None\n'
+        f'import {module_name} as g\n'
+        f'{code}\n'
+    )
+    result = subprocess.run(
+        [sys.executable, *flags, '-c', script],
+        cwd=str(directory),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return result.stdout.strip()
+
+
+@pytest.mark.parametrize('release', [False, True])
+def test_build_writes_a_standalone_module(tmp_path, release):
+    path, pyc_path = build(_grammar, str(tmp_path / 'formulas.py'), release=release)
+    assert os.path.exists(pyc_path)
+
+    output = _run_module(tmp_path, 'formulas', 'print(g.parse("=SUM(1, =ABS(2))"))')
+    assert output == (
+        "Formula(name='SUM', args=[1, Formula(name='ABS', args=[2])])"
+    )
+
+    with open(path) as f:
+        source = f.read()
+
+    assert ('# Begin' not in source) == release
+    assert ('Grammar definition' not in source) == release
+    assert ("'=' >> /[A-Z]+/" not in source) == release
+
+    # Release builds also have an "-OO" file, under its own name.
+    opt_path = importlib.util.cache_from_source(path, optimization=2)
+    assert os.path.exists(opt_path) == release
+    if release:
+        output = _run_module(tmp_path, 'formulas', 'print(g.parse("=F(1)"))',
+            flags=['-OO'])
+        assert output == "Formula(name='F', args=[1])"
+
+
+def test_build_command(tmp_path, capsys):
+    grammar = tmp_path / 'formulas.grammar'
+    grammar.write_text(_grammar)
+
+    status = main(['build', str(grammar), '--release', '--backend', 'stackless'])
+    assert status == 0
+    assert str(tmp_path / 'formulas.py') in capsys.readouterr().out
+
+    code = 'print([m.value.name for m in g.Formula.finditer("a =F(1) b =G(2)")])'
+    assert _run_module(tmp_path, 'formulas', code) == "['F', 'G']"
+
+    with pytest.raises(SystemExit):
+        main(['build', str(grammar), '--lexer', '--incremental'])
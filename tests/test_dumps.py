@@ -0,0 +1,79 @@
+import io
+
+import pytest
+from sourcer import Grammar
+
+
+grammar = r'''
+    start = Stmt*
+    class Assign { name: Name << "="; value: Expr << ";" }
+    Expr = OperatorPrecedence(
+        Atom,
+        Prefix("-"),
+        LeftAssoc("*" | "/"),
+        LeftAssoc("+" | "-"),
+    )
+    Atom = Float | Int | Name | "(" >> Expr << ")"
+    Stmt = Assign | Expr << ";"
+    Name = /[a-z]+/
+    Int = /\d+/ |> `int`
+    Float = /\d+\.\d+/ |> `float`
+    ignore /\s+/
+'''
+
+
+def test_dumps_and_loads():
+    g = Grammar(grammar)
+    tree = g.parse('x = 1 + 2.5 * -y;\nx * 12345678901234567890;\nzz = x;')
+    data = g.dumps(tree)
+    result = g.loads(data)
+
+    assert result == tree
+    assert isinstance(result[0].value, g.Infix)
+    assert isinstance(result[0].value.right.right, g.Prefix)
+
+    positions = lambda x: [getattr(n, '_position_info', None) for n in g.visit(x)]
+    assert positions(result) == positions(tree)
+    assert result[2]._position_info.start == (44, 3, 1)
+
+    # Other values that a grammar might produce also round trip.
+    values = [None, True, False, -7, 2 ** 100, 0.5, 'caf\xe9', b'\x00\xff', (1,), {'a': [], 'b': {}}]
+    assert g.loads(g.dumps(values)) == values
+    assert type(g.loads(g.dumps(values))[-2]) is tuple
+
+    # Repeated strings are only written once.
+    names = g.parse('abcdefghij;' * 100)
+    assert len(g.dumps(names)) < 1000
+
+
+def test_dump_streams_chunks():
+    g = Grammar(grammar, backend='stackless')
+    text = '(' * 2000 + '1' + ')' * 2000 + ';'
+    text += ''.join(f'v = {i} * {i};\n' for i in range(10000))
+    tree = g.parse(text)
+
+    chunks = []
+    g.dump(tree, type('Writer', (), {'write': staticmethod(chunks.append)}))
+    assert len(chunks) > 1
+    assert g.load(io.BytesIO(b''.join(chunks))) == tree
+
+
+def test_loads_checks_the_data():
+    g = Grammar(grammar)
+    data = g.dumps(g.parse('x = 1;'))
+
+    with pytest.raises(ValueError, match='different classes'):
+        Grammar('class Assign { name: "x" }').loads(data)
+
+    with pytest.raises(ValueError, match='not a parse tree'):
+        g.loads(b'{"x": 1}')
+
+    with pytest.raises(ValueError, match='truncated'):
+        g.loads(data[:-3])
+
+    with pytest.raises(TypeError, match="'set'"):
+        g.dumps({1, 2})
+
+    # Grammars with the same classes can read each other's trees.
+    other = Grammar(grammar.replace('Int = /\\d+/', 'Int = /[0-9]+/'))
+    assert repr(other.loads(data)) == "[Assign(name='x', value=1)]"
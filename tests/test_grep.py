@@ -0,0 +1,150 @@
+import bz2
+import gzip
+import json
+import lzma
+
+import pytest
+from sourcer.__main__ import main
+
+
+_grammar = r'''
+class Formula {
+    name: "=" >> /[A-Z]+/
+    args: "(" >> (Arg // ",") << ")"
+}
+Arg = Formula | /\d+/
+'''
+
+
+@pytest.fixture
+def logs(tmp_path):
+    grammar = tmp_path / 'formula.grammar'
+    grammar.write_text(_grammar)
+
+    root = tmp_path / 'logs'
+    (root / 'old').mkdir(parents=True)
+    (root / 'a.log').write_text('a: =SUM(1,2) b\nc =MAX(=ABS(3),4)\n')
+    (root / 'empty.log').write_text('')
+    (root / 'old' / 'b.log.gz').write_bytes(gzip.compress(b'nothing\n=F(1)\n'))
+    (root / 'old' / 'c.log.bz2').write_bytes(bz2.compress(b'=G(2)'))
+    (root / 'old' / 'd.log.xz').write_bytes(lzma.compress(b'x\n\n  =H(3)'))
+    return grammar, root
+
+
+@pytest.mark.parametrize('jobs', ['1', '2'])
+def test_grep_prints_matches(logs, capsys, jobs):
+    grammar, root = logs
+    status = main([
+        'grep', '--grammar', str(grammar), '--rule', 'Formula', '--jobs', jobs,
+        str(root),
+    ])
+    assert status == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines == [
+        f'{root / "a.log"}:1:4: =SUM(1,2)',
+        f'{root / "a.log"}:2:3: =MAX(=ABS(3),4)',
+        f'{root / "old" / "b.log.gz"}:2:1: =F(1)',
+        f'{root / "old" / "c.log.bz2"}:1:1: =G(2)',
+        f'{root / "old" / "d.log.xz"}:3:3: =H(3)',
+    ]
+
+
+def test_grep_ndjson_and_binary(logs, capsys, tmp_path):
+    grammar, root = logs
+    binary_grammar = tmp_path / 'binary.grammar'
+    binary_grammar.write_text('Call = b/[A-Z]+/ << b"(" << b/\\d+/ << b")"')
+
+    status = main([
+        'grep', '--grammar', str(binary_grammar), '--rule', 'Call',
+        '--format', 'ndjson', '--binary', str(root / 'a.log'),
+    ])
+    assert status == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(x) for x in lines] == [{
+        'path': str(root / 'a.log'),
+        'line': 2,
+        'column': 9,
+        'start': 23,
+        'end': 29,
+        'text': 'ABS(3)',
+    }]
+
+
+def test_grep_exit_status(logs, capsys):
+    grammar, root = logs
+
+    args = ['grep', '--grammar', str(grammar), '--rule', 'Formula']
+    assert main(args + [str(root / 'empty.log')]) == 1
+    assert main(args + [str(root / 'missing.log')]) == 2
+    assert 'missing.log' in capsys.readouterr().err
+
+    with pytest.raises(SystemExit):
+        main(['grep', '--grammar', str(grammar), '--rule', 'Arg2', str(root)])
+
+
+@pytest.mark.parametrize('binary', [False, True])
+@pytest.mark.parametrize('suffix', ['', '.gz'])
+def test_grep_reads_large_files_in_chunks(
+    logs, capsys, monkeypatch, tmp_path, binary, suffix
+):
+    grammar, root = logs
+    if binary:
+        grammar = tmp_path / 'binary.grammar'
+        grammar.write_text('Call = b/[A-Z]+/ << b"(" << b/\\d+/ << b")"')
+
+    # Use tiny chunks, so that the matches fall on both sides of each cut.
+    monkeypatch.setattr('sourcer.grep._CHUNK_SIZE', 8)
+    monkeypatch.setattr('sourcer.grep._OVERLAP', 4)
+
+    data = b'ab F(1)\n\nxyzzy\n  =G(2) H(3)\n' * 3
+    path = tmp_path / f'big.log{suffix}'
+    path.write_bytes(gzip.compress(data) if suffix else data)
+
+    rule = 'Call' if binary else 'Formula'
+    args = ['grep', '--grammar', str(grammar), '--rule', rule, '--format', 'ndjson']
+    status = main(args + (['--binary'] if binary else []) + [str(path)])
+    assert status == 0
+
+    found = [json.loads(x) for x in capsys.readouterr().out.splitlines()]
+    expected = []
+    for i in range(3):
+        offset = i * len(data) // 3
+        line = i * 4
+        if binary:
+            expected.append((line + 1, 4, offset + 3, 'F(1)'))
+            expected.append((line + 4, 4, offset + 18, 'G(2)'))
+            expected.append((line + 4, 9, offset + 23, 'H(3)'))
+        else:
+            expected.append((line + 4, 3, offset + 17, '=G(2)'))
+
+    assert [(x['line'], x['column'], x['start'], x['text']) for x in found] == expected
+
+
+@pytest.mark.parametrize('suffix', ['', '.gz'])
+def test_grep_keeps_long_lines_whole(logs, capsys, monkeypatch, tmp_path, suffix):
+    grammar, root = logs
+    monkeypatch.setattr('sourcer.grep._CHUNK_SIZE', 8)
+    monkeypatch.setattr('sourcer.grep._OVERLAP', 4)
+
+    # The first line is much longer than a chunk, and each formula has
+    # multi-byte characters on both sides of it.
+    text = 'é=A(1)é ' * 6 + '\nxé =B(2)\n'
+    data = text.encode('utf-8')
+    path = tmp_path / f'long.log{suffix}'
+    path.write_bytes(gzip.compress(data) if suffix else data)
+
+    status = main([
+        'grep', '--grammar', str(grammar), '--rule', 'Formula',
+        '--format', 'ndjson', str(path),
+    ])
+    assert status == 0
+
+    found = [json.loads(x) for x in capsys.readouterr().out.splitlines()]
+    starts = [i for i, c in enumerate(text) if c == '=']
+    assert [x['start'] for x in found] == starts
+    assert [x['text'] for x in found] == ['=A(1)'] * 6 + ['=B(2)']
+    assert [(x['line'], x['column']) for x in found] == (
+        [(1, i + 1) for i in starts[:-1]] + [(2, 4)]
+    )
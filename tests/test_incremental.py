@@ -0,0 +1,141 @@
+import random
+
+import pytest
+from sourcer import Grammar
+
+
+json_grammar = r'''
+    start = Value
+    Value = Object | Array | String | Number | Keyword
+    Object = "{" >> (Member // ",") << "}" |> `dict`
+    Member = [String << ":", Value]
+    Array = "[" >> (Value // ",") << "]"
+    String = /"(?:[^\\"]|\\.)*"/
+    Number = /-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?/ |> `float`
+    Keyword = "true" >> `True` | "false" >> `False` | "null" >> `None`
+    ignored Space = /\s+/
+'''
+
+
+def test_reparse_matches_a_fresh_parse():
+    g = Grammar(json_grammar, incremental=True)
+    alphabet = list('[]{},:"0123456789.-e truefalsn\\\n')
+    rand = random.Random(1234)
+
+    text = '[1, 2, {"a": [true, false, null]}, "xyz", 3]'
+    handle = g.parse_incremental(text)
+
+    for _ in range(500):
+        start = rand.randint(0, len(text))
+        old_end = rand.randint(start, min(len(text), start + 3))
+        insert = ''.join(rand.choice(alphabet) for _ in range(rand.randint(0, 3)))
+        new_text = text[:start] + insert + text[old_end:]
+
+        edit = (start, old_end, start + len(insert))
+        handle = g.reparse(handle, new_text, [edit])
+        try:
+            expected = g.parse(new_text)
+        except Exception as exc:
+            with pytest.raises(type(exc)) as exc_info:
+                handle.result
+            assert str(exc_info.value) == str(exc)
+        else:
+            assert handle.result == expected
+        text = new_text
+
+
+def test_reparse_reuses_entries_outside_the_edit():
+    g = Grammar(json_grammar, incremental=True)
+    text = '[' + ', '.join(f'"item{i}"' for i in range(100)) + ']'
+    handle = g.parse_incremental(text)
+    was = handle.result
+
+    # Change "item50" to "item5".
+    index = text.index('item50') + 5
+    new_text = text[:index] + text[index + 1:]
+    new_handle = g.reparse(handle, new_text, [(index, index + 1, index)])
+    assert new_handle.result == was[:50] + ['"item5"'] + was[51:]
+
+    # The strings before and after the edit came from the memo table.
+    assert new_handle.result[10] is was[10]
+    assert new_handle.result[90] is was[90]
+
+
+def test_reparse_updates_position_info():
+    g = Grammar(r'''
+        start = Pair+
+        class Pair {
+            key: /[a-z]+/ << "="
+            value: /\d+/ << ";"
+        }
+        ignore /\s+/
+    ''', incremental=True)
+
+    text = 'a=1;\nb=2;\nc=3;'
+    handle = g.parse_incremental(text)
+    assert handle.result[2]._position_info.start == g._Position(10, 3, 1)
+
+    # Insert a new line at the start of the text.
+    new_text = 'z=0;\n' + text
+    handle = g.reparse(handle, new_text, [(0, 0, 5)])
+
+    assert handle.result == [g.Pair(*x) for x in ['z0', 'a1', 'b2', 'c3']]
+    assert handle.result[3]._position_info.start == g._Position(15, 4, 1)
+    assert handle.result[3]._position_info.end == g._Position(18, 4, 4)
+
+
+def test_reparse_after_a_failed_parse():
+    g = Grammar(json_grammar, incremental=True)
+
+    handle = g.parse_incremental('[1, 2, "abc]')
+    assert isinstance(handle.error, g.ParseError)
+    with pytest.raises(g.ParseError):
+        handle.result
+
+    # Close the string.
+    handle = g.reparse(handle, '[1, 2, "abc"]', [(11, 11, 12)])
+    assert handle.error is None
+    assert handle.result == [1.0, 2.0, '"abc"']
+
+
+def test_reparse_drops_entries_that_look_behind_into_the_edit():
+    g = Grammar(r'''
+        start = Item*
+        Item = /(?<=b.)c/ >> `'X'` | /\bq/ >> `'Q'` | /[a-z ]/
+    ''', incremental=True)
+
+    handle = g.parse_incremental('abzc')
+    assert handle.result == ['a', 'b', 'z', 'X']
+    handle = g.reparse(handle, 'axzc', [(1, 2, 2)])
+    assert handle.result == ['a', 'x', 'z', 'c'] == g.parse('axzc')
+
+    # Word boundaries look at the character before them, too.
+    handle = g.parse_incremental('a q')
+    assert handle.result == ['a', ' ', 'Q']
+    handle = g.reparse(handle, 'aaq', [(1, 2, 2)])
+    assert handle.result == ['a', 'a', 'q'] == g.parse('aaq')
+
+
+def test_reparse_with_several_edits():
+    g = Grammar(json_grammar, incremental=True)
+    handle = g.parse_incremental('[1, 2, 3]')
+
+    # Replace "1" with "10", and then remove ", 3".
+    handle = g.reparse(handle, '[10, 2]', [(1, 2, 3), (6, 9, 6)])
+    assert handle.result == [10.0, 2.0]
+
+
+def test_reparse_rejects_invalid_edits():
+    g = Grammar(json_grammar, incremental=True)
+    handle = g.parse_incremental('[1, 2]')
+
+    with pytest.raises(ValueError):
+        g.reparse(handle, '[1, 2, 3]', [(5, 5, 6)])
+
+    with pytest.raises(ValueError):
+        g.reparse(handle, '[1]', [(4, 10, 4)])
+
+    # Once a handle is reparsed, it gives up its memo table.
+    g.reparse(handle, '[1, 2, 3]', [(5, 5, 8)])
+    with pytest.raises(ValueError):
+        g.reparse(handle, '[1, 2, 3]', [(5, 5, 8)])
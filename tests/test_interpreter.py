@@ -0,0 +1,114 @@
+import pytest
+from sourcer import Grammar
+
+
+json_grammar = r'''
+    start = Value
+    Value = Object | Array | String | Number | Keyword
+    Object = "{" >> (Member // ",") << "}" |> `dict`
+    Member = [String << ":", Value]
+    Array = "[" >> (Value // ",") << "]"
+    String = /"(?:[^\\"]|\\.)*"/
+    Number = /-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?/ |> `float`
+    Keyword = "true" >> `True` | "false" >> `False` | "null" >> `None`
+    ignored Space = /\s+/
+'''
+
+
+def test_interpreter_classes_keep_their_positions():
+    description = r'''
+        start = Expr
+        Expr = OperatorPrecedence(Int | Call, LeftAssoc("+" | "-"))
+        class Call {
+            name: /[a-z]+/
+            args: "(" >> (Expr /? ",") << ")"
+        }
+        Int = /\d+/ |> `int`
+        ignore /\s+/
+    '''
+    g1 = Grammar(description)
+    g2 = Grammar(description, backend='interpret')
+
+    result = g2.parse('f(1)')
+    assert isinstance(result, g2.Call)
+    assert result == g2.Call(name='f', args=[1])
+    assert result._position_info == g1.parse('f(1)')._position_info
+    assert g2.Call.parse('g(2, 3)') == g2.Call('g', [2, 3])
+
+
+def test_interpreter_with_memo_policies_and_budgets():
+    g = Grammar(r'''
+        start = Int // ","
+        Int = /\d+/ |> `int`
+        ignore /\s+/
+    ''', backend='interpret')
+
+    text = ', '.join(str(i) for i in range(100))
+    stats = g.ParseStats()
+    assert g.parse(text, memo_policy='lru', memo_size=10, stats=stats) == list(range(100))
+    assert stats.calls > 0
+
+    with pytest.raises(g.ParseBudgetExceeded):
+        g.parse(text, max_steps=10)
+
+
+def test_interpreter_many_nested_parentheses():
+    g = Grammar(r'start = ["(", start?, ")"]', backend='interpret')
+
+    depth = 5001
+    text = ('(' * depth) + (')' * depth)
+    result = g.parse(text)
+
+    count = 0
+    while result:
+        assert result[0] == '(' and result[2] == ')'
+        result = result[1]
+        count += 1
+
+    assert count == depth
+
+
+def test_interpreter_compiles_after_a_number_of_parses():
+    g = Grammar(json_grammar, backend='interpret', compile_after=2)
+    interpreted = g._try_Value
+
+    assert g.parse('[1]') == [1.0]
+    assert not g._compiled.is_set()
+    assert g.parse('[2]') == [2.0]
+    assert g._compiled.is_set()
+    assert g._try_Value is not interpreted
+
+    with pytest.raises(g.ParseError) as exc_info:
+        g.parse('[1, 2,')
+
+    with pytest.raises(g.ParseError) as expected:
+        Grammar(json_grammar).parse('[1, 2,')
+
+    assert str(exc_info.value) == str(expected.value)
+
+
+def test_interpreter_compiles_in_the_background():
+    g = Grammar(r'''
+        start = Pair // ","
+        class Pair {
+            key: /[a-z]+/ << "="
+            value: /\d+/ |> `int`
+        }
+        ignore /\s+/
+    ''', backend='interpret', compile_after=0, compile_in_background=True)
+
+    assert g._compiled.wait(timeout=30)
+    result = g.parse('a = 1, b = 2')
+    assert result == [g.Pair('a', 1), g.Pair('b', 2)]
+    assert all(type(x) is g.Pair for x in result)
+
+
+def test_interpreter_rejects_unsupported_options():
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', backend='interpret', incremental=True)
+
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', backend='interpret', include_source=True)
+
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', compile_after=10)
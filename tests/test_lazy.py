@@ -0,0 +1,55 @@
+import pytest
+from sourcer import Grammar
+
+
+def _loaded(g):
+    prefix = '_try_'
+    return sorted(
+        x[len(prefix):] for x in vars(g)
+        if x.startswith(prefix) and not x.startswith(prefix + '_')
+    )
+
+
+def test_lazy_grammar_only_compiles_reachable_rules():
+    g = Grammar(r'''
+        Formula = "=" >> Sum
+        Sum = Int // "+"
+        Int = /\d+/ |> `int`
+        class Pair {
+            key: Name << ":"
+            value: Int
+        }
+        Name = /[a-z]+/
+        ignore /\s+/
+    ''', lazy=True)
+
+    assert _loaded(g) == []
+
+    assert g.Formula.parse('= 1 + 2') == [1, 2]
+    assert _loaded(g) == ['Formula', 'Int', 'Sum']
+
+    # The classes exist before their rules are compiled.
+    assert g.Pair('a', 1) == g.Pair(key='a', value=1)
+    assert g.Pair.parse('b: 2') == g.Pair('b', 2)
+    assert _loaded(g) == ['Formula', 'Int', 'Name', 'Pair', 'Sum']
+
+
+def test_lazy_grammar_with_parameterized_rules_and_incremental_parsing():
+    g = Grammar(r'''
+        start = Wrap("<", Int, ">") // ","
+        Wrap(open, item, close) => open >> item << close
+        Int = /\d+/ |> `int`
+        ignore /\s+/
+    ''', lazy=True, incremental=True)
+
+    handle = g.parse_incremental('<1>, <2>, <3>')
+    handle = g.reparse(handle, '<1>, <20>, <3>', [(6, 6, 7)])
+    assert handle.result == [1, 20, 3]
+
+
+def test_lazy_grammar_rejects_unsupported_options():
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', lazy=True, include_source=True)
+
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', lazy=True, backend='stackless')
@@ -0,0 +1,85 @@
+import pytest
+from sourcer import Grammar
+
+
+@pytest.mark.parametrize('backend', ['generator', 'stackless'])
+def test_lexer_mode_positions_of_classes(backend):
+    g = Grammar(r'''
+        class Var {
+            name: /[a-z]+/
+        }
+        start = Expr
+        Expr = OperatorPrecedence(
+            Int | Var | "(" >> Expr << ")",
+            Prefix("-"),
+            RightAssoc("^"),
+            LeftAssoc("*" | "/"),
+            LeftAssoc("+" | "-"),
+        )
+        Int = /\d+/ |> `int`
+        ignore /[ \t]+/
+    ''', backend=backend, lexer=True)
+
+    result = g.parse('  foo + 1')
+    var = result.left
+    assert var._position_info.start.index == 2
+    assert var._position_info.end.index == 4
+
+
+def test_lexer_mode_keywords_and_names():
+    g = Grammar(r'''
+        start = Statement*
+        Statement = "print" >> Name | Name << "=" << Number
+        Name = /[a-z]+/
+        Number = /\d+/ |> `int`
+        ignore /\s+/
+        ignore "#" >> /[^\n]*/
+    ''', lexer=True)
+
+    # Keywords only match whole words, and names also match keywords.
+    assert g.parse('printer = 1  # x = 2\nprint printer') == ['printer', 'printer']
+    assert g.parse('print print') == ['print']
+
+    # Errors point at the token that failed to match.
+    with pytest.raises(g.ParseError) as exc_info:
+        g.Statement.parse('b =\n c')
+    assert tuple(exc_info.value.position) == (5, 2, 2)
+
+    # If the lexer gets stuck, the parse stops where the lexer stopped.
+    with pytest.raises(g.PartialParseError) as exc_info:
+        g.parse('a = 1 $ b = 2')
+    assert exc_info.value.last_position.index == 6
+
+
+def test_lexer_mode_rejects_unsupported_grammars():
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', lexer=True, incremental=True)
+
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', lexer=True, backend='interpret')
+
+    with pytest.raises(Exception):
+        Grammar(r'start = /(a)\1/', lexer=True)
+
+    with pytest.raises(Exception):
+        Grammar(r'''
+            start = "a"*
+            ignore Comment("#")
+            Comment(x) => x
+        ''', lexer=True)
+
+
+def test_lexer_mode_warns_about_terminals_that_overlap():
+    with pytest.warns(UserWarning) as record:
+        Grammar(r'''
+            start = (CellRef | Name) // ","
+            class CellRef { column: /[A-Z]+/; row: /\d+/ }
+            Name = /[A-Za-z]+/
+            Newline = "\n"
+            ignore /\s+/
+        ''', lexer=True)
+
+    message = str(record[0].message)
+    assert "/[A-Z]+/ and /[A-Za-z]+/" in message
+    assert "\\s+)/ and '\\n'" in message
+    assert '/\\d+/' not in message
@@ -0,0 +1,260 @@
+import pytest
+from sourcer import Grammar, ResultCache
+
+
+arithmetic_grammar = r'''
+    start = Expr
+    Expr = Term // ("+" | "-")
+    Term = Factor // ("*" | "/")
+    Factor = Number | "(" >> Expr << ")"
+    Number = /\d+/ |> `int`
+    ignored Space = /\s+/
+'''
+
+
+def _sample_text(size):
+    return ' + '.join(f'({i} * {i + 1} - {i})' for i in range(size))
+
+
+@pytest.mark.parametrize('policy', ['full', 'window', 'lru', 'none'])
+def test_memo_policies_produce_the_same_result(policy):
+    g = Grammar(arithmetic_grammar)
+    text = _sample_text(200)
+    expected = g.parse(text)
+
+    stats = g.ParseStats()
+    assert g.parse(text, memo_policy=policy, stats=stats) == expected
+    assert stats.memo_policy == policy
+    assert stats.calls == stats.memo_hits + stats.memo_misses
+    assert 0 <= stats.hit_rate <= 1
+
+
+def test_bounded_memo_policies_evict_entries():
+    g = Grammar(arithmetic_grammar)
+    text = _sample_text(200)
+
+    full = g.ParseStats()
+    g.parse(text, memo_policy='full', stats=full)
+    assert full.evictions == 0
+
+    window = g.ParseStats()
+    g.parse(text, memo_policy='window', memo_size=16, stats=window)
+    assert window.evictions > 0
+    assert window.memo_entries < full.memo_entries
+
+    lru = g.ParseStats()
+    g.parse(text, memo_policy='lru', memo_size=100, stats=lru)
+    assert lru.evictions > 0
+    assert lru.memo_entries == 100
+
+    none = g.ParseStats()
+    g.parse(text, memo_policy='none', stats=none)
+    assert none.memo_hits == 0
+    assert none.memo_entries == 0
+
+
+def test_memo_policy_with_errors():
+    g = Grammar(arithmetic_grammar)
+    stats = g.ParseStats()
+
+    with pytest.raises(g.PartialParseError):
+        g.parse('1 + 2 )', memo_policy='lru', stats=stats)
+
+    # The stats still count the failed parse.
+    assert stats.calls > 0
+
+
+def test_unknown_memo_policy():
+    g = Grammar(arithmetic_grammar)
+    with pytest.raises(ValueError):
+        g.parse('1 + 2', memo_policy='bogus')
+
+
+@pytest.mark.parametrize('backend', ['generator', 'stackless'])
+@pytest.mark.parametrize('policy', ['full', 'window', 'lru'])
+def test_max_memo_entries(backend, policy):
+    g = Grammar(arithmetic_grammar, backend=backend)
+    text = _sample_text(200)
+    expected = g.parse(text)
+
+    stats = g.ParseStats()
+    result = g.parse(text, memo_policy=policy, max_memo_entries=50, stats=stats)
+    assert result == expected
+    assert stats.memo_sheds > 0
+    assert stats.evictions > 0
+    assert stats.memo_entries <= 51
+
+    # The memo table doesn't shed anything if it stays under the limit.
+    stats = g.ParseStats()
+    g.parse('1 + 2', memo_policy=policy, max_memo_entries=50, stats=stats)
+    assert stats.memo_sheds == 0
+
+
+def test_invalid_max_memo_entries():
+    g = Grammar(arithmetic_grammar)
+    with pytest.raises(ValueError):
+        g.parse('1 + 2', max_memo_entries=0)
+
+
+def test_max_steps():
+    g = Grammar(arithmetic_grammar)
+    text = _sample_text(50)
+
+    stats = g.ParseStats()
+    with pytest.raises(g.ParseBudgetExceeded) as info:
+        g.parse(text, max_steps=100, stats=stats)
+
+    assert info.value.stats is stats
+    assert stats.calls == 101
+    assert 0 <= info.value.index < len(text)
+
+    # A parse within its budget works as usual.
+    assert g.parse(text, max_steps=100000) == g.parse(text)
+
+
+def test_max_steps_bounds_exponential_backtracking():
+    # Without a memo table, this grammar takes exponential time.
+    g = Grammar(r'''
+        start = A
+        A = ["(", A, ")", "!"] | ["(", A, ")"] | "x"
+    ''', backend='stackless')
+
+    text = '(' * 30 + 'x' + ')' * 30
+    with pytest.raises(g.ParseBudgetExceeded) as info:
+        g.parse(text, memo_policy='none', max_steps=10000)
+
+    assert info.value.stats.memo_policy == 'none'
+    assert info.value.stats.calls == 10001
+
+
+def test_deadline():
+    from time import monotonic
+
+    g = Grammar(arithmetic_grammar)
+    text = _sample_text(50)
+
+    with pytest.raises(g.ParseBudgetExceeded) as info:
+        g.parse(text, deadline=monotonic() - 1)
+
+    assert 'deadline' in str(info.value)
+    assert g.parse(text, deadline=monotonic() + 60) == g.parse(text)
+
+
+@pytest.mark.parametrize('backend', ['generator', 'stackless', 'interpret'])
+def test_result_cache_returns_shared_results(backend):
+    cache = ResultCache(max_entries=2)
+    g = Grammar(arithmetic_grammar, backend=backend, result_cache=cache)
+
+    first = g.parse('1 + 2 * 3')
+    assert g.parse('1 + 2 * 3') is first
+    assert g.Term.parse('2 * 3') == [2, 3]
+    assert g.parse('2 * 3') == [[2, 3]]
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # Parses with options skip the cache.
+    assert g.parse('1 + 2 * 3', memo_policy='none') == first
+    assert cache.hits == 1
+
+    # The cache evicts the least recently used result.
+    assert len(cache) == 2 and cache.evictions == 1
+    assert g.parse('1 + 2 * 3') is not first
+    assert cache.hit_rate == 0.2
+
+    # Failed parses aren't cached.
+    for _ in range(2):
+        with pytest.raises(g.SourcerError):
+            g.parse('(1')
+    assert len(cache) == 2 and cache.misses == 6
+
+
+def test_result_cache_copies_results():
+    cache = ResultCache(copy=True, max_bytes=10_000)
+    g = Grammar('class Pair { left: /\\d+/ << ","; right: /\\d+/ }', result_cache=cache)
+
+    first = g.parse('1,2')
+    first.left = 'changed'
+    second = g.parse('1,2')
+    assert second.left == '1'
+    assert second._position_info.start.column == 1
+    assert cache.hits == 1 and 0 < cache.total_bytes < 10_000
+
+    # Results that are over the byte limit aren't cached.
+    g.parse('1,' + '2' * 20_000)
+    assert len(cache) == 1
+
+
+@pytest.mark.parametrize('backend', ['generator', 'stackless', 'interpret'])
+def test_share_option(backend):
+    g = Grammar(r'''
+        start = Item // ","
+        Item = Call | Ref | Point | Number
+        class Call { name: /[a-z]+/ << "("; args: (Item // ",") << ")" }
+        class Ref { column: /[A-Z]+/; row: /\d+/ |> `int` }
+        Point = "<" >> [Number << ";", Number] << ">" |> `tuple`
+        Number = /-?\d+\.\d+/ |> `float`
+        ignore /\s+/
+    ''', backend=backend)
+
+    text = 'A1, -0.0, 0.0, A1, <1.5; 2.5>, f(A1, <1.5; 2.5>)'
+    expected = g.parse(text)
+    result = g.parse(text, share=True)
+    assert result == expected
+
+    # Equal strings and equal tuples are the same object.
+    assert result[0].column is result[3].column is result[5].args[0].column
+    assert result[4] is result[5].args[1]
+
+    # Floats that compare equal but print differently are kept apart.
+    assert repr(result[1:3]) == '[-0.0, 0.0]'
+
+    # Equal nodes are the same object, too. A shared node stands for more than
+    # one place in the text, so it doesn't have a position.
+    assert result[0] is result[3] is result[5].args[0]
+    assert result[0]._position_info is None
+
+    # A node that only appears once keeps its position.
+    assert result[5]._position_info.start.index == 31
+
+    # Lists are never shared, since they may change.
+    first, second = g.parse('f(<1.5; 2.5>), f(<1.5; 2.5>)', share=True)
+    assert first.args is not second.args
+    assert first.args[0] is second.args[0]
+
+    # The index lists the shared nodes, once for each place in the text.
+    result, index = g.parse('A1, B2, A1', share=True, index=['Ref'])
+    assert index['Ref'] == [result[0], result[1], result[0]]
+    assert all(x is y for x, y in zip(index['Ref'], result))
+
+
+@pytest.mark.parametrize('options', [
+    {'backend': 'generator'},
+    {'backend': 'stackless'},
+    {'backend': 'interpret'},
+    {'lexer': True},
+])
+def test_index_option(options):
+    g = Grammar(r'''
+        start = Formula // ";"
+        Formula = FunctionCall << "!" | Arg
+        Arg = FunctionCall | CellRef | Number
+        class FunctionCall { name: Name << "("; args: Arg // "," << ")" }
+        class CellRef { column: Name; row: Number }
+        Name = /[A-Z]+/
+        Number = /\d+/ |> `int`
+        ignore /\s+/
+    ''', **options)
+
+    text = 'SUM(A1, MAX(B2, 3)); C3; ABS(SUM(D4))!'
+    result, index = g.parse(text, index=['CellRef', 'FunctionCall'])
+    assert result == g.parse(text)
+
+    # The parser tries the first formula twice, but its nodes are only indexed
+    # once. Each list is in the order of the text.
+    assert [x.column for x in index['CellRef']] == ['A', 'B', 'C', 'D']
+    assert [x.name for x in index['FunctionCall']] == ['SUM', 'MAX', 'ABS', 'SUM']
+    assert index['FunctionCall'][1] is result[0].args[1]
+    assert index['CellRef'][2]._position_info.start.column == 22
+
+    assert g.parse('7', index='CellRef') == ([7], {'CellRef': []})
+    with pytest.raises(ValueError):
+        g.parse(text, index=['Arg'])
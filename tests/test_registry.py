@@ -0,0 +1,111 @@
+import threading
+
+from sourcer import GrammarRegistry
+from sourcer.registry import estimate_size
+
+
+def test_registry_compiles_each_grammar_once():
+    registry = GrammarRegistry()
+    g1 = registry.compile('start = "a" | "b"')
+    g2 = registry.compile('start = "a" | "b"')
+    g3 = registry.compile('start = "a" | "b"', backend='stackless')
+
+    assert g1 is g2
+    assert g1 is not g3
+    assert len(registry) == 2
+    assert registry.compilations == 2
+    assert estimate_size(g1) < registry.total_bytes < 3 * estimate_size(g1)
+
+
+def test_registry_evicts_least_recently_used():
+    registry = GrammarRegistry(max_grammars=2)
+    a = registry.compile('start = "a"')
+    registry.compile('start = "b"')
+    assert registry.compile('start = "a"') is a
+
+    # This evicts "b", since "a" was used more recently.
+    registry.compile('start = "c"')
+    assert len(registry) == 2
+    assert registry.evictions == 1
+    assert registry.compile('start = "a"') is a
+    assert registry.compilations == 3
+
+    registry.compile('start = "b"')
+    assert registry.compilations == 4
+
+    # With a tiny byte limit, the registry only keeps the latest module.
+    registry = GrammarRegistry(max_bytes=1)
+    registry.compile('start = "a"')
+    registry.compile('start = "b"')
+    assert len(registry) == 1
+    assert registry.evictions == 1
+
+
+def test_registry_replaces_named_grammars():
+    registry = GrammarRegistry(max_grammars=1)
+    old = registry.register('config', 'start = "v1"')
+    assert registry['config'] is old
+    assert 'config' in registry
+
+    # Reloading the same grammar doesn't compile it again.
+    assert registry.register('config', 'start = "v1"') is old
+    assert registry.compilations == 1
+
+    results = []
+    started, replaced = threading.Event(), threading.Event()
+
+    def parse_with_old_module():
+        module = registry['config']
+        started.set()
+        replaced.wait()
+        results.append(module.parse('v1'))
+
+    thread = threading.Thread(target=parse_with_old_module)
+    thread.start()
+    started.wait()
+    new = registry.register('config', 'start = "v2"')
+    replaced.set()
+    thread.join()
+
+    assert results == ['v1']
+    assert registry['config'] is new
+    assert new.parse('v2') == 'v2'
+
+    # If the module is evicted, then the registry compiles it again.
+    registry.compile('start = "other"')
+    assert registry['config'].parse('v2') == 'v2'
+
+    registry.remove('config')
+    assert 'config' not in registry
+
+
+def test_registry_lookups_by_name_reuse_the_key(monkeypatch):
+    import sourcer.registry
+
+    registry = GrammarRegistry()
+    module = registry.register('config', 'start = "v1"')
+
+    def fail(description, options):
+        raise AssertionError('The registry hashed the grammar again.')
+
+    monkeypatch.setattr(sourcer.registry, 'grammar_key', fail)
+    assert registry['config'] is module
+    assert registry['config'] is module
+
+
+def test_registry_keys_objects_by_identity():
+    from sourcer import ResultCache
+
+    registry = GrammarRegistry()
+    cache = ResultCache()
+    g = registry.register('config', 'start = "a" | "b"', result_cache=cache)
+    assert g.parse('a') == 'a'
+    assert g.parse('a') == 'a'
+
+    # The cache's counts changed, but it's still the same cache.
+    assert registry.register('config', 'start = "a" | "b"', result_cache=cache) is g
+    assert registry.compilations == 1
+
+    other = registry.compile('start = "a" | "b"', result_cache=ResultCache())
+    assert other is not g
+    assert registry.compilations == 2
@@ -0,0 +1,99 @@
+import pickle
+import sys
+
+import pytest
+import sourcer
+from sourcer import Grammar, runtime
+
+
+def test_grammars_share_the_runtime():
+    g1 = Grammar('class Pair { left: /\\d+/ << ","; right: /\\d+/ }')
+    g2 = Grammar('start = "a" | "b"', backend='stackless')
+    g3 = Grammar('start = "x"', backend='interpret')
+
+    for g in [g1, g2, g3]:
+        assert g.Node is runtime.Node
+        assert g.ParseError is runtime.ParseError
+        assert g.transform is runtime.transform
+
+    assert issubclass(g1.Pair, runtime.Node)
+
+    # Each grammar still has its own error messages.
+    with pytest.raises(sourcer.SourcerError) as info:
+        g2.parse('c')
+    assert "'a' | 'b'" in str(info.value)
+
+    with pytest.raises(sourcer.SourcerError) as info:
+        g3.parse('c')
+    assert "'x'" in str(info.value)
+
+
+def test_parse_errors_can_be_pickled():
+    g = Grammar('start = "foo" >> "bar"')
+    with pytest.raises(g.ParseError) as info:
+        g.parse('foobaz')
+
+    error = pickle.loads(pickle.dumps(info.value))
+    assert type(error) is runtime.ParseError
+    assert error.position == (3, 1, 4)
+    assert str(error) == str(info.value)
+
+
+def test_standalone_modules_have_their_own_runtime():
+    g = Grammar('start = "foo"', include_source=True)
+    assert 'sourcer.runtime' not in g._source_code
+    assert 'class ParseError' in g._source_code
+    assert g.ParseError is not runtime.ParseError
+    assert g.parse('foo') == 'foo'
+
+
+@pytest.mark.parametrize('in_place', [False, True])
+def test_transform(in_place):
+    g = Grammar(r'''
+        start = Expr
+        Expr = Call | Ref
+        class Call { name: /[A-Z]+/ << "("; args: Expr // "," << ")" }
+        class Ref { column: /[A-Z]+/; row: /\d+/ |> `int` }
+        ignore /\s+/
+    ''')
+
+    def lower(node):
+        if isinstance(node, g.Ref):
+            return g.Ref(node.column.lower(), node.row)
+        if isinstance(node, g.Call) and node.name == 'ABS':
+            return node.args[0]
+        return node
+
+    tree = g.parse('SUM(A1, ABS(B2), MAX(C3, D4))')
+    expected = g.Call('SUM', [
+        g.Ref('a', 1), g.Ref('b', 2), g.Call('MAX', [g.Ref('c', 3), g.Ref('d', 4)]),
+    ])
+    args = tree.args
+    result = g.transform(tree, lower, in_place=in_place)
+    assert result == expected
+    assert (result is tree) == in_place
+    assert (result.args is args) == in_place
+    assert (tree == expected) == in_place
+
+    # Deep trees don't use up the Python stack.
+    depth = sys.getrecursionlimit() * 2
+    tree = g.parse('F(' * depth + 'A1' + ')' * depth)
+    result = g.transform(tree, lower, in_place=in_place)
+    for _ in range(depth):
+        result = result.args[0]
+    assert result == g.Ref('a', 1)
+
+
+def test_transform_in_place_visits_shared_nodes_once():
+    g = Grammar('class Pair { left: /\\d+/ << ","; right: /\\d+/ }')
+    pair = g.Pair('1', '2')
+    calls = []
+
+    def wrap(node):
+        calls.append(node)
+        return [node.left, node.right]
+
+    tree = [pair, [pair]]
+    assert g.transform(tree, wrap, in_place=True) is tree
+    assert tree == [['1', '2'], [['1', '2']]]
+    assert calls == [pair]
@@ -0,0 +1,85 @@
+import pytest
+from sourcer import Grammar
+from sourcer import expressions as ex
+from sourcer import grammar, meta, prefilter, translator
+
+
+_description = r'''
+    class Formula {
+        name: "=" >> /[A-Z]+/
+        args: "(" >> (Arg // ",") << ")"
+    }
+    Arg = Formula | Int
+    Sum = Int << "+" << Int
+    Int = /\d+/ |> `int`
+'''
+
+
+def _matches(rule, text, pos=0):
+    return [(m.value, m.start, m.end, m.line, m.column) for m in rule.finditer(text, pos)]
+
+
+@pytest.mark.parametrize('backend', ['generator', 'stackless', 'interpret'])
+def test_finditer_and_search(backend):
+    g = Grammar(_description, backend=backend)
+    text = 'a: x=SUM(1,2) y=MAX(3, 4)\nb: =ABS(=NEG(5)) =BAD(1+2 3+4'
+    F = g.Formula
+
+    assert _matches(F, text) == [
+        (F('SUM', [1, 2]), 4, 13, 1, 5),
+        (F('ABS', [F('NEG', [5])]), 29, 42, 2, 4),
+    ]
+    assert _matches(g.Sum, text) == [(1, 48, 51, 2, 23), (3, 52, 55, 2, 27)]
+
+    match = F.search(text, 5)
+    assert match.value == F('ABS', [F('NEG', [5])])
+    assert match.value.args[0]._position_info.start == (34, 2, 9)
+
+    assert F.search('no formulas here') is None
+    assert g.Sum.search(text, 53) is None
+
+
+def test_finditer_in_lazy_grammars():
+    g = Grammar(_description, lazy=True)
+    assert _matches(g.Sum, '1+2 3+4') == [(1, 0, 3, 1, 1), (3, 4, 7, 1, 5)]
+
+
+def test_finditer_empty_matches():
+    g = Grammar('start = "a"*')
+    assert [(m.value, m.start) for m in g.start.finditer('baab')] == [
+        ([], 0), (['a', 'a'], 1), ([], 3), ([], 4),
+    ]
+
+
+def test_finditer_across_a_long_text():
+    g = Grammar(_description)
+    text = ('x' * 5000 + '=F(1)\n') * 100
+    matches = list(g.Formula.finditer(text))
+    assert len(matches) == 100
+    assert matches[-1].start == 99 * 5006 + 5000
+    assert (matches[-1].line, matches[-1].column) == (100, 5001)
+
+
+def _prefilters(description):
+    raw = meta.parse(description)
+    nodes = meta.transform(raw, grammar._create_parsing_expression)
+    sections, rules, default_rule, has_ignored = translator.collect_rules(nodes)
+    translator.prepare_rules(rules, has_ignored, lambda *args: None)
+    return prefilter.first_patterns(rules)
+
+
+def test_prefilters():
+    result = _prefilters(r'''
+        Formula = "=" >> /[A-Z]+/
+        Keyword = "if" | "else"
+        Number = /-?\d+/ | /(?i)x[0-9a-f]+/
+        Maybe = ["a"?, "b"]
+        Loop = [Loop, "x"] | "y"
+        Anything = /.*/
+    ''')
+    assert result['Formula'] == (True, '=')
+    assert result['Keyword'] == (False, 'if|else')
+    assert result['Number'] == (False, '(?:\\-|[\\d])|(?i:x)')
+    assert result['Maybe'] == (False, 'a|b')
+    assert result['Loop'] is None
+    assert result['Anything'] is None
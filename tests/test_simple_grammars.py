@@ -402,6 +402,16 @@ def test_fail_expression():
         assert "'a' | 'b'" in str(exc)
 
 
+def test_ignored_rules_skip_ignored_input():
+    g = Grammar(r'''
+        start = "x" >> "x"
+        ignored Comment = ["#", "!"]
+        ignore /\s+/
+    ''')
+    assert g.parse('x #! x') == 'x'
+    assert g.parse('x # ! x') == 'x'
+
+
 def test_binary_strings_and_regexes():
     g = Grammar(r'start = b"magic:" >> (b/[0-9A-F]{2}/ // b".")')
     assert g.parse(b'magic:01.23.AB') == [b'01', b'23', b'AB']
@@ -485,3 +495,82 @@ def test_length_prefix_on_number_list_in_byte_string():
         Byte = b/./
     ''')
     assert g.parse(b'\x03abc') == b'abc'
+
+
+def test_error_messages_come_from_a_table():
+    g = Grammar(r'''
+        start = Name | Int
+        Name = /[a-z]+/
+        Int = /\d+/
+    ''', include_source=True)
+
+    # The module has one function that formats error messages, instead of one
+    # function per expression.
+    assert g._source_code.count('def _raise_error') == 1
+    assert g._errors
+
+    with pytest.raises(g.ParseError) as exc_info:
+        g.parse('?')
+
+    assert str(exc_info.value) == dedent('''\
+        Error on line 1, column 1:
+        ?
+        ^
+        Failed to parse the 'start' rule, at the expression:
+            Name | Int
+
+        Unexpected input''')
+
+
+def test_parse_errors_format_their_messages_on_demand():
+    import copy
+
+    g = Grammar(r'''
+        start = "[" >> (Int // ",") << "]"
+        Int = /\d+/ |> `int`
+        ignore /\s+/
+    ''')
+
+    with pytest.raises(g.ParseError) as exc_info:
+        g.parse('[1, 2,\n3, x]')
+
+    exc = exc_info.value
+    assert exc.index == 8
+    assert exc._message is None and exc._position is None
+
+    assert exc.position == (8, 2, 2)
+    assert exc.excerpt == '3, x]\n ^'
+    assert str(exc).startswith('Error on line 2, column 2:\n3, x]\n ^\n')
+
+    assert str(copy.copy(exc)) == str(exc)
+    assert exc.args == (str(exc),)
+    assert repr(exc) == f'ParseError({str(exc)!r})'
+
+    with pytest.raises(g.ParseError) as exc_info:
+        g.parse('[1, 2')
+
+    assert exc_info.value.position == (5, None, None)
+    assert exc_info.value.excerpt is None
+    assert str(exc_info.value).startswith('Unexpected end of input.')
+
+
+def test_parse_errors_accept_a_message():
+    import pickle
+    from sourcer.runtime import ParseError
+
+    exc = ParseError('Bad input.', 3, 1, 4)
+    assert exc.args == ('Bad input.',)
+    assert str(exc) == 'Bad input.'
+    assert exc.position == (3, 1, 4)
+    assert exc.excerpt is None
+
+    copy = pickle.loads(pickle.dumps(exc))
+    assert copy.args == exc.args and copy.position == exc.position
+
+    g = Grammar('start = "a"')
+    with pytest.raises(ParseError) as exc_info:
+        g.parse('b')
+
+    copy = pickle.loads(pickle.dumps(exc_info.value))
+    assert copy.args == exc_info.value.args
+    assert copy.position == exc_info.value.position
@@ -0,0 +1,56 @@
+import mmap
+
+import pytest
+from sourcer import Grammar
+
+
+grammar = r'''
+    start = Pair // ","
+    class Pair { key: Key << ":"; value: /\d+/ }
+    Key = "x" | /[a-z]+/
+    ignore /\s+/
+'''
+
+
+@pytest.mark.parametrize('options', [{}, {'lexer': True}, {'backend': 'stackless'}])
+def test_spans_refer_to_the_text(options):
+    g = Grammar(grammar, spans=True, **options)
+    text = 'x: 1, abc: 22'
+    result = g.parse(text)
+
+    key = result[1].key
+    assert isinstance(key, g.Span)
+    assert (key.text, key.start, key.end) == (text, 6, 9)
+    assert str(key) == 'abc' and len(key) == 3
+
+    # Spans compare like their text.
+    assert result == [g.Pair('x', '1'), g.Pair('abc', '22')]
+    assert result[1]._position_info.start.column == 7
+
+
+def test_spans_of_binary_input(tmp_path):
+    g = Grammar(r'''
+        start = Line*
+        Line = b/[a-z]+/ << b"\n"
+    ''', spans=True)
+
+    path = tmp_path / 'words.txt'
+    path.write_bytes(b'foo\nbar\n')
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        result = g.parse(data)
+        assert all(x.text is data for x in result)
+        assert [bytes(x) for x in result] == [b'foo', b'bar']
+        assert result[1].value == b'bar'
+        assert str(result[1]) == 'bar'
+
+        # When a tree is saved, each span is saved as its text.
+        assert g.loads(g.dumps(result)) == [b'foo', b'bar']
+
+
+def test_spans_option_checks():
+    with pytest.raises(ValueError):
+        Grammar(grammar, spans=True, incremental=True)
+
+    with pytest.raises(ValueError):
+        Grammar(grammar, spans=True, backend='interpret')
@@ -0,0 +1,116 @@
+from textwrap import dedent
+
+import pytest
+from sourcer import Grammar
+
+
+def test_stackless_many_nested_parentheses():
+    g = Grammar(r'start = ["(", start?, ")"]', backend='stackless')
+
+    depth = 5001
+    text = ('(' * depth) + (')' * depth)
+    result = g.parse(text)
+
+    count = 0
+    while result:
+        assert result[0] == '(' and result[2] == ')'
+        result = result[1]
+        count += 1
+
+    assert count == depth
+
+
+def test_stackless_backend_with_parameterized_rules():
+    g = Grammar(r'''
+        start = Wrap("<", Wrap("[", Letter, "]"), ">") // ","
+        Wrap(open, item, close) => open >> item << close
+        Letter = /[a-z]/
+        ignore /\s+/
+    ''', backend='stackless')
+
+    assert g.parse('<[a]>, <[b]>') == ['a', 'b']
+
+    with pytest.raises(g.PartialParseError):
+        g.parse('<[a>')
+
+
+def test_stackless_backend_with_memo_policies_and_incremental_parsing():
+    g = Grammar(r'''
+        start = Int // ","
+        Int = /\d+/ |> `int`
+        ignore /\s+/
+    ''', backend='stackless', incremental=True)
+
+    text = ', '.join(str(i) for i in range(100))
+    stats = g.ParseStats()
+    assert g.parse(text, memo_policy='lru', memo_size=10, stats=stats) == list(range(100))
+    assert stats.calls > 0
+
+    handle = g.parse_incremental('1, 2, 3')
+    handle = g.reparse(handle, '1, 20, 3', [(3, 4, 5)])
+    assert handle.result == [1, 20, 3]
+
+
+def test_stackless_backend_counts_calls_to_leaf_rules():
+    # Without an "ignore" clause, every rule is a leaf, so the stackless
+    # functions call each other directly.
+    description = r'''
+        start = Item // ","
+        Item = Word | Num
+        Word = /[a-z]+/ << "!"?
+        Num = /\d+/ |> `int`
+    '''
+    g1 = Grammar(description)
+    g2 = Grammar(description, backend='stackless')
+    text = ','.join(str(i) for i in range(100))
+
+    stats1, stats2 = g1.ParseStats(), g2.ParseStats()
+    assert g1.parse(text, stats=stats1) == g2.parse(text, stats=stats2)
+    assert repr(stats2) == repr(stats1)
+
+    with pytest.raises(g2.ParseBudgetExceeded) as exc_info:
+        g2.parse(text, max_steps=50)
+    assert exc_info.value.stats.calls == 51
+
+    stats = g2.ParseStats()
+    g2.parse(text, max_memo_entries=20, stats=stats)
+    assert stats.memo_sheds > 0
+
+
+def test_lowering_finds_the_yield_in_the_syntax_tree():
+    from sourcer.stackless import lower_generators
+
+    # The call line has the text "(yield " in a string, before the real yield.
+    source = dedent('''\
+        def _try_start(_text, _pos):
+            (_status, _result, _pos) = _label('(yield é', (yield (3, _try_item, _pos)))
+            yield (_status, _result, _pos)
+    ''')
+    lowered = lower_generators(source)
+    assert "return (3, _try_item, _pos, [_try_start_resume, 1])" in lowered
+    assert "_label('(yield é', _sent)" in lowered
+
+    namespace = {
+        '_label': lambda label, result: (label, *result[1:]),
+        '_try_item': None,
+    }
+    exec(lowered, namespace)
+    frame = namespace['_try_start']('x', 0)[3]
+    result = namespace['_try_start_resume']('x', frame, (1, 'v', 1))
+    assert result == ('(yield é', 'v', 1)
+
+
+def test_stackless_backend_has_no_generators():
+    g = Grammar(r'''
+        start = A | B
+        A = ["a", B?]
+        B = ["b", A?]
+    ''', backend='stackless', include_source=True)
+
+    assert 'yield' not in g._source_code.split('def visit')[0]
+    assert g.parse('abab') == ['a', ['b', ['a', ['b', None]]]]
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', backend='bogus')
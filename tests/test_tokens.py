@@ -0,0 +1,86 @@
+import io
+import tokenize
+from collections import namedtuple
+
+import pytest
+from sourcer import Grammar
+
+
+Token = namedtuple('Token', 'kind value')
+
+
+def test_parse_list_of_strings():
+    g = Grammar(r'''
+        start = "(" >> (Item // ",") << ")"
+        Item = /[a-z]+/ | /\d+/
+    ''', tokens=True)
+
+    assert g.parse(['(', 'ab', ',', '12', ')']) == ['ab', '12']
+    assert g.parse(('(', ')')) == []
+
+    with pytest.raises(g.ParseError) as exc_info:
+        g.parse(['(', 'a', 'b', ')'])
+    assert tuple(exc_info.value.position) == (2, 1, 3)
+
+    with pytest.raises(g.ParseError) as exc_info:
+        g.parse(['(', 'a'])
+    assert tuple(exc_info.value.position) == (2, None, None)
+
+
+def test_literals_match_token_kinds_or_values():
+    g = Grammar(r'''
+        class Assign {
+            name: "NAME"
+            value: "=" >> ("NUMBER" | "NAME")
+        }
+        start = Assign*
+        ignore "SPACE"
+    ''', tokens=True)
+
+    tokens = [
+        Token('NAME', 'x'), Token('SPACE', ' '), Token('OP', '='),
+        Token('NUMBER', '1'), Token('SPACE', ' '), Token('NAME', 'y'),
+        Token('OP', '='), Token('NAME', 'x'),
+    ]
+    result = g.parse(tokens)
+    assert result == [
+        g.Assign(Token('NAME', 'x'), Token('NUMBER', '1')),
+        g.Assign(Token('NAME', 'y'), Token('NAME', 'x')),
+    ]
+
+    # Position info refers to the token indexes.
+    assert result[1]._position_info.start.index == 5
+    assert result[1]._position_info.end.index == 7
+
+
+def test_custom_token_predicate():
+    def match_token(token, expected):
+        if isinstance(expected, str):
+            return expected in (tokenize.tok_name[token.exact_type], token.string)
+        return bool(expected.fullmatch(token.string))
+
+    g = Grammar(r'''
+        start = Statement*
+        Statement = Name << "=" << (Name | Number) << "NEWLINE"
+        Name = "NAME" |> `lambda x: x.string`
+        Number = /\d+/ |> `lambda x: int(x.string)`
+        ignore "NL" | "COMMENT"
+    ''', tokens=True, match_token=match_token)
+
+    source = 'a = 1  # comment\n\nb = a\n'
+    tokens = [
+        x for x in tokenize.generate_tokens(io.StringIO(source).readline)
+        if x.type != tokenize.ENDMARKER
+    ]
+    assert g.parse(tokens) == ['a', 'b']
+
+
+def test_token_grammars_reject_unsupported_options():
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', tokens=True, lexer=True)
+
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', tokens=True, incremental=True)
+
+    with pytest.raises(ValueError):
+        Grammar('start = "a"', match_token=lambda x, y: True)